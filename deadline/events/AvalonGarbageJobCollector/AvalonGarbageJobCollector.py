@@ -39,33 +39,18 @@ class AvalonGarbageJobCollector(DeadlineEventListener):
             # This is our target to remove, skip if it's getting deleted.
             return
 
-        # Get PyMongo from job (Not a good way)
+        # Get PyMongo and reveries from job (Not a good way)
         sys.path += job.GetJobEnvironmentKeyValue("PYTHONPATH").split(";")
         try:
-            import pymongo
+            from reveries.deadline import garbage
         except ImportError:
-            print("Could not import PyMongo.")
+            print("Could not import PyMongo or reveries.")
             return
 
-        host = "Technic-Server"  # 192.168.1.3
-        port = 27100
-        db_name = "deadline10db"
-        col_name = "Jobs"
+        # Pooled client, see `garbage.jobs_collection` for configuring
+        collection = garbage.jobs_collection()
 
-        client = pymongo.MongoClient(host=host, port=port)
-        db = client[db_name]
-        col = db[col_name]
-
-        id = job.JobId
-        batch = job.GetJobInfoKeyValue("BatchName")
-
-        dep_ids = set()
-        for doc in col.find({"Props.Batch": batch, "Props.Dep.JobID": id}):
-            dep_ids.add(doc["_id"])
-
-        for id in dep_ids:
-            if RepositoryUtils.JobExists(id):
-                dep_job = RepositoryUtils.GetJob(id, False)
-
-                print("Deleting job: %s  |  %s" % (dep_job.JobName, id))
-                RepositoryUtils.DeleteJob(dep_job)
+        # Empty if not in batch, then only unbatched jobs are collected
+        batch = job.GetJobInfoKeyValue("BatchName") or ""
+        deleter = garbage.repository_deleter(RepositoryUtils)
+        garbage.collect(collection, job.JobId, batch, deleter)
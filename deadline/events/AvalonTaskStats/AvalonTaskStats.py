@@ -0,0 +1,66 @@
+"""Deadline custom event plugin
+
+Used for recording task durations of Avalon jobs, for adaptive chunk size
+(see `reveries.deadline.chunking`)
+
+"""
+import os
+import sys
+
+from System.IO import *
+from System.Text import *
+
+from Deadline.Events import *
+from Deadline.Scripting import *
+
+
+TASK_STATS_KEY = "AvalonTaskStatsKey"
+
+
+def GetDeadlineEventListener():
+    return AvalonTaskStats()
+
+
+def CleanupDeadlineEventListener(deadlinePlugin):
+    deadlinePlugin.Cleanup()
+
+
+class AvalonTaskStats(DeadlineEventListener):
+    """Record completed tasks' frame count and render time of Avalon job
+    """
+
+    def __init__(self):
+        self.OnJobFinishedCallback += self.OnJobFinished
+
+    def Cleanup(self):
+        del self.OnJobFinishedCallback
+
+    def OnJobFinished(self, job):
+        key = job.GetJobExtraInfoKeyValue(TASK_STATS_KEY)
+        if not key:
+            # Not a tagged Avalon Job
+            return
+
+        # Get reveries from job (Not a good way)
+        sys.path += job.GetJobEnvironmentKeyValue("PYTHONPATH").split(";")
+        for var in ("AVALON_MONGO", "AVALON_DB", "REVERIES_TASK_STATS"):
+            value = job.GetJobEnvironmentKeyValue(var)
+            if value:
+                os.environ[var] = value
+        try:
+            from reveries.deadline import chunking
+        except ImportError:
+            print("Could not import reveries.")
+            return
+
+        tasks = list()
+        for task in RepositoryUtils.GetJobTasks(job, True).TaskCollectionTasks:
+            if task.TaskStatus != "Completed":
+                continue
+            tasks.append((len(task.TaskFrameList),
+                          task.TaskRenderTime.TotalSeconds))
+
+        scheduler = chunking.ChunkScheduler(chunking.default_store())
+        scheduler.record(key, tasks)
+
+        print("Recorded %d tasks of %s" % (len(tasks), key))
@@ -2,22 +2,25 @@
 
 Used for deleting deprecated intergration jobs
 
+Requires PyMongo and reveries in Deadline's Python search paths. Set env
+var `REVERIES_GC_DRY_RUN=1` to only list the jobs.
+
 """
 from Deadline.Scripting import *
 
 
 def __main__():
+    from reveries.deadline import garbage
+
+    # All jobs and dependencies are read in one query, instead of asking
+    # repository for every dependency of every job.
+    collection = garbage.jobs_collection()
+    dry_run = garbage.is_dry_run()
+    deleter = garbage.repository_deleter(RepositoryUtils)
+
+    report = garbage.wipe(collection, deleter, dry_run=dry_run)
 
-    for job in RepositoryUtils.GetJobs(False):
-        if not job.GetJobEnvironmentKeyValue("AVALON_ASSET"):
-            # Not a Avalon Job
-            continue
-        if not job.JobName.startswith("_intergrate "):
-            # Not a Avalon Intergration Job
-            continue
-
-        all_dead = not any(RepositoryUtils.JobExists(id)
-                           for id in job.JobDependencyIDs)
-        if all_dead:
-            print("Deleting job: %s  |  %s" % (job.JobName, job.JobId))
-            RepositoryUtils.DeleteJob(job)
+    for id, name in report["candidates"]:
+        print("%s job: %s  |  %s" % ("Would delete" if dry_run
+                                     else "Deleting", name, id))
+    print("%d jobs deleted." % len(report["deleted"]))
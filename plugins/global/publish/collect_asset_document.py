@@ -1,7 +1,7 @@
 
 import pyblish.api
 import avalon.api
-import avalon.io
+from reveries import doccache
 
 
 class CollectAssetDocument(pyblish.api.ContextPlugin):
@@ -24,9 +24,9 @@ class CollectAssetDocument(pyblish.api.ContextPlugin):
 
         project = context.data["projectDoc"]
 
-        asset = avalon.io.find_one({"type": "asset",
-                                    "name": ASSET,
-                                    "parent": project["_id"]})
+        asset = doccache.of(context).find_one({"type": "asset",
+                                               "name": ASSET,
+                                               "parent": project["_id"]})
         assert asset is not None, ("Could not find current asset '%s'" % ASSET)
 
         context.data["assetDoc"] = asset
@@ -0,0 +1,25 @@
+
+import pyblish.api
+from reveries import doccache
+
+
+class CollectDocumentCache(pyblish.api.ContextPlugin):
+    """啟用資料庫文件快取"""
+
+    """
+
+    Create a `reveries.doccache.DocumentCache` for this publish, so the
+    project, asset and other documents will be fetched from database once.
+    The cache lives in context only, it is not activated process wide, and
+    is reported in `PublishReports`.
+
+    keys in context.data:
+        * documentCache
+
+    """
+
+    label = "啟用文件快取"
+    order = pyblish.api.CollectorOrder - 0.4
+
+    def process(self, context):
+        doccache.of(context)
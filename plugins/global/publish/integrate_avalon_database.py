@@ -1,6 +1,17 @@
 
+import os
+import time
+import pymongo
 import pyblish.api
 from avalon import io
+from reveries import lib, doccache
+
+
+def bulk_mode():
+    """Whether to integrate whole context in bulk, by env var
+    `REVERIES_BULK_INTEGRATE`
+    """
+    return bool(os.getenv("REVERIES_BULK_INTEGRATE"))
 
 
 class IntegrateAvalonDatabase(pyblish.api.InstancePlugin):
@@ -20,6 +31,10 @@ class IntegrateAvalonDatabase(pyblish.api.InstancePlugin):
             self.log.warning("Atomicity not held, aborting.")
             return
 
+        if bulk_mode():
+            self.log.info("Integrated by context in bulk.")
+            return
+
         # Integrate representations' to database
         self.log.info("Integrating representations to database ...")
 
@@ -27,7 +42,9 @@ class IntegrateAvalonDatabase(pyblish.api.InstancePlugin):
         subset, version, representations = instance.data["toDatabase"]
 
         # Write subset if not exists
-        filter = {"parent": asset["_id"], "name": subset["name"]}
+        filter = {"type": "subset",
+                  "parent": asset["_id"],
+                  "name": subset["name"]}
         if io.find_one(filter) is None:
             io.insert_one(subset)
 
@@ -60,6 +77,11 @@ class IntegrateAvalonDatabase(pyblish.api.InstancePlugin):
                 update = {"$set": {"data": representation["data"]}}
                 io.update_many(filter_, update)
 
+        # Database written, drop cached documents and move version dir
+        # into place
+        doccache.of(context).invalidate()
+        instance.data["versioner"].commit()
+
     def write_database(self, instance, version, representations):
         """Write version and representations to database
 
@@ -97,3 +119,138 @@ class IntegrateAvalonDatabase(pyblish.api.InstancePlugin):
             filter_ = {"_id": io.ObjectId(version_id_)}
             update = {"$set": {field: {"count": data["count"]}}}
             io.update_many(filter_, update)
+
+
+class IntegrateAvalonDatabaseBulk(pyblish.api.ContextPlugin):
+    """一次性寫入本次發佈的所有資料至資料庫
+
+    Collect subset, version, representation documents and dependent
+    updates of all instances, and write them in one ordered bulk write
+    (in one transaction if the server supports it).
+
+    Enabled by setting env var `REVERIES_BULK_INTEGRATE`, and the
+    per-instance `IntegrateAvalonDatabase` will be skipped.
+
+    """
+
+    label = "寫入資料庫 (Bulk)"
+    order = pyblish.api.IntegratorOrder + 0.09
+
+    targets = ["localhost"]
+
+    def process(self, context):
+
+        if not bulk_mode():
+            return
+
+        if not all(result["success"] for result in context.data["results"]):
+            self.log.warning("Atomicity not held, aborting.")
+            return
+
+        instances = [instance for instance in context
+                     if instance.data.get("publish", True) and
+                     "toDatabase" in instance.data]
+        if not instances:
+            return
+
+        start = time.time()
+        queries = 0
+
+        asset = context.data["assetDoc"]
+        subsets = [instance.data["toDatabase"][0] for instance in instances]
+
+        # Existing subsets and versions, one query each
+        #
+        existed_subsets = set(
+            doc["name"] for doc in io.find(
+                {"type": "subset",
+                 "parent": asset["_id"],
+                 "name": {"$in": [subset["name"] for subset in subsets]}},
+                projection={"name": True}
+            )
+        )
+        existed_versions = {
+            (doc["parent"], doc["name"]): doc["_id"] for doc in io.find(
+                {"type": "version",
+                 "parent": {"$in": [subset["_id"] for subset in subsets]},
+                 "name": {"$in": [instance.data["toDatabase"][1]["name"]
+                                  for instance in instances]}},
+                projection={"name": True, "parent": True}
+            )
+        }
+        queries += 2
+
+        requests = list()
+        counts = {"subset": 0, "version": 0, "representation": 0,
+                  "update": 0}
+
+        for instance in instances:
+            subset, version, representations = instance.data["toDatabase"]
+
+            if subset["name"] not in existed_subsets:
+                existed_subsets.add(subset["name"])
+                requests.append(pymongo.InsertOne(subset))
+                counts["subset"] += 1
+
+            key = (subset["_id"], version["name"])
+            if key not in existed_versions:
+                version_id = instance.data.get("pregeneratedVersionId",
+                                               io.ObjectId())
+                version["_id"] = version_id
+                requests.append(pymongo.InsertOne(version))
+                counts["version"] += 1
+
+                for representation in representations:
+                    representation["parent"] = version_id
+                    requests.append(pymongo.InsertOne(representation))
+                    counts["representation"] += 1
+
+                instance.data["insertedVersionId"] = version_id
+
+                # Update dependent
+                field = "data.dependents." + str(version_id)
+                dependencies = instance.data["dependencies"]
+                for version_id_, data in dependencies.items():
+                    filter_ = {"_id": io.ObjectId(version_id_)}
+                    update = {"$set": {field: {"count": data["count"]}}}
+                    requests.append(pymongo.UpdateMany(filter_, update))
+                    counts["update"] += 1
+
+            else:
+                self.log.info("Version existed, representation file has "
+                              "been overwritten: %s" % subset["name"])
+                version_id = existed_versions[key]
+                filter_ = {"_id": version_id}
+                update = {"$set": {"data.time": context.data["time"]}}
+                requests.append(pymongo.UpdateMany(filter_, update))
+                counts["update"] += 1
+
+                for representation in representations:
+                    filter_ = {
+                        "name": representation["name"],
+                        "parent": version_id,
+                    }
+                    update = {"$set": {"data": representation["data"]}}
+                    requests.append(pymongo.UpdateMany(filter_, update))
+                    counts["update"] += 1
+
+        self.log.info("Writing {} requests to database ...".format(
+            len(requests)))
+        lib.bulk_write(requests)
+        queries += 1
+
+        elapsed = time.time() - start
+        counts["queries"] = queries
+        counts["seconds"] = elapsed
+        context.data["databaseReport"] = counts
+
+        self.log.info("Inserted {subset} subsets, {version} versions, "
+                      "{representation} representations, updated {update} "
+                      "documents with {queries} round trips in "
+                      "{seconds:.3f} sec.".format(**counts))
+
+        # Database written, drop cached documents and move version dirs
+        # into place
+        doccache.of(context).invalidate()
+        for instance in instances:
+            instance.data["versioner"].commit()
@@ -1,11 +1,7 @@
 
-import os
-import shutil
-
-import errno
 import pyblish.api
 from avalon import api, io
-from avalon.vendor import filelink
+from reveries import transfer
 
 
 class IntegrateAvalonSubset(pyblish.api.InstancePlugin):
@@ -53,6 +49,9 @@ class IntegrateAvalonSubset(pyblish.api.InstancePlugin):
         self.transfers = dict(packages=list(),
                               files=list(),
                               hardlinks=list())
+        # Representation data by package destination, for recording
+        # transfer strategy
+        self.package_data = dict()
 
         # Assemble data and create version, representations
         subset, version, representations = self.register(instance)
@@ -61,7 +60,7 @@ class IntegrateAvalonSubset(pyblish.api.InstancePlugin):
 
         # Integrate representations' files to shareable space
         self.log.info("Integrating representations to shareable space ...")
-        self.integrate()
+        self.integrate(instance)
 
     def register(self, instance):
 
@@ -132,16 +131,24 @@ class IntegrateAvalonSubset(pyblish.api.InstancePlugin):
             dst = repr_data.pop("representationDir")
 
             self.transfers["packages"].append([src, dst])
+            self.package_data[dst] = repr_data
 
         self.transfers["files"] += instance.data["files"]
         self.transfers["hardlinks"] += instance.data["hardlinks"]
 
         return subset, version, representations
 
-    def integrate(self):
+    def integrate(self, instance):
         """Move the files
 
-        Through `self.transfers`
+        Through `self.transfers`, files are transferred in parallel and
+        recorded into a manifest in version dir, so a half-finished
+        integration can be resumed.
+
+        Packages are renamed, reflinked or hardlinked into place if the
+        staging dir and publish root are on the same device, and only get
+        fully copied as last resort. The strategy used is recorded into
+        representation data as "transferStrategy".
 
         """
 
@@ -156,93 +163,28 @@ class IntegrateAvalonSubset(pyblish.api.InstancePlugin):
         #     \|________|
         #
 
-        transfered = list()
+        versioner = instance.data["versioner"]
+        engine = transfer.FileTransfer(
+            manifest_dir=versioner.staging_dir(),
+            logger=self.log,
+        )
 
         for job in self.transfers:
-            transfers = self.transfers[job]
-
-            for src, dst in transfers:
-                # normpath
-                # self.log.debug("Src. Before: {!r}".format(src))
-                # self.log.debug("Dst. Before: {!r}".format(dst))
-
-                src = os.path.abspath(
-                    os.path.normpath(os.path.expandvars(src)))
-                dst = os.path.abspath(
-                    os.path.normpath(os.path.expandvars(dst)))
-
-                self.log.debug("Src: {!r}".format(src))
-                self.log.debug("Dst: {!r}".format(dst))
-
+            for src, dst in self.transfers[job]:
                 self.log.info("Copying {0}: {1} -> {2}".format(job, src, dst))
-                if src == dst:
-                    self.log.debug("Source and destination are the same, "
-                                   "will not copy.")
-                    continue
-
-                if dst in transfered:
-                    # (TODO) Should not implement like this. This is a hot-fix.
-                    self.log.warning("File transfered: %s" % dst)
-                    continue
-
-                if job == "packages":
-                    self.copy_dir(src, dst)
-                if job == "files":
-                    self.copy_file(src, dst)
-                if job == "hardlinks":
-                    self.hardlink_file(src, dst)
-
-                transfered.append(dst)
-
-    def copy_dir(self, src, dst):
-        """ Copy given source to destination
-
-        Arguments:
-            src (str): the source dir which needs to be copied
-            dst (str): the destination of the sourc dir
-        Returns:
-            None
-        """
-        try:
-            shutil.copytree(src, dst)
-        except OSError as e:
-            if e.errno == errno.EEXIST:
-                msg = ("Representation dir existed, this should "
-                       "not happen. Copy aborted.")
-            else:
-                msg = "An unexpected error occurred."
-
-            self.log.critical(msg)
-            raise OSError(msg)
-
-    def copy_file(self, src, dst):
-        file_dir = os.path.dirname(dst)
-        if not os.path.isdir(file_dir):
-            os.makedirs(file_dir)
-
-        try:
-            shutil.copy2(src, dst)
-        except OSError:
-            msg = "An unexpected error occurred."
-            self.log.critical(msg)
-            raise OSError(msg)
-
-    def hardlink_file(self, src, dst):
-        if os.path.isfile(dst):
-            self.log.warning("File exists, skip creating hardlink: %s" % dst)
-            return
+                # Write into uncommitted version dir
+                engine.add(job, src, versioner.staging_path(dst))
 
-        dirname = os.path.dirname(dst)
         try:
-            os.makedirs(dirname)
-        except OSError as e:
-            if e.errno == errno.EEXIST:
-                pass
-            else:
-                self.log.critical("An unexpected error occurred.")
-                raise
-
-        filelink.create(src, dst, filelink.HARDLINK)
+            engine.run()
+        except (IOError, OSError):
+            self.log.critical("An unexpected error occurred.")
+            raise
+
+        for dst, repr_data in self.package_data.items():
+            strategy = engine.strategy_of(versioner.staging_path(dst))
+            if strategy is not None:
+                repr_data["transferStrategy"] = strategy
 
     def get_subset(self, instance, families):
 
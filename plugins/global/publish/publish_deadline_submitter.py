@@ -1,13 +1,20 @@
 
 import os
 import re
+import copy
+import time
+import shutil
 import logging
 import subprocess
+from multiprocessing.pool import ThreadPool
 import pyblish.api
 import avalon.api
 import avalon.io
-from avalon.vendor import requests
 from reveries import utils
+from reveries.deadline import (
+    jobs as deadline_jobs,
+    spool as deadline_spool,
+)
 
 
 class PublishDeadlineSubmitter(pyblish.api.ContextPlugin):
@@ -24,6 +31,26 @@ class PublishDeadlineSubmitter(pyblish.api.ContextPlugin):
 
 
 class DeadlineSubmitter(object):
+    """Queue Deadline jobs and submit them at once
+
+    Jobs are submitted in waves, each wave contains jobs that only depend
+    on jobs in previous waves, and jobs in one wave are submitted
+    concurrently over a pooled, keep-alive HTTP session.
+
+    When submitting via `deadlinecommand`, each wave is submitted with one
+    `-SubmitMultipleJobs` call instead of one process per job, and a queue
+    that is a single chain of jobs is submitted in one `-dependent` call.
+
+    """
+
+    # Max concurrent submissions
+    workers = 8
+    # Submit with `deadlinecommand -SubmitMultipleJobs`
+    batch_command = True
+    # Seconds to wait for web service response
+    timeout = 30
+    # Spool jobs when web service is down, instead of failing
+    spool_on_failure = True
 
     def __init__(self, context):
 
@@ -31,17 +58,20 @@ class DeadlineSubmitter(object):
 
         self._jobs = dict()
         self._submitted = dict()
+        # Submission time of each job, in seconds
+        self.latency = dict()
 
         self._cmd = None
         self._url = None
         self._auth = None
+        self._session = None
         self._environment = None
 
         if context.data.get("USE_DEADLINE_APP"):
             AVALON_DEADLINE_APP = avalon.api.Session["AVALON_DEADLINE_APP"]
 
             # E.g. C:/Program Files/Thinkbox/Deadline10/bin/deadlinecommand.exe
-            self._cmd = AVALON_DEADLINE_APP
+            self._cmd = [AVALON_DEADLINE_APP]
 
         else:
             AVALON_DEADLINE = avalon.api.Session["AVALON_DEADLINE"]
@@ -88,6 +118,21 @@ class DeadlineSubmitter(object):
 
         self._environment = environment
 
+        if self.spool_on_failure:
+            self._resume_spool()
+
+    def _resume_spool(self):
+        """Start flusher if submissions were left in spool by last session
+        """
+        try:
+            spool = deadline_spool.Spool()
+            if spool.next_due() is not None:
+                deadline_spool.start_flusher(spool)
+                self.log.info("Resumed spooled submissions in '%s'."
+                              % spool.root)
+        except Exception as e:
+            self.log.warning("Failed to resume spooled submissions: %s" % e)
+
     def instance_env(self, instance, environment=None):
         """
         """
@@ -121,52 +166,188 @@ class DeadlineSubmitter(object):
         self._jobs[index] = payload
         return index
 
+    def waves(self):
+        """Return queued job indices grouped in topological waves
+
+        Jobs in one wave only depend on jobs in previous waves or already
+        submitted ones.
+
+        Raises:
+            SubmissionError: If any dependency is unknown or circular.
+
+        """
+        return deadline_jobs.waves(self._jobs, self._submitted)
+
+    def chain(self, waves):
+        """Return job indices if waves are a single chain of jobs, or None
+
+        In a chain, each job only depends on the job before it, or already
+        submitted ones.
+
+        """
+        if len(waves) < 2 or any(len(wave) != 1 for wave in waves):
+            return None
+
+        chain = [wave[0] for wave in waves]
+        for previous, index in zip(chain, chain[1:]):
+            deps = self._jobs[index]["JobInfo"].get("JobDependencies", "")
+            if set(deps.split(",")) - set(self._submitted) != {previous}:
+                return None
+
+        return chain
+
     def submit(self):
-        """Submit all jobs"""
-        while self._jobs:
-            index, payload = self._jobs.popitem()
+        """Submit all jobs
+
+        If Deadline Web Service is down or not responding, jobs that were
+        not submitted are spooled and retried in background, see
+        `reveries.deadline.spool`.
+
+        """
+        waves = self.waves()
+        start = time.time()
+
+        chain = self.chain(waves) if self._batch() else None
+        queued = copy.deepcopy(self._jobs)
+
+        try:
+            if chain:
+                self._submit_chain(chain)
+            else:
+                for wave in waves:
+                    self._submit_wave(wave)
+
+        except deadline_jobs.ServiceUnavailable as e:
+            if not self.spool_on_failure:
+                raise
+
+            remaining = {index: payload for index, payload in queued.items()
+                         if index not in self._submitted}
+            spool = deadline_spool.Spool()
+            key = spool.put(self._url, remaining, self._submitted)
+            deadline_spool.start_flusher(spool)
+
+            self.log.warning(e)
+            self.log.warning("%d jobs spooled as '%s' in '%s', will be "
+                             "submitted in background."
+                             "" % (len(remaining), key, spool.root))
+            self._jobs.clear()
+            return
+
+        finally:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+        if self.latency:
+            self.log.info("Submitted %d jobs in %d waves, took %.2f sec. "
+                          "(slowest job %.2f sec.)"
+                          "" % (len(self.latency),
+                                len(waves),
+                                time.time() - start,
+                                max(self.latency.values())))
+
+    def _submit_wave(self, wave):
+        jobs = list()
+        for index in wave:
+            payload = self._jobs.pop(index)
 
             deps = payload["JobInfo"].get("JobDependencies")
             if deps:
-                dep_jobids = list()
-                for _index in deps.split(","):
-                    if _index in self._submitted:
-                        _jobid = self._submitted[_index]
-                    else:
-                        _payload = self._jobs.pop(_index)
-                        _jobid = self._submit(_index, _payload)
+                dep_jobids = [self._submitted[_index]
+                              for _index in deps.split(",")]
+                payload["JobInfo"]["JobDependencies"] = ",".join(dep_jobids)
+
+            jobs.append((index, payload))
+
+        if self._batch() and len(jobs) > 1:
+            self._submit_batch(jobs)
+            return
+
+        if len(jobs) == 1 or self.workers <= 1:
+            for index, payload in jobs:
+                self._submit(index, payload)
+            return
+
+        pool = ThreadPool(min(self.workers, len(jobs)))
+        try:
+            pool.map(lambda job: self._submit(*job), jobs)
+        finally:
+            pool.close()
+            pool.join()
+
+    def _batch(self):
+        return bool(self._cmd) and self.batch_command
+
+    def _submit_chain(self, chain):
+        jobs = list()
+        for previous, index in zip([None] + chain, chain):
+            payload = self._jobs.pop(index)
+            job_info = payload["JobInfo"]
+
+            # Dependency on previous job is set by `-dependent`
+            deps = [self._submitted[_index]
+                    for _index in job_info.get("JobDependencies",
+                                               "").split(",")
+                    if _index and _index != previous]
+            if deps:
+                job_info["JobDependencies"] = ",".join(deps)
+            else:
+                job_info.pop("JobDependencies", None)
 
-                    dep_jobids.append(_jobid)
+            jobs.append((index, payload))
 
-                payload["JobInfo"]["JobDependencies"] = ",".join(dep_jobids)
+        self._submit_batch(jobs, dependent=True)
+
+    def _submit_batch(self, jobs, dependent=False):
+        start = time.time()
+
+        jobids = self._via_command_batch([payload for _, payload in jobs],
+                                         dependent=dependent)
+        elapsed = time.time() - start
 
-            self._submit(index, payload)
+        for (index, _), jobid in zip(jobs, jobids):
+            self._submitted[index] = jobid
+            self.latency[index] = elapsed
+
+        self.log.info("Success. JobIDs: %s (%.2f sec.)"
+                      "" % (", ".join(jobids), elapsed))
 
     def _submit(self, index, payload):
+        start = time.time()
+
         if self._cmd:
             jobid = self._via_command(payload)
         else:
             jobid = self._via_web_service(payload)
 
         self._submitted[index] = jobid
+        self.latency[index] = time.time() - start
 
-        return jobid
+        self.log.info("Success. JobID: %s (%.2f sec.)"
+                      "" % (jobid, self.latency[index]))
 
-    def _via_web_service(self, payload):
-        response = requests.post(self._url,
-                                 json=payload,
-                                 auth=tuple(self._auth))
+        return jobid
 
-        if not response.ok:
-            msg = response.text
-            self.log.error(msg)
-            raise Exception("Submission failed...")
-        else:
-            jobid = eval(response.text)["_id"]
-            self.log.info("Success. JobID: %s" % jobid)
-            return jobid
+    def session(self):
+        """Return HTTP session that keeps connections alive between jobs"""
+        if self._session is None:
+            self._session = deadline_jobs.http_session(self._auth,
+                                                       self.workers)
+        return self._session
 
-    def _via_command(self, payload):
+    def _via_web_service(self, payload):
+        try:
+            return deadline_jobs.post_job(self.session(),
+                                          self._url,
+                                          payload,
+                                          timeout=self.timeout)
+        except deadline_jobs.SubmissionError as e:
+            self.log.error(e)
+            raise
+
+    def _write_info(self, info_dir, number, payload):
+        """Write job and plugin info files, return their paths"""
 
         def to_txt(document, out):
             # Write dict to key-value txt file
@@ -174,26 +355,52 @@ class DeadlineSubmitter(object):
                 for key, val in document.items():
                     fp.write("{key}={val}\n".format(key=key, val=val))
 
-        job_info = payload["JobInfo"]
-        plugin_info = payload["PluginInfo"]
+        job_info_file = os.path.join(info_dir, "job_info_%d.job" % number)
+        plugin_info_file = os.path.join(info_dir,
+                                        "plugin_info_%d.job" % number)
 
-        info_dir = utils.temp_dir(prefix="deadline_")
-        job_info_file = os.path.join(info_dir, "job_info.job")
-        plugin_info_file = os.path.join(info_dir, "plugin_info.job")
+        to_txt(payload["JobInfo"], job_info_file)
+        to_txt(payload["PluginInfo"], plugin_info_file)
 
-        to_txt(job_info, job_info_file)
-        to_txt(plugin_info, plugin_info_file)
-
-        cmd = self._cmd
-
-        cmd += " %s %s" % (job_info_file, plugin_info_file)
-        output = subprocess.check_output(cmd)
+        return [job_info_file, plugin_info_file]
 
+    def _run_command(self, args, count):
+        """Run `deadlinecommand`, return submitted job ids in order"""
+        output = subprocess.check_output(self._cmd + args)
         output = output.decode("utf-8")
-        if "Result=Success" not in output.split():
+
+        jobids = re.findall(r"^JobID=(\S+)", output, re.MULTILINE)
+        if ("Result=Success" not in output.split() or
+                len(jobids) != count):
+            self.log.error(output)
             raise Exception("Submission failed...")
-        else:
-            parts = re.split("[=\n\r]", output)
-            jobid = parts[parts.index("JobID") + 1]
-            self.log.info("Success. JobID: %s" % jobid)
-            return jobid
+
+        return jobids
+
+    def _via_command(self, payload):
+        info_dir = utils.temp_dir(prefix="deadline_")
+        try:
+            args = self._write_info(info_dir, 0, payload)
+            return self._run_command(args, 1)[0]
+        finally:
+            shutil.rmtree(info_dir, ignore_errors=True)
+
+    def _via_command_batch(self, payloads, dependent=False):
+        """Submit jobs with one `deadlinecommand -SubmitMultipleJobs`
+
+        Job ids are returned in the same order of payloads. With
+        `dependent`, each job depends on the job before it.
+
+        """
+        info_dir = utils.temp_dir(prefix="deadline_")
+        try:
+            args = ["-SubmitMultipleJobs"]
+            if dependent:
+                args.append("-dependent")
+            for number, payload in enumerate(payloads):
+                args.append("-job")
+                args += self._write_info(info_dir, number, payload)
+
+            return self._run_command(args, len(payloads))
+        finally:
+            shutil.rmtree(info_dir, ignore_errors=True)
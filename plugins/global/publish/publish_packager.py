@@ -43,7 +43,8 @@ class PublishPackager(object):
 
         The default staging directory is generated by `tempfile.mkdtemp()` with
         "pyblish_tmp_" prefix, but if the extraction method get decorated with
-        `skip_stage`, the staging directory will be the publish directory.
+        `skip_stage`, the staging directory will be the publish directory
+        (or it's uncommitted partial dir, see `PublishVersioner`).
 
         Args:
             with_representation (bool): Whether to append representation dir to
@@ -58,7 +59,8 @@ class PublishPackager(object):
 
         if not staging_dir:
             if self._skip_stage:
-                staging_dir = self._data["versionDir"]
+                versioner = self._data["versioner"]
+                staging_dir = versioner.staging_dir()
             else:
                 staging_dir = utils.temp_dir(prefix="pyblish_tmp_")
 
@@ -85,6 +87,16 @@ class PublishPackager(object):
 
         return pkg_dir
 
+    def published_dir(self):
+        """Return the final published path of current representation
+
+        Use this instead of the path returned from `create_package` when
+        the path needs to be embedded into published content, because the
+        version dir may not be committed into place during extraction.
+
+        """
+        return os.path.join(self._data["versionDir"], self._representation)
+
     def set_representation(self, representation):
         self._representation = representation
 
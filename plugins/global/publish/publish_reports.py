@@ -41,3 +41,20 @@ class PublishReports(pyblish.api.ContextPlugin):
                 self.log.info("    {}".format(package))
 
             self.log.info("")
+
+        report = context.data.get("databaseReport")
+        if report:
+            self.log.info("Database:")
+            self.log.info("    Inserted {subset} subsets, {version} versions, "
+                          "{representation} representations".format(**report))
+            self.log.info("    Updated {update} documents".format(**report))
+            self.log.info("    {queries} round trips in {seconds:.3f} sec"
+                          "".format(**report))
+            self.log.info("")
+
+        cache = context.data.get("documentCache")
+        if cache is not None:
+            self.log.info("Document Cache:")
+            self.log.info("    {hits} hits, {misses} misses ({ratio:.0%})"
+                          "".format(**cache.stats()))
+            self.log.info("")
@@ -7,6 +7,7 @@ import pyblish.api
 import avalon.api
 import avalon.io
 import reveries.lib
+from reveries import versiondir, doccache
 
 
 class CollectPublishVersioner(pyblish.api.InstancePlugin):
@@ -21,6 +22,15 @@ class CollectPublishVersioner(pyblish.api.InstancePlugin):
 
 
 class PublishVersioner(object):
+    """Resolve next version dir and manage it's life cycle
+
+    For local publishes, files are written into a hidden partial dir next
+    to the final version dir (see `reveries.versiondir`), which will be
+    renamed into place by `commit` after the database write succeeded.
+    Publishes that are delegated to or running on Deadline write into the
+    final version dir directly, since the path has been sent to the farm.
+
+    """
 
     META_FILE = ".publish.meta.json"
 
@@ -54,7 +64,9 @@ class PublishVersioner(object):
         self._template_data = template_data
 
         self._version_dir = ""
+        self._staging_dir = ""
         self._version_num = 0
+        self._committed = False
         self._data = instance.data
         self._metadata = {
             "source": source,
@@ -65,20 +77,23 @@ class PublishVersioner(object):
         }
         self._in_remote = reveries.lib.in_remote()
         self._to_remote = reveries.lib.to_remote()
+        self._journaled = not (self._in_remote or self._to_remote)
         self._asset_id = context.data["assetDoc"]["_id"]
+        self._cache = doccache.of(context)
 
     def __repr__(self):
         return "PublishVersioner(versionNum: %03d, versionDir: %s)" % (
             self._version_num, self._version_dir)
 
     def _metadata_path(self):
-        return os.path.join(self._version_dir, self.META_FILE)
+        return os.path.join(self.staging_dir(), self.META_FILE)
 
     def _is_available(self):
         if self._in_remote:
             return True
 
-        metadata_path = self._metadata_path()
+        # Always check on the final version dir
+        metadata_path = os.path.join(self._version_dir, self.META_FILE)
 
         if os.path.isfile(metadata_path):
 
@@ -100,6 +115,17 @@ class PublishVersioner(object):
         if self._in_remote:
             return True
 
+        if self._journaled:
+            # Move previous leftover aside instead of deleting in place,
+            # `versiondir.sweep` will remove them later.
+            versiondir.move_aside(self._version_dir)
+            self._staging_dir = versiondir.prepare(
+                self._version_dir,
+                subset=self._data["subset"],
+                version=self._version_num,
+            )
+            return True
+
         version_dir = self._version_dir
 
         if os.path.isdir(version_dir):
@@ -135,7 +161,7 @@ class PublishVersioner(object):
             version = None
             version_number = 1  # assume there is no version yet, start at 1
 
-            subset = avalon.io.find_one({
+            subset = self._cache.find_one({
                 "type": "subset",
                 "parent": self._asset_id,
                 "name": self._data["subset"],
@@ -178,6 +204,49 @@ class PublishVersioner(object):
 
         return version_dir
 
+    def staging_dir(self):
+        """Return the dir that version files actually being written into
+
+        This is the partial dir before commit if journaled, or the version
+        dir.
+
+        """
+        if self._journaled and not self._committed:
+            return self._staging_dir
+        return self._version_dir
+
+    def staging_path(self, path):
+        """Map path under version dir to where it should be written now
+
+        Arguments:
+            path (str): File or dir path
+
+        """
+        path = os.path.abspath(os.path.normpath(os.path.expandvars(path)))
+        staging_dir = self.staging_dir()
+        if staging_dir == self._version_dir:
+            return path
+
+        version_dir = self._version_dir
+        if path == version_dir:
+            return staging_dir
+        if path.startswith(version_dir + os.sep):
+            return staging_dir + path[len(version_dir):]
+        return path
+
+    def commit(self):
+        """Rename partial dir into place as the version dir
+
+        Should be called after the database write succeeded.
+
+        """
+        if not self._journaled or self._committed:
+            return
+
+        self.log.info("Committing version dir: %s" % self._version_dir)
+        versiondir.commit(self._version_dir)
+        self._committed = True
+
     def representation_dir(self, name):
         return self._template_publish.format(version=self._version_num,
                                              representation=name,
@@ -54,7 +54,7 @@ class ValidateDeadlineConnection(pyblish.api.ContextPlugin):
             if not os.path.isfile(AVALON_DEADLINE_APP):
                 raise Exception("Deadline Command App not exists.")
 
-            test_cmd = AVALON_DEADLINE_APP + " GetRepositoryVersion"
+            test_cmd = [AVALON_DEADLINE_APP, "GetRepositoryVersion"]
             output = subprocess.check_output(test_cmd)
 
             if output.startswith(b"Repository Version:"):
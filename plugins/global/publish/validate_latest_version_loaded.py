@@ -2,6 +2,7 @@
 import pyblish.api
 import avalon.api
 import avalon.io as io
+from reveries import lib
 
 
 class ValidateLatestVersionLoaded(pyblish.api.ContextPlugin):
@@ -16,42 +17,26 @@ class ValidateLatestVersionLoaded(pyblish.api.ContextPlugin):
     def process(self, context):
         host = avalon.api.registered_host()
 
-        checked = set()
-        outdated = dict()
+        nodes_by_id = dict()
+        for container in host.ls():
+            representation_id = io.ObjectId(container["representation"])
+            nodes = nodes_by_id.setdefault(representation_id, list())
+            nodes.append(container["objectName"])
+
+        resolved = lib.resolve_latest(list(nodes_by_id))
 
+        outdated = dict()
         # We may have missing representation due to the limited
         # environment. E.g. When Out sourcing the rendering job
         # and the database overthere is incomplete.
         missing = dict()
 
-        for container in host.ls():
-            container_node = container["objectName"]
-            representation_id = io.ObjectId(container["representation"])
-
-            if representation_id in checked:
-                if representation_id in outdated:
-                    outdated[representation_id].append(container_node)
-
-                if representation_id in missing:
-                    missing[representation_id].append(container_node)
-
-                continue
-
-            checked.add(representation_id)
-
-            representation = io.find_one({"_id": representation_id})
-            if representation is None:
-                missing[representation_id] = [container_node]
-
-                continue
-
-            version = io.find_one({"_id": representation["parent"]})
-            highest_version = io.find_one({"type": "version",
-                                           "parent": version["parent"]},
-                                          sort=[("name", -1)])
-
-            if version["name"] < highest_version["name"]:
-                outdated[representation_id] = [container_node]
+        for representation_id, nodes in nodes_by_id.items():
+            result = resolved[representation_id]
+            if result is None:
+                missing[representation_id] = nodes
+            elif result["outdated"]:
+                outdated[representation_id] = nodes
 
         if outdated:
             nodes = "\n".join(n for x in outdated.values() for n in x)
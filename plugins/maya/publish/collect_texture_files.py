@@ -8,6 +8,9 @@ class CollectTextureFiles(pyblish.api.InstancePlugin):
     Get file name pattern from file node and all files that exists in storage
     by the pattern string with color space setting.
 
+    keys in context.data:
+        * dirScanner
+
     """
 
     order = pyblish.api.CollectorOrder + 0.4
@@ -20,11 +23,15 @@ class CollectTextureFiles(pyblish.api.InstancePlugin):
 
     def process(self, instance):
         from maya import cmds
+        from reveries import dirscan
         from reveries.maya import lib
 
         file_nodes = instance.data.get("fileNodes",
                                        cmds.ls(instance, type="file"))
-        file_count, file_data = lib.profiling_file_nodes(file_nodes)
+        # Texture dirs are listed once per publish, and the file stats are
+        # kept for later validators and extractors.
+        scanner = dirscan.of(instance.context)
+        file_count, file_data = lib.profiling_file_nodes(file_nodes, scanner)
 
         instance.data["fileData"] = file_data
 
@@ -7,7 +7,7 @@ import pyblish.api
 import avalon.api
 from reveries.plugins import PackageExtractor
 from reveries.maya import capsule
-from reveries import lib
+from reveries import lib, assrewrite
 
 from maya import cmds, mel
 
@@ -53,7 +53,8 @@ class ExtractArnoldStandIn(PackageExtractor):
             "fileNodeAttrs": file_node_attrs,
             "member": self.member,
             "cachePath": cache_path,
-            "hasYeti": self.data.get("hasYeti", False)
+            "hasYeti": self.data.get("hasYeti", False),
+            "byFrameStep": self.data["byFrameStep"],
         }
         data_path = os.path.join(package_path, ".remoteData.json")
 
@@ -65,7 +66,7 @@ class ExtractArnoldStandIn(PackageExtractor):
             return
 
         elif lib.in_remote():
-            self.log.info("Stand-In exported via per-frame script.")
+            self.log.info("Stand-In exported via frame block script.")
 
         else:
             self.export_ass(data,
@@ -137,17 +138,9 @@ class ExtractArnoldStandIn(PackageExtractor):
             root = avalon.api.registered_root().replace("\\", "/")
             project = avalon.api.Session["AVALON_PROJECT"]
 
-            for ass in asses:
-                lines = list()
-                has_change = False
-                with open(ass, "r") as assf:
-                    for line in assf.readlines():
-                        if line.startswith(" filename "):
-                            line = line.replace(root, "[AVALON_PROJECTS]", 1)
-                            line = line.replace(project, "[AVALON_PROJECT]", 1)
-                            has_change = True
-                        lines.append(line)
-
-                if has_change:
-                    with open(ass, "w") as assf:
-                        assf.write("".join(lines))
+            rules = assrewrite.embedding_rules(root, project)
+            # Threads in GUI session, forking Maya would copy the whole
+            # session. On farm, processes if running in mayapy.
+            assrewrite.rewrite_files(asses,
+                                     rules,
+                                     threads=not lib.in_remote())
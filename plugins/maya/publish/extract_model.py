@@ -126,19 +126,13 @@ class ExtractModel(PackageExtractor):
     def hash(self, mesh_nodes):
         # Hash model and collect Avalon UUID
         geo_id_and_hash = dict()
-        hasher = utils.MeshHasher()
-        for mesh in mesh_nodes:
+        digests = utils.hash_meshes(mesh_nodes)
+        for mesh, result in zip(mesh_nodes, digests):
             # Get ID
             transform = cmds.listRelatives(mesh, parent=True, fullPath=True)[0]
             id = utils.get_id(transform)
             assert id is not None, ("Some mesh has no Avalon UUID. "
                                     "This should not happend.")
-            hasher.set_mesh(mesh)
-            hasher.update_points()
-            hasher.update_normals()
-            hasher.update_uvmap()
-
-            result = hasher.digest()
             result["hierarchy"] = transform
 
             # May have duplicated Id
@@ -146,6 +140,4 @@ class ExtractModel(PackageExtractor):
                 geo_id_and_hash[id] = list()
             geo_id_and_hash[id].append(result)
 
-            hasher.clear()
-
         return geo_id_and_hash
@@ -4,6 +4,7 @@ import json
 import pyblish.api
 import reveries.utils
 import reveries.lib
+import reveries.doccache
 
 from avalon.vendor import clique
 # from reveries.plugins import DelegatablePackageExtractor
@@ -102,7 +103,9 @@ class ExtractRender(PackageExtractor):
                        sequence.tail)
 
         project = self.context.data["projectDoc"]
-        e_in, e_out, handles, _ = reveries.utils.get_timeline_data(project)
+        cache = reveries.doccache.of(self.context)
+        e_in, e_out, handles, _ = reveries.utils.get_timeline_data(
+            project, cache=cache)
         camera = self.data["camera"]
 
         packager.add_data({"sequence": {
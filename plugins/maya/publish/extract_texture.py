@@ -6,7 +6,7 @@ import pyblish.api
 import avalon.api
 import avalon.io
 
-from reveries import lib
+from reveries import lib, casstore, dirscan, fileinventory
 from reveries.plugins import PackageExtractor
 from reveries.maya.plugins import env_embedded_path
 from reveries.maya import lib as maya_lib
@@ -33,8 +33,8 @@ class ExtractTexture(PackageExtractor):
 
         packager.skip_stage()
 
-        package_path = packager.create_package()
-        package_path = env_embedded_path(package_path)
+        packager.create_package()
+        package_path = env_embedded_path(packager.published_dir())
 
         # For storing calculated published file path for look or lightSet
         # extractors to update file path.
@@ -47,6 +47,18 @@ class ExtractTexture(PackageExtractor):
 
         self.use_tx = self.data.get("useTxMaps", False)
 
+        # Optional content-addressable store
+        self.cas_root = casstore.store_root()
+        if self.cas_root and not casstore.linkable(self.cas_root,
+                                                   packager.published_dir()):
+            self.log.warning("Content store '%s' is not on the same file "
+                             "system as publish dir, not using it."
+                             "" % self.cas_root)
+            self.cas_root = None
+
+        # Reuse file stats taken while collecting
+        scanner = dirscan.of(self.context)
+
         file_inventory = list()
         previous_by_fpattern = dict()
         current_by_fpattern = dict()
@@ -113,12 +125,14 @@ class ExtractTexture(PackageExtractor):
 
                     abs_previous = previous_files.get(file, "")
 
-                    if not os.path.isfile(abs_previous):
+                    if not scanner.isfile(abs_previous):
                         # Previous file not exists (should not happen)
                         break  # Try previous version
 
                     # Checking on file size and modification time
-                    same_file = lib.file_cmp(abs_path, abs_previous)
+                    same_file = lib.file_cmp(abs_path,
+                                             abs_previous,
+                                             scanner)
                     if not same_file:
                         # Possible new files
                         break  # Try previous version
@@ -128,7 +142,7 @@ class ExtractTexture(PackageExtractor):
                 else:
                     # Version matched, consider as same file
                     head_file = sorted(all_files)[0]
-                    resolved_path = abs_previous[:-len(file)] + head_file
+                    resolved_path = tmp_data["dir"] + "/" + head_file
                     resolved_path = env_embedded_path(resolved_path)
                     self.update_file_node_attrs(file_nodes,
                                                 resolved_path,
@@ -144,9 +158,29 @@ class ExtractTexture(PackageExtractor):
                     break
 
             else:
-                # Not match with any previous version, consider as new file
-                self.log.info("New texture collected from '%s': %s"
-                              "" % (data["node"], fpattern))
+                # Not fully matched with any previous version. Files that
+                # are unchanged since a previous version will be linked
+                # from there, only changed files get transferred.
+                reusable = dict()
+                for file, abs_path in data["pathMap"].items():
+                    for ver_data, tmp_data in versioned_data:
+                        abs_previous = tmp_data["pathMap"].get(file)
+                        if (abs_previous and
+                                scanner.isfile(abs_previous) and
+                                lib.file_cmp(abs_path, abs_previous, scanner)):
+                            reusable[file] = (ver_data, abs_previous)
+                            break
+
+                if reusable:
+                    self.log.info("Texture partially changed from '%s': %s "
+                                  "(%d of %d files)"
+                                  "" % (data["node"],
+                                        fpattern,
+                                        len(data["fnames"]) - len(reusable),
+                                        len(data["fnames"])))
+                else:
+                    self.log.info("New texture collected from '%s': %s"
+                                  "" % (data["node"], fpattern))
 
                 file_inventory.append({
                     "fpattern": fpattern,
@@ -155,27 +189,88 @@ class ExtractTexture(PackageExtractor):
                     "fnames": data["fnames"],
                 })
 
+                file_versions = dict()
+                content_ids = dict()
                 all_files = list()
                 for file, abs_path in data["pathMap"].items():
                     final_path = package_path + "/" + file
-                    packager.add_file(abs_path, final_path)
 
-                    if self.use_tx:
-                        # Upload .tx file as well
-                        tx_abs_path = to_tx(abs_path)
-                        tx_final_path = to_tx(final_path)
-                        packager.add_file(tx_abs_path, tx_final_path)
+                    if file in reusable:
+                        ver_data, abs_previous = reusable[file]
+                        owners = fileinventory.file_versions_of(ver_data)
+                        file_versions[file] = owners.get(file,
+                                                         ver_data["version"])
+                        previous_ids = fileinventory.content_ids_of(
+                            ver_data)
+
+                        packager.add_hardlink(abs_previous, final_path)
+                        content_ids[file] = previous_ids.get(file)
+
+                        tx_previous = to_tx(abs_previous)
+                        if self.use_tx and scanner.isfile(tx_previous):
+                            packager.add_hardlink(tx_previous,
+                                                  to_tx(final_path))
+                            content_ids[to_tx(file)] = previous_ids.get(
+                                to_tx(file))
+
+                        elif self.use_tx:
+                            content_ids[to_tx(file)] = self.add_file(
+                                packager, to_tx(abs_path), to_tx(final_path))
+
+                    else:
+                        file_versions[file] = new_version
+                        content_ids[file] = self.add_file(packager,
+                                                          abs_path,
+                                                          final_path)
+
+                        if self.use_tx:
+                            # Upload .tx file as well
+                            tx_abs_path = to_tx(abs_path)
+                            tx_final_path = to_tx(final_path)
+                            content_ids[to_tx(file)] = self.add_file(
+                                packager, tx_abs_path, tx_final_path)
 
                     all_files.append(file)
 
+                if reusable:
+                    # Each file maps to the version that owns it, though
+                    # all of them are linked into this version as well.
+                    file_inventory[-1]["fileVersions"] = \
+                        fileinventory.file_version_pairs(file_versions)
+
+                if self.cas_root:
+                    file_inventory[-1]["contentIds"] = \
+                        fileinventory.content_id_pairs(content_ids)
+
                 head_file = sorted(all_files)[0]
                 resolved_path = package_path + "/" + head_file
                 self.update_file_node_attrs(file_nodes,
                                             resolved_path,
                                             current_color_space)
 
+        # Store file names as ranges where possible, to keep the document
+        # small for long sequences and big UDIM sets.
+        file_inventory = fileinventory.compact_inventory(file_inventory)
         packager.add_data({"fileInventory": file_inventory})
 
+    def add_file(self, packager, src, dst):
+        """Queue file for transfer, through content store if enabled
+
+        Returns:
+            str: Content ID if stored, or None
+
+        """
+        if not self.cas_root:
+            packager.add_file(src, dst)
+            return None
+
+        content_id, blob, stored = casstore.store(self.cas_root, src)
+        if not stored:
+            self.log.debug("Content exists in store: %s" % src)
+        packager.add_hardlink(blob, dst)
+
+        return content_id
+
     def update_file_node_attrs(self, file_nodes, path, color_space):
         from reveries.maya import lib
 
@@ -25,6 +25,7 @@ class SubmitDeadlineRender(pyblish.api.InstancePlugin):
 
     def process(self, instance):
         import reveries
+        from reveries.deadline import chunking
 
         reveries_path = reveries.__file__
 
@@ -91,6 +92,17 @@ class SubmitDeadlineRender(pyblish.api.InstancePlugin):
             step=frame_step,
         )
 
+        # Chunk size from previous render time of this renderlayer
+        stats_key = chunking.stats_key(project["name"], asset, subset,
+                                       "render")
+        scheduler = chunking.of(context)
+        if scheduler is not None:
+            frame_per_task = scheduler.chunk_size(
+                stats_key,
+                default=frame_per_task,
+                frame_count=len(range(frame_start, frame_end + 1, frame_step))
+            )
+
         output_path_keys = dict()
         for count, outpath in enumerate(instance.data["outputPaths"].values()):
             head, tail = os.path.split(outpath)
@@ -120,6 +132,8 @@ class SubmitDeadlineRender(pyblish.api.InstancePlugin):
                 "InitialStatus": init_state,
 
                 "ExtraInfo0": project["name"],
+                "ExtraInfoKeyValue0": "%s=%s" % (chunking.TASK_STATS_KEY,
+                                                 stats_key),
             },
             "PluginInfo": {
                 # Input
@@ -192,6 +206,7 @@ class SubmitDeadlineRender(pyblish.api.InstancePlugin):
         # Clean up
         payload["JobInfo"].pop("Frames")
         payload["JobInfo"].pop("ChunkSize")
+        payload["JobInfo"].pop("ExtraInfoKeyValue0")
         # Update
         payload["JobInfo"].update({
             "Name": "|| Publish: " + payload["JobInfo"]["Name"],
@@ -20,6 +20,7 @@ class SubmitDeadlineStandIn(pyblish.api.InstancePlugin):
 
     def process(self, instance):
         import reveries
+        from reveries.deadline import chunking
 
         reveries_path = reveries.__file__
         script_file = os.path.join(os.path.dirname(reveries_path),
@@ -74,6 +75,21 @@ class SubmitDeadlineStandIn(pyblish.api.InstancePlugin):
             step=frame_step,
         )
 
+        # Export contiguous frame blocks per task, sized by previous scene
+        # load and export time of this subset, so cheap exports won't pay
+        # scene loading on every frame.
+        stats_key = chunking.stats_key(project["name"], asset, subset,
+                                       "standin")
+        scheduler = chunking.of(context)
+        if scheduler is None:
+            frame_per_task = 1
+        else:
+            frame_per_task = scheduler.block_size(
+                stats_key,
+                default=1,
+                frame_count=len(range(frame_start, frame_end + 1, frame_step))
+            )
+
         job_name = "{subset} v{version:0>3}".format(
             subset=subset,
             version=version,
@@ -94,9 +110,11 @@ class SubmitDeadlineStandIn(pyblish.api.InstancePlugin):
                 "Group": deadline_group,
 
                 "Frames": frames,
-                "ChunkSize": 1,
+                "ChunkSize": frame_per_task,
 
                 "ExtraInfo0": project["name"],
+                "ExtraInfoKeyValue0": "%s=%s" % (chunking.TASK_STATS_KEY,
+                                                 stats_key),
             },
             "PluginInfo": {
 
@@ -166,6 +184,7 @@ class SubmitDeadlineStandIn(pyblish.api.InstancePlugin):
         # Clean up
         payload["JobInfo"].pop("Frames")
         payload["JobInfo"].pop("ChunkSize")
+        payload["JobInfo"].pop("ExtraInfoKeyValue0")
         # Update
         payload["JobInfo"].update({
             "Name": "|| Publish: " + payload["JobInfo"]["Name"],
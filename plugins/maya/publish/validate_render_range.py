@@ -2,7 +2,7 @@
 import pyblish.api
 from reveries.maya import pipeline
 from reveries.plugins import RepairInstanceAction
-from reveries import utils
+from reveries import utils, doccache
 
 
 class SetRenderRange(RepairInstanceAction):
@@ -14,8 +14,10 @@ class SetRenderRange(RepairInstanceAction):
 def get_render_range(instance):
     project = instance.context.data["projectDoc"]
     asset_name = pipeline.has_turntable()
-    proj_start, proj_end, _ = utils.compose_timeline_data(project,
-                                                          asset_name)
+    proj_start, proj_end, _ = utils.compose_timeline_data(
+        project,
+        asset_name,
+        cache=doccache.of(instance.context))
     return proj_start, proj_end
 
 
@@ -2,7 +2,7 @@
 import pyblish.api
 from avalon import io
 from reveries.maya import pipeline
-from reveries import utils, lib
+from reveries import utils, lib, doccache
 
 
 class ValidateRenderResolution(pyblish.api.InstancePlugin):
@@ -54,8 +54,10 @@ class ValidateRenderResolution(pyblish.api.InstancePlugin):
             if exception is not None:
                 valid_resolutions += exception.get("resolution", [])
 
-        proj_width, proj_height = utils.get_resolution_data(project,
-                                                            is_turntable)
+        proj_width, proj_height = utils.get_resolution_data(
+            project,
+            is_turntable,
+            cache=doccache.of(instance.context))
         valid_resolutions.append((proj_width, proj_height))
 
         scene_width, scene_height = instance.data["resolution"]
@@ -2,6 +2,7 @@
 import os
 import pyblish.api
 
+from reveries import dirscan
 from reveries.maya import plugins
 
 
@@ -35,13 +36,14 @@ class ValidateTextureFilesExists(pyblish.api.InstancePlugin):
     @classmethod
     def get_invalid(cls, instance):
         invalid = dict()
+        scanner = dirscan.of(instance.context)
 
         for data in instance.data.get("fileData", []):
             node = data["node"]
             for file in data["fnames"]:
                 file_path = os.path.join(data["dir"], file)
 
-                if not os.path.isfile(file_path):
+                if not scanner.isfile(file_path):
                     if node not in invalid:
                         invalid[node] = [file_path]
                     else:
@@ -1,5 +1,4 @@
 
-import os
 import pyblish.api
 from reveries.plugins import (
     SelectInvalidInstanceAction,
@@ -171,7 +170,8 @@ class ValidateTextureFilesUniqueNamed(pyblish.api.InstancePlugin):
     """Ensure texture file name unique
 
     Each file name (pattern) should be unique named, unless the duplicated
-    name pattern were actually same image contents.
+    name pattern were actually same image contents, which is compared by
+    file size, sampled hash and then full content hash.
 
     """
 
@@ -190,7 +190,7 @@ class ValidateTextureFilesUniqueNamed(pyblish.api.InstancePlugin):
 
     @classmethod
     def get_invalid(cls, instance):
-        from reveries import lib
+        from reveries import utils, dirscan
 
         # (NOTE) See the code below..
         instance.data["fileNodesToIgnore"] = set()
@@ -233,38 +233,42 @@ class ValidateTextureFilesUniqueNamed(pyblish.api.InstancePlugin):
         # forgiven, but only one of them will be extracted.
 
         consider_duplicated = set()
+        # Files that should have identical content, by pattern
+        groups_by_fpattern = dict()
 
         for fpattern, dup_data in duplicated_data.items():
 
-            # Checking on file count
-            file_counts = set([len(data["fnames"]) for data in dup_data])
-            if not len(file_counts) == 1:
-                # File counts not matched, consider duplicated.
+            # Checking on file names (and count)
+            fname_sets = set([tuple(sorted(data["fnames"]))
+                              for data in dup_data])
+            if not len(fname_sets) == 1:
+                # File names not matched, consider duplicated.
                 consider_duplicated.add(fpattern)
                 continue
 
-            # Checking on each files' name, size and modification time
-            file_matrix = set()
-
-            for data in dup_data:
-                dir_name = data["dir"]
-
-                feature_set = list()
-
-                for fname in data["fnames"]:
-                    file_path = dir_name + "/" + fname
-                    fsize = os.path.getsize(file_path)
-                    fmtime = lib.soft_mtime(file_path)
-
-                    features = (fname, fsize, fmtime)
-                    feature_set.append(features)
-
-                file_matrix.add(tuple(feature_set))
+            groups_by_fpattern[fpattern] = [
+                [data["dir"] + "/" + fname for data in dup_data]
+                for fname in fname_sets.pop()
+            ]
+
+        # Checking on each files' content in stages (size, sampled hash,
+        # full hash), file modification time is not compared.
+        fpatterns = sorted(groups_by_fpattern)
+        groups = [group for fpattern in fpatterns
+                  for group in groups_by_fpattern[fpattern]]
+        identical = iter(utils.identical_files(
+            groups,
+            scanner=dirscan.of(instance.context),
+        ))
+
+        for fpattern in fpatterns:
+            results = [next(identical)
+                       for _ in groups_by_fpattern[fpattern]]
+            if not all(results):
+                # File contents not matched, consider duplicated.
+                consider_duplicated.add(fpattern)
 
-                if len(file_matrix) > 1:
-                    # File features not matched, consider duplicated.
-                    consider_duplicated.add(fpattern)
-                    break
+        for fpattern, dup_data in duplicated_data.items():
 
             if fpattern not in consider_duplicated:
                 # The duplicated were actually the same content, take only
@@ -1,21 +1,16 @@
 
-import os
 import pyblish.api
+from reveries import dirscan, txmanager
+from reveries.plugins import RepairInstanceAction
 from reveries.maya.plugins import MayaSelectInvalidInstanceAction
 
 
-def tx_updated(source, tx):
-    # TX map's modification time takes no decimal places.
-    int_mtime = (lambda f: int(os.path.getmtime(f)))
-    return int_mtime(source) == int_mtime(tx)
-
-
 class ValidateTextureTxMapUpdated(pyblish.api.InstancePlugin):
     """Ensure all texture file have .tx map updated
 
-    If you got error from this validation, please use Arnold's 'Tx Manager'
-    to check missing .tx maps, or rendering with 'Auto-convert Textures to TX'
-    option enabled.
+    If you got error from this validation, use the 'Repair' action to
+    regenerate stale or missing .tx maps with `maketx` (see
+    `reveries.txmanager`), or use Arnold's 'Tx Manager'.
 
     """
 
@@ -29,6 +24,8 @@ class ValidateTextureTxMapUpdated(pyblish.api.InstancePlugin):
     actions = [
         pyblish.api.Category("Select"),
         MayaSelectInvalidInstanceAction,
+        pyblish.api.Category("Fix It"),
+        RepairInstanceAction,
     ]
 
     def process(self, instance):
@@ -39,35 +36,51 @@ class ValidateTextureTxMapUpdated(pyblish.api.InstancePlugin):
         invalid = self.get_invalid(instance)
         if invalid:
             raise Exception("Not all texture have .tx map updated, "
-                            "please use 'Tx Manager' or update them "
-                            "with a render.")
+                            "use Repair action, Arnold's 'Tx Manager' or "
+                            "update them with a render.")
 
     @classmethod
     def get_invalid(cls, instance):
-        invalid = list()
-        for data in instance.data.get("fileData", []):
-            node = data["node"]
-            for file in data["fnames"]:
-                file_path = os.path.join(data["dir"], file)
-                if not os.path.isfile(file_path):
-                    cls.log.warning("File node '%s' map not exists, "
-                                    "TX validation skip." % node)
-                    continue
+        nodes_by_source = cls.sources(instance)
+        status = txmanager.check(list(nodes_by_source),
+                                 scanner=dirscan.of(instance.context))
 
-                tx_path = os.path.splitext(file_path)[0] + ".tx"
-                if not os.path.isfile(tx_path):
-                    cls.log.error(file_path)
-                    invalid.append(node)
-                    break
+        invalid = list()
+        for source, state in sorted(status.items()):
+            node = nodes_by_source[source]
+            if state == txmanager.MISSING_SOURCE:
+                cls.log.warning("File node '%s' map not exists, "
+                                "TX validation skip." % node)
+                continue
 
-                if not tx_updated(file_path, tx_path):
-                    cls.log.error(file_path)
+            if state != txmanager.UPDATED:
+                cls.log.error("%s (%s)" % (source, state))
+                if node not in invalid:
                     invalid.append(node)
-                    break
 
         return invalid
 
+    @classmethod
+    def sources(cls, instance):
+        """Return {source file path: file node}"""
+        nodes_by_source = dict()
+        for data in instance.data.get("fileData", []):
+            for file in data["fnames"]:
+                file_path = data["dir"] + "/" + file
+                nodes_by_source[file_path] = data["node"]
+        return nodes_by_source
+
     @classmethod
     def fix_invalid(cls, instance):
-        # (TODO) maketx for sequence
-        pass
+        scanner = dirscan.of(instance.context)
+        status = txmanager.check(list(cls.sources(instance)),
+                                 scanner=scanner)
+        outdated = [source for source, state in status.items()
+                    if state in (txmanager.STALE, txmanager.MISSING_TX)]
+        if not outdated:
+            return
+
+        cls.log.info("Making %d tx maps.." % len(outdated))
+        errors = txmanager.make_tx(outdated, scanner=scanner)
+        if errors:
+            raise Exception("Failed to make %d tx maps." % len(errors))
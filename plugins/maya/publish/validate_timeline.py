@@ -1,7 +1,7 @@
 
 import pyblish.api
 
-from reveries import utils
+from reveries import utils, doccache
 from reveries.plugins import RepairContextAction, context_process
 from reveries.maya.pipeline import (
     set_scene_timeline,
@@ -57,9 +57,11 @@ class ValidateTimeline(pyblish.api.InstancePlugin):
         scene_fps = context.data.get("fps")
 
         project = context.data["projectDoc"]
-        proj_start, proj_end, fps = utils.compose_timeline_data(project,
-                                                                asset_name,
-                                                                scene_fps)
+        proj_start, proj_end, fps = utils.compose_timeline_data(
+            project,
+            asset_name,
+            scene_fps,
+            cache=doccache.of(context))
 
         # Check if any of the values are present
         if any(value is None for value in (scene_start, scene_end)):
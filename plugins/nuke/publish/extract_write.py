@@ -3,6 +3,7 @@ import os
 import pyblish.api
 import reveries.utils
 import reveries.lib
+import reveries.doccache
 
 from avalon.vendor import clique
 from reveries.plugins import PackageExtractor
@@ -71,7 +72,9 @@ class ExtractWrite(PackageExtractor):
                        sequence.tail)
 
         project = self.context.data["projectDoc"]
-        e_in, e_out, handles, _ = reveries.utils.get_timeline_data(project)
+        cache = reveries.doccache.of(self.context)
+        e_in, e_out, handles, _ = reveries.utils.get_timeline_data(
+            project, cache=cache)
 
         packager.add_data({"sequence": {
             "_": {
@@ -0,0 +1,232 @@
+"""Streaming path rewriter of Arnold scene (.ass) files
+
+Exported stand-ins carry absolute texture and cache paths in `filename`
+parameters, which are rewritten into Arnold env tokens so the files work
+from any project root:
+
+    filename "/projects/Foo/publish/wall.tx"
+    filename "[AVALON_PROJECTS]/[AVALON_PROJECT]/publish/wall.tx"
+
+Files are streamed line by line, so memory use does not grow with file
+size. Files without any change are only read, never written. Otherwise
+the temporary file next to the source is opened on the first changed
+line, the unchanged part before it is copied over, and it is renamed into
+place once complete, so a failed rewrite never leaves a half written
+file. Gzipped `.ass.gz` files are read and written compressed.
+
+A sequence of files is rewritten in a process pool, from command line:
+
+    python -m reveries.assrewrite --root /projects --project Foo *.ass
+
+"""
+import os
+import io
+import sys
+import gzip
+import shutil
+import logging
+import tempfile
+import multiprocessing
+from multiprocessing.pool import ThreadPool
+
+
+log = logging.getLogger(__name__)
+
+
+PARAMETERS = ("filename",)
+
+BUFFER_SIZE = 1024 * 1024
+
+
+def embedding_rules(root, project):
+    """Return rules that embed `[AVALON_PROJECTS]` and `[AVALON_PROJECT]`
+
+    Arguments:
+        root (str): Project root
+        project (str): Project name
+
+    """
+    return [
+        (root.replace("\\", "/"), "[AVALON_PROJECTS]"),
+        (project, "[AVALON_PROJECT]"),
+    ]
+
+
+def _encode(rules):
+    return [(old.encode("utf-8"), new.encode("utf-8")) for old, new in rules]
+
+
+def _prefixes(parameters):
+    return tuple(name.encode("utf-8") + b" " for name in parameters)
+
+
+def _rewrite_line(line, rules, prefixes):
+    if not line.lstrip().startswith(prefixes):
+        return line
+    for old, new in rules:
+        line = line.replace(old, new, 1)
+    return line
+
+
+def _open(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, compresslevel=6)
+    return io.open(path, mode)
+
+
+def _replace(src, dst):
+    try:
+        os.replace(src, dst)
+    except AttributeError:
+        # Python 2
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+def _temp_file(path):
+    suffix = ".tmp.gz" if path.endswith(".gz") else ".tmp"
+    fd, tmp = tempfile.mkstemp(prefix=".", suffix=suffix,
+                               dir=os.path.dirname(os.path.abspath(path)))
+    os.close(fd)
+    return tmp
+
+
+def _copy_head(path, dst, size):
+    """Copy first `size` bytes of (decompressed) file into `dst`"""
+    with _open(path, "rb") as src:
+        while size > 0:
+            chunk = src.read(min(size, BUFFER_SIZE))
+            if not chunk:
+                break
+            dst.write(chunk)
+            size -= len(chunk)
+
+
+def rewrite(path, rules, parameters=PARAMETERS):
+    """Rewrite paths in one .ass or .ass.gz file
+
+    Arguments:
+        path (str): File path
+        rules (list): List of (old, new) text pairs
+        parameters (tuple, optional): Names of parameters to rewrite
+
+    Returns:
+        bool: Whether the file was changed
+
+    """
+    rules = _encode(rules)
+    prefixes = _prefixes(parameters)
+
+    tmp = dst = None
+    offset = 0
+    try:
+        with _open(path, "rb") as src:
+            for line in src:
+                new_line = _rewrite_line(line, rules, prefixes)
+                if dst is None:
+                    if new_line is line or new_line == line:
+                        offset += len(line)
+                        continue
+                    # First change, write from here on
+                    tmp = _temp_file(path)
+                    dst = _open(tmp, "wb")
+                    _copy_head(path, dst, offset)
+                dst.write(new_line)
+
+        if dst is None:
+            return False
+
+        dst.close()
+        dst = None
+        shutil.copymode(path, tmp)
+        _replace(tmp, path)
+
+    finally:
+        if dst is not None:
+            dst.close()
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
+
+    return True
+
+
+def _rewrite_args(args):
+    return rewrite(*args)
+
+
+def _can_spawn():
+    """Whether process pool workers can be started from this interpreter
+
+    Only plain interpreters (e.g. python, mayapy) are. Embedded ones (e.g.
+    maya.exe, maya.bin) can not be spawned as workers, and forking them
+    copies the whole GUI application, so threads are used instead.
+
+    """
+    exe = os.path.basename(sys.executable).lower()
+    return exe.startswith(("python", "mayapy", "hython"))
+
+
+def rewrite_files(paths, rules, parameters=PARAMETERS, processes=None,
+                  threads=False):
+    """Rewrite paths in files in parallel
+
+    Arguments:
+        paths (list): File paths, e.g. frames of a sequence
+        rules (list): List of (old, new) text pairs
+        parameters (tuple, optional): Names of parameters to rewrite
+        processes (int, optional): Worker count, default cpu count.
+            Falls back to threads if processes can not be spawned.
+        threads (bool, optional): Use threads instead of processes
+
+    Returns:
+        list: Paths that were changed
+
+    """
+    paths = list(paths)
+    if not paths:
+        return []
+
+    processes = max(1, min(processes or multiprocessing.cpu_count(),
+                           len(paths)))
+    tasks = [(path, rules, parameters) for path in paths]
+
+    if processes == 1:
+        results = [_rewrite_args(task) for task in tasks]
+    else:
+        if not threads and _can_spawn():
+            pool = multiprocessing.Pool(processes)
+        else:
+            pool = ThreadPool(processes)
+        try:
+            results = pool.map(_rewrite_args, tasks)
+        finally:
+            pool.close()
+            pool.join()
+
+    changed = [path for path, result in zip(paths, results) if result]
+    log.debug("Rewrote %d of %d files." % (len(changed), len(paths)))
+    return changed
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m reveries.assrewrite",
+        description="Embed project root tokens into .ass file paths.")
+    parser.add_argument("files", nargs="+", help=".ass or .ass.gz files")
+    parser.add_argument("--root", required=True, help="Project root")
+    parser.add_argument("--project", required=True, help="Project name")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Worker count, default cpu count")
+
+    args = parser.parse_args(argv)
+    rules = embedding_rules(args.root, args.project)
+    changed = rewrite_files(args.files, rules, processes=args.processes)
+    print("Rewrote %d of %d files." % (len(changed), len(args.files)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Content-addressable file store
+
+Files are stored once under their C4 ID, e.g.
+
+    <root>/c4/5x/Ha/c45xHa...
+
+and hardlinked into each version's package that contains them, so an
+identical texture published under different names, assets or projects
+takes disk space only once.
+
+A blob's hardlink count is its reference count: a blob with no link other
+than itself is not used by any published version, and will be removed by
+`gc`, which can be run from command line:
+
+    python -m reveries.casstore /path/to/store [--max-age 24] [--dry-run]
+
+The store is optional, enabled by setting env var `REVERIES_CAS_ROOT` to
+the store root, which should be on the same file system as the publish
+root for hardlinks to work.
+
+"""
+import os
+import stat
+import time
+import errno
+import logging
+
+from . import utils, transfer
+
+
+log = logging.getLogger(__name__)
+
+
+BLOB_DIR = "c4"
+
+
+def store_root():
+    """Return store root from env var `REVERIES_CAS_ROOT`, or None"""
+    return os.getenv("REVERIES_CAS_ROOT") or None
+
+
+def blob_path(root, content_id):
+    """Return the blob path of content ID in store
+
+    Blobs are fanned out into sub-dirs by ID characters after the "c4"
+    prefix, to keep dir entries in a reasonable size.
+
+    """
+    return os.path.join(root,
+                        BLOB_DIR,
+                        content_id[2:4],
+                        content_id[4:6],
+                        content_id)
+
+
+def linkable(root, path):
+    """Return True if blobs in store can be hardlinked to path"""
+    return transfer.device_of(root) == transfer.device_of(path)
+
+
+def _reuse(blob):
+    """Restart `gc` grace period of existing blob, return False if missing
+
+    So an orphan blob is not removed by a concurrent `gc` before the
+    caller links it.
+
+    """
+    try:
+        os.utime(blob, None)
+    except OSError as e:
+        if e.errno == errno.ENOENT:
+            return False
+        # E.g. stored by other user, blob is read-only
+        log.warning("Could not touch blob %s: %s" % (blob, e))
+    return True
+
+
+def store(root, src, content_id=None):
+    """Put file into store if its content is not there yet
+
+    Content is written into a temporary file and renamed into place, so a
+    blob is always complete. Blobs are made read-only since they are
+    shared across versions. Reusing an existing blob restarts its `gc`
+    grace period as well.
+
+    Arguments:
+        root (str): Store root
+        src (str): Source file path
+        content_id (str, optional): C4 ID of `src`, computed if not given
+
+    Returns:
+        tuple: (content ID, blob path, whether content was newly stored)
+
+    """
+    if content_id is None:
+        content_id = utils.hash_file(src)
+
+    blob = blob_path(root, content_id)
+    if os.path.isfile(blob) and _reuse(blob):
+        return content_id, blob, False
+
+    transfer.makedirs(os.path.dirname(blob))
+
+    tmp = "%s.%d.tmp" % (blob, os.getpid())
+    try:
+        transfer.copy_file(src, tmp)
+        # Copied with source's mtime, reset it so `gc` counts the grace
+        # period from now.
+        os.utime(tmp, None)
+        os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        if os.path.isfile(blob) and _reuse(blob):
+            # Stored by other process while we were copying
+            os.remove(tmp)
+            return content_id, blob, False
+        os.rename(tmp, blob)
+    except (IOError, OSError):
+        if os.path.isfile(tmp):
+            os.remove(tmp)
+        raise
+
+    log.debug("Stored: %s -> %s" % (src, blob))
+
+    return content_id, blob, True
+
+
+def ref_count(blob):
+    """Return number of links to blob other than itself"""
+    return os.stat(blob).st_nlink - 1
+
+
+def gc(root, max_age=60 * 60 * 24, dry_run=False):
+    """Remove blobs that are not linked by any published file
+
+    Blobs younger than `max_age` seconds are kept, they may be stored by a
+    publish that has not transferred its files yet. Leftover temporary
+    files are removed by the same rule.
+
+    Arguments:
+        root (str): Store root
+        max_age (float, optional): Grace period in seconds, default 1 day.
+        dry_run (bool, optional): Only report, change nothing
+
+    Returns:
+        dict: {"removed": [path], "kept": [path], "bytes": freed bytes}
+
+    """
+    report = {"removed": list(), "kept": list(), "bytes": 0}
+    now = time.time()
+
+    for parent, _, files in os.walk(os.path.join(root, BLOB_DIR)):
+        for name in files:
+            path = os.path.join(parent, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+
+            is_tmp = name.endswith(".tmp")
+            if (now - st.st_mtime < max_age or
+                    (st.st_nlink > 1 and not is_tmp)):
+                report["kept"].append(path)
+                continue
+
+            report["removed"].append(path)
+            report["bytes"] += st.st_size
+            if dry_run:
+                continue
+
+            try:
+                os.chmod(path, stat.S_IWUSR | stat.S_IRUSR)
+                os.remove(path)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    log.warning("Failed to remove blob %s: %s" % (path, e))
+
+    return report
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m reveries.casstore",
+        description="Remove unreferenced blobs from content store.")
+    parser.add_argument("root", nargs="?", default=store_root(),
+                        help="Store root, default $REVERIES_CAS_ROOT")
+    parser.add_argument("--max-age", type=float, default=24.0,
+                        help="Hours before an unreferenced blob can be "
+                             "removed, default 24.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only report, change nothing.")
+    args = parser.parse_args(argv)
+
+    if not args.root:
+        parser.error("No store root given.")
+
+    report = gc(args.root,
+                max_age=args.max_age * 60 * 60,
+                dry_run=args.dry_run)
+
+    for path in report["removed"]:
+        print("removed %s" % path)
+    print("%d blobs removed, %d kept, %.1f MB freed." % (
+        len(report["removed"]), len(report["kept"]),
+        report["bytes"] / float(1024 ** 2)))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,6 @@
+"""Deadline submission and farm maintenance helpers
+
+These are host-independent and do not run inside Deadline, the Deadline
+event plugins and the publish submitter use them.
+
+"""
@@ -0,0 +1,254 @@
+"""History-driven Deadline task chunk size
+
+Task durations of finished jobs are recorded per subset (one renderlayer
+or stand-in), and the chunk size of next submission is derived from them
+so that each task takes about `target` seconds:
+
+    task seconds = overhead + frames * seconds per frame
+
+Overhead (e.g. scene load) and per frame cost are fitted from recent
+samples, once there are samples of different frame counts. Before that,
+the whole task time is taken as per frame cost, which underestimates the
+chunk size and converges upward in following submissions.
+
+Samples are fed by Deadline event plugin `AvalonTaskStats` on job
+finished, from jobs that were tagged with `TASK_STATS_KEY` in job's extra
+info. Stored in Mongo, or a JSON file for local use:
+
+    * REVERIES_TASK_STATS: JSON file path, use Mongo if not set
+    * AVALON_MONGO, AVALON_DB: Mongo database of collection `taskStats`
+
+"""
+import os
+import json
+import math
+import logging
+import threading
+
+
+log = logging.getLogger(__name__)
+
+
+# Job extra info key of stats key
+TASK_STATS_KEY = "AvalonTaskStatsKey"
+
+COLLECTION = "taskStats"
+
+
+def stats_key(project, asset, subset, kind):
+    """Return stats key of a subset's jobs, e.g. render or standin"""
+    return "/".join([project, asset, subset, kind])
+
+
+class JsonStore(object):
+    """Task samples in a local JSON file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path) as fp:
+                return json.load(fp)
+        except (IOError, OSError, ValueError):
+            return dict()
+
+    def samples(self, key):
+        with self._lock:
+            return [tuple(s) for s in self._load().get(key, [])]
+
+    def add(self, key, samples, limit):
+        with self._lock:
+            data = self._load()
+            data[key] = (data.get(key, []) + [list(s) for s in samples])
+            data[key] = data[key][-limit:]
+
+            dir_path = os.path.dirname(self.path)
+            if dir_path and not os.path.isdir(dir_path):
+                os.makedirs(dir_path)
+            with open(self.path, "w") as fp:
+                json.dump(data, fp)
+
+
+class MongoStore(object):
+    """Task samples in Mongo collection, one document per key"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def samples(self, key):
+        doc = self.collection.find_one({"_id": key})
+        return [tuple(s) for s in doc["samples"]] if doc else []
+
+    def add(self, key, samples, limit):
+        self.collection.update_one(
+            {"_id": key},
+            {"$push": {"samples": {"$each": [list(s) for s in samples],
+                                   "$slice": -limit}}},
+            upsert=True,
+        )
+
+
+def default_store():
+    """Return store from environment"""
+    path = os.getenv("REVERIES_TASK_STATS")
+    if path:
+        return JsonStore(path)
+
+    import pymongo
+    client = pymongo.MongoClient(os.environ["AVALON_MONGO"],
+                                 serverSelectionTimeoutMS=2000)
+    return MongoStore(client[os.environ["AVALON_DB"]][COLLECTION])
+
+
+def fit(samples):
+    """Return (overhead, seconds per frame) from (frames, seconds) samples
+
+    Returns None if no usable sample.
+
+    """
+    samples = [(float(f), float(s)) for f, s in samples if f > 0 and s > 0]
+    if not samples:
+        return None
+
+    count = len(samples)
+    mean_f = sum(f for f, _ in samples) / count
+    mean_s = sum(s for _, s in samples) / count
+    var_f = sum((f - mean_f) ** 2 for f, _ in samples)
+
+    if var_f > 0:
+        cov = sum((f - mean_f) * (s - mean_s) for f, s in samples)
+        per_frame = cov / var_f
+        overhead = mean_s - per_frame * mean_f
+        if per_frame > 0 and overhead >= 0:
+            return overhead, per_frame
+
+    # Can not tell overhead apart
+    return 0.0, sum(s for _, s in samples) / sum(f for f, _ in samples)
+
+
+class ChunkScheduler(object):
+    """Derive chunk size from recorded task durations
+
+    Arguments:
+        store (JsonStore or MongoStore): Sample store
+        target (float, optional): Target task seconds, default 600, or
+            env var `REVERIES_TASK_TARGET_SECONDS`
+        max_chunk (int, optional): Max frames per task, default 100
+
+    """
+
+    # Recent samples kept per key
+    limit = 50
+
+    def __init__(self, store, target=None, max_chunk=100):
+        self.store = store
+        self.target = float(
+            target or os.getenv("REVERIES_TASK_TARGET_SECONDS") or 600)
+        self.max_chunk = max_chunk
+
+    def record(self, key, tasks):
+        """Record finished tasks
+
+        Arguments:
+            key (str): Stats key
+            tasks (list): List of (frame count, seconds) of tasks
+
+        """
+        tasks = [(int(f), float(s)) for f, s in tasks if f > 0 and s > 0]
+        if tasks:
+            self.store.add(key, tasks, self.limit)
+
+    def _samples(self, key):
+        try:
+            return self.store.samples(key)
+        except Exception as e:
+            log.warning("Task stats unavailable: %s" % e)
+            return []
+
+    def _clamp(self, chunk, frame_count):
+        chunk = max(1, min(chunk, self.max_chunk))
+        if frame_count:
+            chunk = min(chunk, frame_count)
+        return chunk
+
+    def chunk_size(self, key, default=1, frame_count=None):
+        """Return frames per task of next job, or default if no history
+
+        Arguments:
+            key (str): Stats key
+            default (int, optional): Chunk size if no history
+            frame_count (int, optional): Frame count of the job, chunk
+                size won't exceed it.
+
+        """
+        estimate = fit(self._samples(key))
+        if estimate is None:
+            return default
+
+        overhead, per_frame = estimate
+        chunk = self._clamp(int((self.target - overhead) / per_frame),
+                            frame_count)
+
+        log.debug("Chunk size of %s: %d (overhead %.1fs, %.1fs per frame)"
+                  "" % (key, chunk, overhead, per_frame))
+        return chunk
+
+    def block_size(self, key, default=1, frame_count=None,
+                   overhead_ratio=0.1):
+        """Return frames per task that amortize scene loading
+
+        This is the smallest block that keeps overhead (scene loading)
+        within `overhead_ratio` of task time, so frames are still spread
+        over as many tasks as possible, but not longer than `target`.
+
+        Before overhead can be told apart from history, which requires
+        samples of different frame counts, this is `chunk_size`.
+
+        Arguments:
+            key (str): Stats key
+            default (int, optional): Block size if no history
+            frame_count (int, optional): Frame count of the job, block
+                size won't exceed it.
+            overhead_ratio (float, optional): Max overhead of task time
+
+        """
+        samples = self._samples(key)
+        estimate = fit(samples)
+        if estimate is None:
+            return default
+
+        if len(set(f for f, _ in samples)) < 2:
+            return self.chunk_size(key, default, frame_count)
+
+        overhead, per_frame = estimate
+        # overhead / (overhead + n * per_frame) <= ratio
+        amortized = overhead * (1 - overhead_ratio) / overhead_ratio
+        block = int(math.ceil(amortized / per_frame))
+        block = min(block, int((self.target - overhead) / per_frame))
+        block = self._clamp(block, frame_count)
+
+        log.debug("Block size of %s: %d (overhead %.1fs, %.1fs per frame)"
+                  "" % (key, block, overhead, per_frame))
+        return block
+
+
+def of(context):
+    """Return the scheduler of pyblish context, create one if not exists
+
+    Returns None if no store available.
+
+    keys in context.data:
+        * chunkScheduler
+
+    """
+    if "chunkScheduler" not in context.data:
+        try:
+            scheduler = ChunkScheduler(default_store())
+        except Exception as e:
+            log.warning("No task stats store: %s" % e)
+            scheduler = None
+        context.data["chunkScheduler"] = scheduler
+
+    return context.data["chunkScheduler"]
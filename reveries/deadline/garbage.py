@@ -0,0 +1,231 @@
+"""Find and delete Avalon integration jobs left on Deadline
+
+Integration jobs (the publish jobs that depend on render or cache jobs)
+are useless once their dependency jobs were deleted. They are found by
+reading Deadline database directly, which is a lot faster than asking
+repository for each job:
+
+    * `dependents` queries jobs by batch and `Props.Dep.JobID`, for the
+      deleted job in event plugin `AvalonGarbageJobCollector`.
+    * `JobIndex` reads all jobs in one query, for the general script
+      `AvalonGarbageJobWiper` to sweep the farm.
+
+Deadline database is only read, never modified here, not even indexes.
+
+Deletion itself goes through the deleter given, which should be
+`repository_deleter(RepositoryUtils)` in production, so the jobs' tasks
+and reports are removed properly. That still deletes one job per
+`DeleteJob` call, `batch_size` of `delete` only limits the ids handed to
+the deleter at once.
+
+Database is configured with env vars:
+
+    * REVERIES_DEADLINE_MONGO: Mongo URI, default DEFAULT_URI
+    * REVERIES_DEADLINE_DB: Database name, default DEFAULT_DB
+
+"""
+import os
+import logging
+import threading
+
+
+log = logging.getLogger(__name__)
+
+
+DEFAULT_URI = "mongodb://Technic-Server:27100"
+DEFAULT_DB = "deadline10db"
+
+# Job name prefixes of Avalon integration jobs
+INTEGRATION_PREFIXES = ("_intergrate ",)
+
+_PROJECTION = {
+    "Props.Name": True,
+    "Props.Batch": True,
+    "Props.Dep.JobID": True,
+    "Props.Env.AVALON_ASSET": True,
+}
+
+_clients = dict()
+_clients_lock = threading.Lock()
+
+
+def jobs_collection(uri=None, db_name=None):
+    """Return Deadline `Jobs` collection from a pooled client
+
+    Client is created once per URI and reused.
+
+    """
+    import pymongo
+
+    uri = uri or os.getenv("REVERIES_DEADLINE_MONGO", DEFAULT_URI)
+    db_name = db_name or os.getenv("REVERIES_DEADLINE_DB", DEFAULT_DB)
+
+    with _clients_lock:
+        client = _clients.get(uri)
+        if client is None:
+            client = _clients[uri] = pymongo.MongoClient(
+                uri, serverSelectionTimeoutMS=5000)
+
+    return client[db_name]["Jobs"]
+
+
+def _is_avalon(doc):
+    return bool(doc.get("Props", {}).get("Env", {}).get("AVALON_ASSET"))
+
+
+def _name(doc):
+    return doc.get("Props", {}).get("Name", "")
+
+
+def _dep_ids(doc):
+    return [dep["JobID"] for dep in doc.get("Props", {}).get("Dep", [])
+            if "JobID" in dep]
+
+
+def is_integration(name):
+    return name.startswith(INTEGRATION_PREFIXES)
+
+
+def dependents(collection, job_id, batch=None):
+    """Return {job id: name} of jobs that depend on the job
+
+    Arguments:
+        collection (pymongo.collection.Collection): Deadline `Jobs`
+        job_id (str): Dependency job id
+        batch (str, optional): Only jobs in this batch, empty string for
+            jobs not in any batch. All batches if None.
+
+    """
+    filter = {"Props.Dep.JobID": job_id}
+    if batch is not None:
+        filter["Props.Batch"] = batch
+
+    return {doc["_id"]: _name(doc)
+            for doc in collection.find(filter, projection=_PROJECTION)}
+
+
+class JobIndex(object):
+    """All job ids and dependencies, read in one query
+
+    Attributes:
+        ids (set): All job ids
+        names (dict): {job id: job name}
+        dependencies (dict): {job id: [dependency job ids]}
+        dependents (dict): {job id: set of job ids depend on it}
+        avalon (set): Ids of Avalon jobs
+
+    """
+
+    def __init__(self):
+        self.ids = set()
+        self.names = dict()
+        self.dependencies = dict()
+        self.dependents = dict()
+        self.avalon = set()
+
+    @classmethod
+    def load(cls, collection):
+        index = cls()
+        for doc in collection.find({}, projection=_PROJECTION):
+            index.add(doc)
+        return index
+
+    def add(self, doc):
+        job_id = doc["_id"]
+        deps = _dep_ids(doc)
+
+        self.ids.add(job_id)
+        self.names[job_id] = _name(doc)
+        self.dependencies[job_id] = deps
+        for dep in deps:
+            self.dependents.setdefault(dep, set()).add(job_id)
+        if _is_avalon(doc):
+            self.avalon.add(job_id)
+
+    def orphaned(self):
+        """Return sorted ids of Avalon integration jobs whose dependency
+        jobs were all deleted"""
+        return sorted(
+            job_id for job_id in self.avalon
+            if is_integration(self.names[job_id]) and
+            not any(dep in self.ids for dep in self.dependencies[job_id])
+        )
+
+
+def is_dry_run(value=None):
+    """Return whether dry run is set, default from `REVERIES_GC_DRY_RUN`"""
+    if value is None:
+        value = os.getenv("REVERIES_GC_DRY_RUN", "")
+    return value.strip().lower() not in ("", "0", "false", "no", "off")
+
+
+def repository_deleter(repository_utils):
+    """Return deleter that deletes jobs via Deadline `RepositoryUtils`
+
+    Jobs that no longer exist are skipped, and not reported as deleted.
+
+    """
+    def delete_jobs(job_ids):
+        deleted = list()
+        for job_id in job_ids:
+            job = repository_utils.GetJob(job_id, False)
+            if job is None:
+                continue
+            repository_utils.DeleteJob(job)
+            deleted.append(job_id)
+        return deleted
+
+    return delete_jobs
+
+
+def delete(job_ids, deleter, names=None, dry_run=False, batch_size=100):
+    """Delete jobs, handing ids to deleter in chunks
+
+    How many jobs are deleted per request is up to the deleter, e.g.
+    `repository_deleter` deletes them one by one.
+
+    Arguments:
+        job_ids (list): Ids of jobs to delete
+        deleter (callable): Called with a list of at most `batch_size`
+            job ids, returns ids that were deleted (or None for all).
+        names (dict, optional): {job id: name} for report
+        dry_run (bool, optional): Only report, delete nothing
+        batch_size (int, optional): Max ids per deleter call
+
+    Returns:
+        dict: {"candidates": [(id, name)], "deleted": [id], "dryRun": bool}
+
+    """
+    job_ids = list(job_ids)
+    names = names or dict()
+
+    report = {
+        "candidates": [(job_id, names.get(job_id, "")) for job_id in job_ids],
+        "deleted": [],
+        "dryRun": dry_run,
+    }
+
+    for job_id, name in report["candidates"]:
+        log.info("%s job: %s  |  %s" % ("Would delete" if dry_run
+                                        else "Deleting", name, job_id))
+    if dry_run:
+        return report
+
+    for start in range(0, len(job_ids), batch_size):
+        chunk = job_ids[start:start + batch_size]
+        deleted = deleter(chunk)
+        report["deleted"].extend(chunk if deleted is None else deleted)
+
+    return report
+
+
+def collect(collection, job_id, batch, deleter, dry_run=False):
+    """Delete dependent jobs of a deleted Avalon job in the same batch"""
+    found = dependents(collection, job_id, batch)
+    return delete(sorted(found), deleter, found, dry_run=dry_run)
+
+
+def wipe(collection, deleter, dry_run=False):
+    """Delete all orphaned Avalon integration jobs"""
+    index = JobIndex.load(collection)
+    return delete(index.orphaned(), deleter, index.names, dry_run=dry_run)
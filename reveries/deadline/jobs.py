@@ -0,0 +1,146 @@
+"""Submit job payloads to Deadline Web Service
+
+A queue of jobs is a dict of {index: payload}, where `JobDependencies`
+of job info refers to other jobs by their queue index, and is resolved
+into job ids right before submitting.
+
+"""
+from avalon.vendor import requests
+
+
+class SubmissionError(Exception):
+    """Job was rejected"""
+
+
+class ServiceUnavailable(SubmissionError):
+    """Web service is down or not responding, submission may be retried"""
+
+
+class SubmissionUnknown(SubmissionError):
+    """Job was sent but the response timed out, it may have been created
+
+    Must not be retried automatically, or the job could be submitted twice.
+
+    """
+
+
+def dependencies(payload):
+    """Return set of queue indices that the job depends on"""
+    deps = payload["JobInfo"].get("JobDependencies")
+    return set(deps.split(",")) if deps else set()
+
+
+def waves(jobs, submitted=None):
+    """Return queue indices grouped in topological waves
+
+    Jobs in one wave only depend on jobs in previous waves or already
+    submitted ones.
+
+    Arguments:
+        jobs (dict): {index: payload} of queued jobs
+        submitted (dict, optional): {index: job id} of submitted jobs
+
+    Raises:
+        SubmissionError: If any dependency is unknown or circular.
+
+    """
+    submitted = submitted or dict()
+
+    pending = dict()
+    for index, payload in jobs.items():
+        deps = dependencies(payload)
+        deps.difference_update(submitted)
+
+        unknown = deps.difference(jobs)
+        if unknown:
+            raise SubmissionError("Job %s depends on unknown jobs: %s"
+                                  "" % (index, ", ".join(sorted(unknown))))
+        pending[index] = deps
+
+    result = list()
+    queued = set()
+    while pending:
+        wave = sorted((index for index, deps in pending.items()
+                       if deps.issubset(queued)),
+                      key=int)
+        if not wave:
+            raise SubmissionError("Circular job dependencies: %s"
+                                  "" % ", ".join(sorted(pending, key=int)))
+        for index in wave:
+            del pending[index]
+        queued.update(wave)
+        result.append(wave)
+
+    return result
+
+
+def resolve_dependencies(payload, submitted):
+    """Replace queue indices in `JobDependencies` with job ids, in place"""
+    deps = payload["JobInfo"].get("JobDependencies")
+    if deps:
+        payload["JobInfo"]["JobDependencies"] = ",".join(
+            submitted[index] for index in deps.split(","))
+    return payload
+
+
+def http_session(auth=None, workers=8):
+    """Return HTTP session that keeps connections alive between jobs
+
+    Arguments:
+        auth (tuple, optional): (user, password) of web service
+        workers (int, optional): Max concurrent connections, default 8
+
+    """
+    session = requests.Session()
+    if auth:
+        session.auth = tuple(auth)
+
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=workers,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def post_job(session, url, payload, timeout=None):
+    """Submit one job, return the job id
+
+    Arguments:
+        session (requests.Session): From `http_session`
+        url (str): Jobs api url, e.g. "http://192.168.0.1:8082/api/jobs"
+        payload (dict): Job payload with resolved dependencies
+        timeout (float, optional): Seconds to wait for response
+
+    Raises:
+        ServiceUnavailable: If connection failed, timed out before sent or
+            server error occurred.
+        SubmissionUnknown: If job was sent but response timed out.
+        SubmissionError: If job was rejected.
+
+    """
+    try:
+        response = session.post(url, json=payload, timeout=timeout)
+    except requests.ReadTimeout as e:
+        # Deadline may have created the job already
+        raise SubmissionUnknown("Deadline Web Service did not respond in "
+                                "time, job '%s' may have been submitted: "
+                                "%s" % (payload["JobInfo"].get("Name"), e))
+    except (requests.ConnectionError, requests.Timeout) as e:
+        raise ServiceUnavailable("Deadline Web Service not responding: "
+                                 "%s" % e)
+
+    if response.status_code >= 500:
+        raise ServiceUnavailable("Deadline Web Service error %d: %s"
+                                 "" % (response.status_code, response.text))
+
+    if not response.ok:
+        raise SubmissionError("Submission failed: %s" % response.text)
+
+    try:
+        return response.json()["_id"]
+    except (ValueError, KeyError):
+        raise SubmissionError("Submission failed, unexpected response: "
+                              "%s" % response.text)
@@ -0,0 +1,397 @@
+"""Durable spool of Deadline submissions
+
+When Deadline Web Service is down or refuses connections, the jobs that
+were not yet submitted are written into a local spool dir instead of
+failing the publish, and a background flusher keeps retrying them with
+exponential backoff.
+
+A job that was sent but got no response in time may have been created by
+Deadline already, so it is never retried automatically. The publish fails
+on it, and a spooled entry is marked failed. Check Deadline Monitor before
+resubmitting such entry with `flush --force`, or `drop` it.
+
+Each spooled submission is one JSON file named by its idempotency key,
+which is the hash of the target url, the job payloads and the ids of the
+already submitted jobs they depend on, so spooling the same jobs twice
+does not result duplicated entries, while a re-publish that depends on
+other jobs gets its own entry. Job ids are written back into the entry as
+soon as each job is submitted, a retry only submits the rest.
+
+Payloads are kept as is, including the `AVALON_DELEGATED_SUBSETS` env of
+the jobs, so the publish on farm still locks to the versions that were
+reserved while publishing.
+
+The spool dir is `REVERIES_DEADLINE_SPOOL`, or `~/.avalon/deadline_spool`,
+and can be inspected or drained with:
+
+    python -m reveries.deadline.spool list
+    python -m reveries.deadline.spool flush [--force]
+    python -m reveries.deadline.spool drop KEY
+
+"""
+import os
+import copy
+import json
+import time
+import errno
+import hashlib
+import logging
+import threading
+import contextlib
+
+from . import jobs as deadline_jobs
+
+
+log = logging.getLogger(__name__)
+
+
+# Entry state
+PENDING = "pending"
+FAILED = "failed"
+
+
+def spool_root():
+    """Return spool dir from env or default"""
+    return (os.getenv("REVERIES_DEADLINE_SPOOL") or
+            os.path.join(os.path.expanduser("~"), ".avalon", "deadline_spool"))
+
+
+def submission_key(url, jobs, submitted=None):
+    """Return idempotency key of jobs to url
+
+    Arguments:
+        url (str): Jobs api url of Deadline Web Service
+        jobs (dict): {index: payload} of jobs to submit
+        submitted (dict, optional): {index: job id} of jobs that were
+            submitted already, which resolve the dependencies.
+
+    """
+    content = json.dumps({"url": url,
+                          "jobs": jobs,
+                          "submitted": dict(submitted or {})},
+                         sort_keys=True)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def _replace(src, dst):
+    try:
+        os.replace(src, dst)
+    except AttributeError:
+        # Python 2
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+class Spool(object):
+    """Spool dir of Deadline submissions
+
+    Arguments:
+        root (str, optional): Spool dir, default from `spool_root`
+
+    """
+
+    # Retry delay in seconds, doubled on each failed attempt
+    base_delay = 30
+    max_delay = 3600
+    # Lock older than this is considered left by a dead process
+    lock_timeout = 600
+    # Seconds to wait for web service response
+    timeout = 60
+
+    def __init__(self, root=None):
+        self.root = root or spool_root()
+
+    def _path(self, key, ext=".json"):
+        return os.path.join(self.root, key + ext)
+
+    def put(self, url, jobs, submitted=None):
+        """Spool jobs and return the idempotency key
+
+        Arguments:
+            url (str): Jobs api url of Deadline Web Service
+            jobs (dict): {index: payload} of jobs to submit, dependencies
+                are queue indices.
+            submitted (dict, optional): {index: job id} of jobs that were
+                submitted already, for resolving dependencies.
+
+        """
+        key = submission_key(url, jobs, submitted)
+        if os.path.isfile(self._path(key)):
+            log.info("Submission already spooled: %s" % key)
+            return key
+
+        if not os.path.isdir(self.root):
+            os.makedirs(self.root)
+
+        self._save({
+            "key": key,
+            "url": url,
+            "jobs": jobs,
+            "submitted": dict(submitted or {}),
+            "state": PENDING,
+            "created": time.time(),
+            "attempts": 0,
+            "nextAttempt": time.time(),
+            "lastError": None,
+        })
+        return key
+
+    def _save(self, entry):
+        path = self._path(entry["key"])
+        tmp = path + ".tmp"
+        with open(tmp, "w") as fp:
+            json.dump(entry, fp, indent=1, sort_keys=True)
+        _replace(tmp, path)
+
+    def get(self, key):
+        """Return spooled entry, or None if not exists"""
+        try:
+            with open(self._path(key)) as fp:
+                return json.load(fp)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def keys(self):
+        """Return keys of spooled entries, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+
+        def mtime(key):
+            try:
+                return os.path.getmtime(self._path(key))
+            except OSError:
+                return 0
+
+        entries = [name[:-len(".json")] for name in os.listdir(self.root)
+                   if name.endswith(".json")]
+        return sorted(entries, key=mtime)
+
+    def entries(self):
+        """Return all spooled entries"""
+        entries = (self.get(key) for key in self.keys())
+        return [entry for entry in entries if entry is not None]
+
+    def remove(self, key):
+        """Remove entry"""
+        try:
+            os.remove(self._path(key))
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+
+    def delay(self, attempts):
+        """Return seconds to wait after attempts"""
+        return min(self.base_delay * 2 ** max(attempts - 1, 0),
+                   self.max_delay)
+
+    @contextlib.contextmanager
+    def _lock(self, key):
+        """Lock entry across processes, yield False if locked by others"""
+        path = self._path(key, ".lock")
+        try:
+            if time.time() - os.path.getmtime(path) > self.lock_timeout:
+                os.remove(path)
+        except OSError:
+            pass
+
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+            yield False
+            return
+
+        try:
+            os.close(fd)
+            yield True
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _submit(self, entry, session):
+        submitted = entry["submitted"]
+        jobs = {index: payload for index, payload in entry["jobs"].items()
+                if index not in submitted}
+
+        for wave in deadline_jobs.waves(jobs, submitted):
+            for index in wave:
+                payload = copy.deepcopy(jobs[index])
+                deadline_jobs.resolve_dependencies(payload, submitted)
+
+                jobid = deadline_jobs.post_job(session,
+                                               entry["url"],
+                                               payload,
+                                               timeout=self.timeout)
+                # Written right away, so retry won't submit it twice
+                submitted[index] = jobid
+                self._save(entry)
+                log.info("Spooled job submitted. JobID: %s" % jobid)
+
+    def flush(self, now=None, force=False, session=None):
+        """Submit due entries
+
+        Arguments:
+            now (float, optional): Current time, for testing
+            force (bool, optional): Submit all entries regardless of retry
+                delay, including failed ones.
+            session (requests.Session, optional): HTTP session, default
+                one with auth from env var `AVALON_DEADLINE_AUTH`
+
+        Returns:
+            dict: Keys by result, "submitted", "retrying", "failed" and
+                "skipped" (not due or locked)
+
+        """
+        report = {"submitted": [], "retrying": [], "failed": [],
+                  "skipped": []}
+
+        if session is None:
+            auth = os.getenv("AVALON_DEADLINE_AUTH")
+            session = deadline_jobs.http_session(
+                auth.split(":") if auth else None, workers=1)
+
+        for key in self.keys():
+            now_ = time.time() if now is None else now
+
+            with self._lock(key) as acquired:
+                entry = self.get(key) if acquired else None
+                if entry is None:
+                    report["skipped"].append(key)
+                    continue
+
+                due = (entry["state"] == PENDING and
+                       entry["nextAttempt"] <= now_)
+                if not (due or force):
+                    report["skipped"].append(key)
+                    continue
+
+                try:
+                    self._submit(entry, session)
+
+                except deadline_jobs.ServiceUnavailable as e:
+                    entry["state"] = PENDING
+                    entry["attempts"] += 1
+                    entry["nextAttempt"] = now_ + self.delay(entry["attempts"])
+                    entry["lastError"] = str(e)
+                    self._save(entry)
+                    report["retrying"].append(key)
+                    log.warning("Spooled submission %s retry in %d sec: %s"
+                                "" % (key, self.delay(entry["attempts"]), e))
+
+                except deadline_jobs.SubmissionError as e:
+                    entry["attempts"] += 1
+                    entry["state"] = FAILED
+                    entry["lastError"] = str(e)
+                    self._save(entry)
+                    report["failed"].append(key)
+                    log.error("Spooled submission %s failed: %s" % (key, e))
+
+                else:
+                    self.remove(key)
+                    report["submitted"].append(key)
+
+        return report
+
+    def next_due(self):
+        """Return time of the earliest pending retry, or None"""
+        times = [entry["nextAttempt"] for entry in self.entries()
+                 if entry["state"] == PENDING]
+        return min(times) if times else None
+
+
+class Flusher(threading.Thread):
+    """Background thread that flushes spool until no pending entry left"""
+
+    # Max seconds between checks
+    poll = 60
+
+    def __init__(self, spool):
+        super(Flusher, self).__init__(name="DeadlineSpoolFlusher")
+        self.daemon = True
+        self.spool = spool
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.spool.flush()
+            except Exception as e:
+                log.error("Flushing Deadline spool failed: %s" % e)
+
+            next_due = self.spool.next_due()
+            if next_due is None:
+                break
+
+            wait = min(max(next_due - time.time(), 1), self.poll)
+            self._stop_event.wait(wait)
+
+
+_flushers = dict()
+_flushers_lock = threading.Lock()
+
+
+def start_flusher(spool):
+    """Start background flusher of spool, if not running"""
+    with _flushers_lock:
+        flusher = _flushers.get(spool.root)
+        if flusher is None or not flusher.is_alive():
+            flusher = _flushers[spool.root] = Flusher(spool)
+            flusher.start()
+        return flusher
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m reveries.deadline.spool",
+        description="Inspect or drain spooled Deadline submissions.")
+    parser.add_argument("--root", help="Spool dir, default %s" % spool_root())
+
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("list", help="List spooled submissions.")
+    flush = commands.add_parser("flush", help="Submit due submissions.")
+    flush.add_argument("--force", action="store_true",
+                       help="Submit all, including failed ones.")
+    drop = commands.add_parser("drop", help="Remove spooled submission.")
+    drop.add_argument("key")
+
+    args = parser.parse_args(argv)
+    spool = Spool(args.root)
+
+    if args.command == "flush":
+        report = spool.flush(force=args.force)
+        for result in ("submitted", "retrying", "failed", "skipped"):
+            print("%s: %d" % (result, len(report[result])))
+        return 1 if report["failed"] or report["retrying"] else 0
+
+    if args.command == "drop":
+        spool.remove(args.key)
+        return 0
+
+    for entry in spool.entries():
+        jobs = entry["jobs"]
+        print("%s  %-7s  %d/%d submitted  attempts %d  next %s" % (
+            entry["key"],
+            entry["state"],
+            len([index for index in jobs if index in entry["submitted"]]),
+            len(jobs),
+            entry["attempts"],
+            time.strftime("%Y-%m-%d %H:%M:%S",
+                          time.localtime(entry["nextAttempt"]))))
+        if entry["lastError"]:
+            print("    " + entry["lastError"])
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""Cached directory scanner for texture file patterns
+
+Texture file nodes usually point into a handful of directories, listing
+them once and matching every file pattern against the cached listing is
+far cheaper than globbing per node, especially over network storage.
+
+The stats taken in the same pass are cached as well, so validators and
+extractors that check file existence or modification time can reuse them
+without another round trip:
+
+    >>> scanner = dirscan.of(context)
+    >>> scanner.find("/textures/wall.<UDIM>.tif")
+    ['wall.1001.tif', 'wall.1002.tif']
+    >>> scanner.getmtime("/textures/wall.1001.tif")
+    1546300800.0
+
+"""
+import os
+import re
+import sys
+import errno
+import threading
+
+try:
+    from os import scandir as _scandir
+except ImportError:
+    try:
+        from scandir import scandir as _scandir  # Python 2 backport
+    except ImportError:
+        _scandir = None
+
+
+# Regex of file pattern tokens, e.g. from Maya `getFilePatternString`
+TOKENS = [
+    ("<UDIM>", r"\d{4}"),
+    ("<udim>", r"\d{4}"),
+    ("<UVTILE>", r"u-?\d+_v-?\d+"),
+    ("<uvtile>", r"u-?\d+_v-?\d+"),
+    ("<U>", r"-?\d+"),
+    ("<V>", r"-?\d+"),
+    ("<u>", r"-?\d+"),
+    ("<v>", r"-?\d+"),
+    ("<f>", r"-?\d+"),
+    ("<F>", r"-?\d+"),
+]
+
+_TOKEN_RE = re.compile("|".join(re.escape(t) for t, _ in TOKENS) + "|#+")
+
+_FLAGS = re.IGNORECASE if sys.platform == "win32" else 0
+
+
+def compile_pattern(fpattern):
+    """Compile file name pattern into regex
+
+    Tokens like `<UDIM>`, `<f>`, `u<U>_v<V>` and `#` padding are
+    replaced with their digit expression, the rest is matched literally.
+
+    Arguments:
+        fpattern (str): File name pattern, without dir
+
+    Returns:
+        re.RegexObject
+
+    """
+    tokens = dict(TOKENS)
+    regex = ""
+    position = 0
+    for match in _TOKEN_RE.finditer(fpattern):
+        regex += re.escape(fpattern[position:match.start()])
+        token = match.group(0)
+        if token.startswith("#"):
+            regex += r"-?\d{%d,}" % len(token)
+        else:
+            regex += tokens[token]
+        position = match.end()
+    regex += re.escape(fpattern[position:])
+
+    return re.compile(regex + r"\Z", _FLAGS)
+
+
+def _list_dir(dir_path):
+    """Return {name: (is_file, size, mtime)} of entries in dir"""
+    entries = dict()
+
+    if _scandir is not None:
+        for entry in _scandir(dir_path):
+            try:
+                stat = entry.stat()
+                is_file = entry.is_file()
+            except OSError:
+                continue  # Broken link or removed while scanning
+            entries[entry.name] = (is_file, stat.st_size, stat.st_mtime)
+        return entries
+
+    for name in os.listdir(dir_path):
+        path = os.path.join(dir_path, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        is_file = os.path.isfile(path)
+        entries[name] = (is_file, stat.st_size, stat.st_mtime)
+
+    return entries
+
+
+class DirScanner(object):
+    """Scan each directory once and match file patterns against listings
+
+    Listings are kept until `invalidate`, so a scanner should live no
+    longer than the process that needs a consistent view of the files,
+    e.g. one publish.
+
+    """
+
+    def __init__(self):
+        self._listings = dict()
+        self._patterns = dict()
+        self._lock = threading.Lock()
+        self.scans = 0
+
+    def listing(self, dir_path):
+        """Return cached {name: (is_file, size, mtime)} of dir
+
+        Missing or unreadable dir results an empty listing.
+
+        """
+        key = os.path.normcase(os.path.normpath(dir_path))
+        with self._lock:
+            try:
+                return self._listings[key]
+            except KeyError:
+                pass
+
+        try:
+            entries = _list_dir(dir_path)
+        except OSError:
+            entries = dict()
+
+        with self._lock:
+            self.scans += 1
+            return self._listings.setdefault(key, entries)
+
+    def invalidate(self, dir_path=None):
+        """Drop cached listing of dir, or all listings"""
+        with self._lock:
+            if dir_path is None:
+                self._listings.clear()
+            else:
+                key = os.path.normcase(os.path.normpath(dir_path))
+                self._listings.pop(key, None)
+
+    def _compiled(self, fpattern):
+        try:
+            return self._patterns[fpattern]
+        except KeyError:
+            regex = self._patterns[fpattern] = compile_pattern(fpattern)
+            return regex
+
+    def find(self, pattern):
+        """Return sorted file names in dir that match the pattern
+
+        Arguments:
+            pattern (str): File path pattern, only the file name part may
+                contain tokens.
+
+        """
+        dir_path, fpattern = os.path.split(pattern)
+        regex = self._compiled(fpattern)
+        return sorted(name for name, (is_file, _, _)
+                      in self.listing(dir_path or ".").items()
+                      if is_file and regex.match(name))
+
+    def _entry(self, path):
+        dir_path, name = os.path.split(path)
+        listing = self.listing(dir_path or ".")
+        entry = listing.get(name)
+        if entry is None and _FLAGS:
+            lower = name.lower()
+            for key, value in listing.items():
+                if key.lower() == lower:
+                    return value
+        return entry
+
+    def isfile(self, path):
+        """Cached `os.path.isfile`"""
+        entry = self._entry(path)
+        return entry is not None and entry[0]
+
+    def getsize(self, path):
+        """Cached `os.path.getsize`, raise OSError if not exists"""
+        entry = self._entry(path)
+        if entry is None:
+            raise OSError(errno.ENOENT, "No such file or directory", path)
+        return entry[1]
+
+    def getmtime(self, path):
+        """Cached `os.path.getmtime`, raise OSError if not exists"""
+        entry = self._entry(path)
+        if entry is None:
+            raise OSError(errno.ENOENT, "No such file or directory", path)
+        return entry[2]
+
+
+def of(context):
+    """Return the scanner of pyblish context, create one if not exists
+
+    keys in context.data:
+        * dirScanner
+
+    """
+    scanner = context.data.get("dirScanner")
+    if scanner is None:
+        scanner = context.data["dirScanner"] = DirScanner()
+    return scanner
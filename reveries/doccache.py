@@ -0,0 +1,341 @@
+"""Scoped document cache in front of `avalon.io`
+
+Read helpers in this module have the same signature as their `avalon.io`
+counterparts. They are served from the active `DocumentCache` if there is
+one, or passed through to `avalon.io` as is.
+
+A publish keeps its cache on the pyblish context instead of activating
+it, so a failed publish never leaves a stale cache behind:
+
+    >>> doccache.of(context).find_one({"type": "project"})
+
+A cache is activated for a loader session by:
+
+    >>> with doccache.session() as cache:
+    ...     doc = doccache.find_one({"_id": representation_id})
+
+"""
+import sys
+import copy
+import time
+import json
+import logging
+import contextlib
+from collections import OrderedDict
+
+import avalon.api
+import avalon.io
+
+
+log = logging.getLogger(__name__)
+
+self = sys.modules[__name__]
+self._current = None
+
+
+def _freeze(value):
+    """Make hashable key from query filter or projection"""
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+class _LRU(object):
+    """Least recently used mapping with time-to-live"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def get(self, key):
+        """Return (found, value)"""
+        try:
+            stamp, value = self._data.pop(key)
+        except KeyError:
+            return False, None
+
+        if self.ttl is not None and time.time() - stamp > self.ttl:
+            return False, None
+
+        self._data[key] = (stamp, value)  # Move to end
+        return True, value
+
+    def set(self, key, value):
+        self._data.pop(key, None)
+        self._data[key] = (time.time(), value)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DocumentCache(object):
+    """Read-through document cache with per-collection LRU and TTL
+
+    Documents are cached by query (filter, projection and sort) and, when
+    fetched without projection, by `_id` as well, so a later query by
+    `_id` hits regardless how the document was found.
+
+    Arguments:
+        maxsize (int, optional): Max cached entries per collection,
+            default 4096.
+        ttl (float, optional): Seconds before an entry expires, default
+            300. `None` for no expiration.
+
+    """
+
+    def __init__(self, maxsize=4096, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._queries = dict()  # {collection: _LRU}
+        self._by_id = dict()  # {collection: _LRU}
+
+    def _collection(self):
+        return avalon.api.Session["AVALON_PROJECT"]
+
+    def _lru(self, store):
+        collection = self._collection()
+        if collection not in store:
+            store[collection] = _LRU(self.maxsize, self.ttl)
+        return store[collection]
+
+    def stats(self):
+        """Return hit/miss counters"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "ratio": (float(self.hits) / total) if total else 0.0,
+        }
+
+    def _remember(self, doc):
+        if doc is not None and "_id" in doc:
+            self._lru(self._by_id).set(doc["_id"], doc)
+
+    def find_one(self, filter, projection=None, sort=None):
+        """Cached `avalon.io.find_one`
+
+        Returned document is a copy, safe to be modified.
+
+        """
+        _id = filter.get("_id")
+        if _id is not None and not isinstance(_id, dict):
+            found, doc = self._lru(self._by_id).get(_id)
+            if found and all(doc.get(k) == v for k, v in filter.items()):
+                self.hits += 1
+                return copy.deepcopy(_project(doc, projection))
+
+        key = _freeze([filter, projection, sort])
+        found, doc = self._lru(self._queries).get(key)
+        if found:
+            self.hits += 1
+            return copy.deepcopy(doc)
+
+        self.misses += 1
+        doc = avalon.io.find_one(filter, projection=projection, sort=sort)
+        self._lru(self._queries).set(key, doc)
+        if projection is None:
+            self._remember(doc)
+
+        return copy.deepcopy(doc)
+
+    def find(self, filter, projection=None, sort=None):
+        """Cached `avalon.io.find`, returns list instead of cursor
+
+        Returned documents are copies, safe to be modified.
+
+        """
+        key = _freeze(["find", filter, projection, sort])
+        found, docs = self._lru(self._queries).get(key)
+        if found:
+            self.hits += 1
+            return copy.deepcopy(docs)
+
+        self.misses += 1
+        docs = list(avalon.io.find(filter, projection=projection, sort=sort))
+        self._lru(self._queries).set(key, docs)
+        if projection is None:
+            for doc in docs:
+                self._remember(doc)
+
+        return copy.deepcopy(docs)
+
+    def prefetch(self, ids):
+        """Fetch documents by `_id` in one `$in` query
+
+        Arguments:
+            ids (list): Document ids, those already cached are skipped
+
+        Returns:
+            int: Number of fetched documents
+
+        """
+        by_id = self._lru(self._by_id)
+        missing = [_id for _id in set(ids) if not by_id.get(_id)[0]]
+        if not missing:
+            return 0
+
+        count = 0
+        for doc in avalon.io.find({"_id": {"$in": missing}}):
+            self._remember(doc)
+            count += 1
+
+        return count
+
+    def parenthood(self, document):
+        """Cached `avalon.io.parenthood`"""
+        assert document is not None, "This is a bug"
+
+        parents = list()
+
+        while document.get("parent") is not None:
+            document = self.find_one({"_id": document["parent"]})
+
+            if document is None:
+                break
+
+            if document.get("type") == "master_version":
+                _document = self.find_one({"_id": document["version_id"]})
+                document["data"] = _document["data"]
+
+            parents.append(document)
+
+        return parents
+
+    def invalidate(self, ids=None):
+        """Drop cached entries
+
+        Query results are always dropped since they may include the
+        changed documents.
+
+        Arguments:
+            ids (list, optional): Document ids to drop from `_id` index,
+                drop all if not given.
+
+        """
+        for lru in self._queries.values():
+            lru.clear()
+
+        if ids is None:
+            for lru in self._by_id.values():
+                lru.clear()
+        else:
+            by_id = self._lru(self._by_id)
+            for _id in ids:
+                by_id.pop(_id)
+
+
+def _project(doc, projection):
+    """Apply simple inclusion projection on cached document"""
+    if doc is None or not projection:
+        return doc
+
+    included = [k for k, v in projection.items() if v]
+    if not included:
+        return {k: v for k, v in doc.items() if projection.get(k, True)}
+
+    projected = {"_id": doc["_id"]} if projection.get("_id", True) else {}
+    for path in included:
+        head = path.split(".", 1)[0]
+        if head in doc:
+            projected[head] = doc[head]
+
+    return projected
+
+
+def current():
+    """Return active `DocumentCache` or None"""
+    return self._current
+
+
+def activate(cache):
+    """Set `cache` as the active cache, return previous one"""
+    previous, self._current = self._current, cache
+    return previous
+
+
+def deactivate():
+    """Deactivate current cache, return it"""
+    return activate(None)
+
+
+@contextlib.contextmanager
+def session(cache=None):
+    """Activate a cache within the context, e.g. for a loader session
+
+    Reuse current active cache if `cache` not given, or create one.
+
+    """
+    cache = cache or self._current or DocumentCache()
+    previous = activate(cache)
+    try:
+        yield cache
+    finally:
+        activate(previous)
+
+
+def of(context):
+    """Return the cache of pyblish context, create one if not exists
+
+    keys in context.data:
+        * documentCache
+
+    """
+    cache = context.data.get("documentCache")
+    if cache is None:
+        cache = context.data["documentCache"] = DocumentCache()
+    return cache
+
+
+def invalidate(ids=None):
+    """Invalidation hook, call after writing documents"""
+    if self._current is not None:
+        self._current.invalidate(ids)
+
+
+def find_one(filter, projection=None, sort=None):
+    """`avalon.io.find_one` through active cache"""
+    if self._current is not None:
+        return self._current.find_one(filter, projection, sort)
+
+    kwargs = dict()
+    if projection is not None:
+        kwargs["projection"] = projection
+    if sort is not None:
+        kwargs["sort"] = sort
+    return avalon.io.find_one(filter, **kwargs)
+
+
+def find(filter, projection=None, sort=None):
+    """`avalon.io.find` through active cache"""
+    if self._current is not None:
+        return self._current.find(filter, projection, sort)
+
+    kwargs = dict()
+    if projection is not None:
+        kwargs["projection"] = projection
+    if sort is not None:
+        kwargs["sort"] = sort
+    return avalon.io.find(filter, **kwargs)
+
+
+def parenthood(document):
+    """`avalon.io.parenthood` through active cache"""
+    if self._current is not None:
+        return self._current.parenthood(document)
+    return avalon.io.parenthood(document)
+
+
+def prefetch(ids):
+    """Prefetch documents into active cache, no-op if none active"""
+    if self._current is not None:
+        return self._current.prefetch(ids)
+    return 0
@@ -0,0 +1,326 @@
+"""Compact encoding of texture `fileInventory` entries
+
+An entry used to list every file name explicitly, which makes the
+representation document of a long sequence or a big UDIM set grow into
+megabytes. When all file names share the same prefix and suffix around
+one number, they are stored as ranges instead:
+
+    # Explicit
+    {"fpattern": "wall.<UDIM>.tif",
+     "fnames": ["wall.1001.tif", "wall.1002.tif", ..., "wall.1101.tif"],
+     "fileVersions": [["wall.1001.tif", 3], ...],
+     ...}
+
+    # Compact
+    {"fpattern": "wall.<UDIM>.tif",
+     "frames": {"prefix": "wall.", "suffix": ".tif", "padding": 4,
+                "ranges": "1001-1099,1101"},
+     "fileVersionRanges": {"3": "1001-1050", "5": "1051-1099,1101"},
+     ...}
+
+File names are never used as document keys, since they contain dots
+which MongoDB does not accept in keys. File versions are kept as a list
+of [file name, version] pairs, and content IDs of files stored in the
+content store as a list of name and id pairs:
+
+    "contentIds": [{"name": "wall.1001.tif", "id": "c4..."}, ...]
+
+Readers should go through `fnames_of`, `file_versions_of` and
+`content_ids_of`, which accept both formats. Existing documents can be
+migrated with:
+
+    python -m reveries.fileinventory PROJECT [--dry-run]
+
+"""
+import re
+import copy
+import logging
+
+
+log = logging.getLogger(__name__)
+
+
+_DIGITS = re.compile(r"\d+")
+
+
+def format_ranges(numbers):
+    """Return range string of numbers, e.g. "1001-1099,1101"
+    """
+    numbers = sorted(set(numbers))
+    ranges = list()
+
+    start = end = None
+    for number in numbers:
+        if end is not None and number == end + 1:
+            end = number
+            continue
+        if start is not None:
+            ranges.append((start, end))
+        start = end = number
+    if start is not None:
+        ranges.append((start, end))
+
+    return ",".join(str(a) if a == b else "%d-%d" % (a, b)
+                    for a, b in ranges)
+
+
+def parse_ranges(text):
+    """Return list of numbers from range string, e.g. "1001-1003,1005"
+    """
+    numbers = list()
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        # Split on the dash that follows a digit, so negative numbers work
+        match = re.match(r"^(-?\d+)(?:-(-?\d+))?$", part)
+        if match is None:
+            raise ValueError("Invalid range: %r" % part)
+        start = int(match.group(1))
+        end = int(match.group(2) or start)
+        numbers.extend(range(start, end + 1))
+    return numbers
+
+
+def _format_number(number, padding):
+    return "%0*d" % (padding, number)
+
+
+def compact_fnames(fnames):
+    """Encode file names into prefix, suffix, padding and ranges
+
+    Numbers are looked up from the last one in file name, the first one
+    that all names agree on prefix and suffix around is used.
+
+    Returns:
+        dict: Compact form, or None if file names can not be encoded.
+
+    """
+    fnames = list(fnames)
+    if len(fnames) < 2:
+        return None
+
+    matches = [list(_DIGITS.finditer(name)) for name in fnames]
+    depth = min(len(m) for m in matches)
+
+    for k in range(1, depth + 1):
+        prefixes = set()
+        suffixes = set()
+        widths = set()
+        numbers = list()
+        unpadded = True
+
+        for name, runs in zip(fnames, matches):
+            run = runs[-k]
+            prefixes.add(name[:run.start()])
+            suffixes.add(name[run.end():])
+            text = run.group(0)
+            widths.add(len(text))
+            numbers.append(int(text))
+            unpadded = unpadded and str(int(text)) == text
+
+        if len(prefixes) != 1 or len(suffixes) != 1:
+            continue
+
+        if len(widths) == 1:
+            padding = widths.pop()
+        elif unpadded:
+            padding = 0
+        else:
+            continue
+
+        compact = {
+            "prefix": prefixes.pop(),
+            "suffix": suffixes.pop(),
+            "padding": padding,
+            "ranges": format_ranges(numbers),
+        }
+        if sorted(expand_fnames(compact)) == sorted(fnames):
+            return compact
+
+    return None
+
+
+def expand_fnames(compact):
+    """Return file names from compact form"""
+    prefix = compact["prefix"]
+    suffix = compact["suffix"]
+    padding = compact["padding"]
+    return [prefix + _format_number(number, padding) + suffix
+            for number in parse_ranges(compact["ranges"])]
+
+
+def fnames_of(entry):
+    """Return file names of inventory entry, in either format"""
+    if "fnames" in entry:
+        return entry["fnames"]
+    return expand_fnames(entry["frames"])
+
+
+def file_versions_of(entry):
+    """Return {file name: version} of inventory entry, in either format
+
+    Files that are not in the map are owned by entry's "version".
+
+    """
+    if "fileVersionRanges" in entry:
+        frames = entry["frames"]
+        file_versions = dict()
+        for version, ranges in entry["fileVersionRanges"].items():
+            for number in parse_ranges(ranges):
+                fname = (frames["prefix"] +
+                         _format_number(number, frames["padding"]) +
+                         frames["suffix"])
+                file_versions[fname] = int(version)
+        return file_versions
+
+    return dict(entry.get("fileVersions", []))
+
+
+def file_version_pairs(file_versions):
+    """Return {file name: version} as list of [file name, version] pairs"""
+    return [[fname, file_versions[fname]] for fname in sorted(file_versions)]
+
+
+def content_id_pairs(content_ids):
+    """Return {file name: content ID} as list of name and id pairs"""
+    return [{"name": name, "id": content_ids[name]}
+            for name in sorted(content_ids)]
+
+
+def content_ids_of(entry):
+    """Return {file name: content ID} of inventory entry"""
+    return {pair["name"]: pair["id"]
+            for pair in entry.get("contentIds", [])}
+
+
+def compact_entry(entry):
+    """Return a copy of inventory entry in compact form if possible
+
+    Entry that is already compact, or can not be encoded, is returned as
+    a copy.
+
+    """
+    entry = copy.deepcopy(entry)
+    if "fnames" not in entry:
+        return entry
+
+    if "fileVersions" in entry:
+        # Never keyed by file name, see module doc
+        entry["fileVersions"] = file_version_pairs(
+            dict(entry["fileVersions"]))
+
+    compact = compact_fnames(entry["fnames"])
+    if compact is None:
+        return entry
+
+    file_versions = dict(entry.pop("fileVersions", []))
+    if file_versions:
+        prefix = len(compact["prefix"])
+        suffix = len(compact["suffix"])
+        numbers_by_version = dict()
+        for fname, version in file_versions.items():
+            number = int(fname[prefix:len(fname) - suffix])
+            numbers_by_version.setdefault(str(version), []).append(number)
+
+        entry["fileVersionRanges"] = {
+            version: format_ranges(numbers)
+            for version, numbers in numbers_by_version.items()
+        }
+
+    del entry["fnames"]
+    entry["frames"] = compact
+
+    return entry
+
+
+def expand_entry(entry):
+    """Return a copy of inventory entry in explicit form"""
+    entry = copy.deepcopy(entry)
+    if "fnames" in entry:
+        return entry
+
+    file_versions = file_versions_of(entry)
+    entry["fnames"] = expand_fnames(entry.pop("frames"))
+    entry.pop("fileVersionRanges", None)
+    if file_versions:
+        entry["fileVersions"] = file_version_pairs(file_versions)
+
+    return entry
+
+
+def compact_inventory(file_inventory):
+    """Return compacted copy of whole `fileInventory` list"""
+    return [compact_entry(entry) for entry in file_inventory]
+
+
+def migrate(collection, dry_run=False):
+    """Compact `fileInventory` of all representations in collection
+
+    Arguments:
+        collection (pymongo.collection.Collection): Project collection
+        dry_run (bool, optional): Only report, change nothing
+
+    Returns:
+        dict: {"documents": migrated count, "before": bytes, "after": bytes}
+
+    """
+    import bson
+
+    report = {"documents": 0, "before": 0, "after": 0}
+
+    filter = {
+        "type": "representation",
+        "data.fileInventory.fnames": {"$exists": True},
+    }
+    projection = {"data.fileInventory": True}
+
+    for doc in collection.find(filter, projection=projection):
+        inventory = doc["data"]["fileInventory"]
+        compacted = compact_inventory(inventory)
+        if compacted == inventory:
+            continue
+
+        report["documents"] += 1
+        report["before"] += len(bson.BSON.encode({"v": inventory}))
+        report["after"] += len(bson.BSON.encode({"v": compacted}))
+
+        if not dry_run:
+            collection.update_one(
+                {"_id": doc["_id"]},
+                {"$set": {"data.fileInventory": compacted}}
+            )
+
+    return report
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m reveries.fileinventory",
+        description="Compact texture fileInventory of representations.")
+    parser.add_argument("project", help="Project name")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only report, change nothing.")
+    args = parser.parse_args(argv)
+
+    import avalon.io
+    import avalon.api
+
+    avalon.io.install()
+    avalon.api.Session["AVALON_PROJECT"] = args.project
+    collection = avalon.io._database[args.project]
+
+    report = migrate(collection, dry_run=args.dry_run)
+
+    print("%d representations %s, fileInventory %.1f KB -> %.1f KB." % (
+        report["documents"],
+        "to migrate" if args.dry_run else "migrated",
+        report["before"] / 1024.0,
+        report["after"] / 1024.0))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
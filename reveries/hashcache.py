@@ -0,0 +1,311 @@
+import os
+import sys
+import time
+import sqlite3
+import logging
+import threading
+
+
+log = logging.getLogger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS filehash (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+_INDEX = "CREATE INDEX IF NOT EXISTS filehash_accessed ON filehash (accessed)"
+
+# Failures that are treated as cache miss or no-op, e.g. read-only home
+# dir on farm workers, or file removed while being looked up.
+_ERRORS = (OSError, IOError, sqlite3.Error)
+
+
+def default_cache_path():
+    """Return hash cache database file path
+
+    Use environment variable `REVERIES_HASH_CACHE` if set (e.g. a sidecar
+    file under project root), or fallback to user cache dir.
+
+    """
+    path = os.environ.get("REVERIES_HASH_CACHE")
+    if path:
+        return path
+
+    if sys.platform == "win32":
+        root = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+    else:
+        root = os.environ.get("XDG_CACHE_HOME",
+                              os.path.join(os.path.expanduser("~"), ".cache"))
+
+    return os.path.join(root, "reveries", "hashcache.db")
+
+
+def file_signature(file_path, stat=None):
+    """Return (size, mtime_ns, inode) of file for cache validation
+
+    Arguments:
+        file_path (str): File path
+        stat (os.stat_result, optional): Pre-fetched stat result
+
+    """
+    stat = stat or os.stat(file_path)
+    mtime_ns = getattr(stat, "st_mtime_ns", None)
+    if mtime_ns is None:
+        # Python 2
+        mtime_ns = int(stat.st_mtime * 1e9)
+
+    return stat.st_size, mtime_ns, stat.st_ino
+
+
+class HashCache(object):
+    """Persistent file content hash cache backed by SQLite
+
+    Each entry is keyed by file path and only valid while file size,
+    modification time (ns) and inode are unchanged, so a cache hit only
+    costs one `stat`.
+
+    The database file can be shared by multiple processes, SQLite's file
+    locking serialize the writes and every write is one short transaction.
+    Database and file system errors are logged and treated as cache miss,
+    the cache should never break a publish.
+
+    Example:
+        >>> cache = HashCache("/path/to/hashcache.db")
+        >>> cache.get("/path/to/file")  # None on miss
+        >>> cache.put("/path/to/file", "hex digest")
+
+    Arguments:
+        db_path (str): SQLite database file path
+        max_age (float, optional): Entries not accessed in these seconds
+            will be evicted, default 90 days.
+        max_entries (int, optional): Keep at most this many entries by
+            least recently used, default 1,000,000.
+        timeout (float, optional): Seconds to wait for database lock.
+
+    """
+
+    MAX_AGE = 60 * 60 * 24 * 90
+    MAX_ENTRIES = 1000000
+
+    def __init__(self,
+                 db_path,
+                 max_age=None,
+                 max_entries=None,
+                 timeout=30.0):
+        self.db_path = db_path
+        self.max_age = self.MAX_AGE if max_age is None else max_age
+        self.max_entries = (self.MAX_ENTRIES if max_entries is None
+                            else max_entries)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._evicted = False
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+
+        dir_path = os.path.dirname(self.db_path)
+        if dir_path and not os.path.isdir(dir_path):
+            try:
+                os.makedirs(dir_path)
+            except OSError:
+                if not os.path.isdir(dir_path):
+                    raise
+
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+        with conn:
+            conn.execute(_SCHEMA)
+            conn.execute(_INDEX)
+
+        self._local.conn = conn
+
+        if not self._evicted:
+            self._evicted = True
+            self.evict()
+
+        return conn
+
+    def close(self):
+        """Close database connection of current thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @staticmethod
+    def _key(file_path):
+        return os.path.normcase(os.path.abspath(file_path))
+
+    def get(self, file_path, stat=None):
+        """Return cached digest of file or None if missing or outdated
+
+        Arguments:
+            file_path (str): File path
+            stat (os.stat_result, optional): Pre-fetched stat result
+
+        """
+        return self.get_many([(file_path, stat)]).get(file_path)
+
+    def get_many(self, files):
+        """Return cached digests of files that are still valid
+
+        Arguments:
+            files (list): List of file path or (file path, stat) tuple
+
+        Returns:
+            dict: {file path: digest}, only has entries that hit
+
+        """
+        found = dict()
+        now = time.time()
+        try:
+            conn = self._connect()
+            hits = list()
+            for item in files:
+                file_path, stat = (item if isinstance(item, tuple)
+                                   else (item, None))
+                key = self._key(file_path)
+                row = conn.execute(
+                    "SELECT size, mtime_ns, inode, digest FROM filehash "
+                    "WHERE path = ?", (key,)
+                ).fetchone()
+
+                if row is None:
+                    continue
+                try:
+                    signature = file_signature(file_path, stat)
+                except (OSError, IOError):
+                    continue
+                if tuple(row[:3]) != signature:
+                    continue
+
+                found[file_path] = row[3]
+                hits.append((now, key))
+
+            if hits:
+                # Touch for LRU
+                with conn:
+                    conn.executemany(
+                        "UPDATE filehash SET accessed = ? WHERE path = ?",
+                        hits
+                    )
+
+        except _ERRORS as e:
+            log.warning("Hash cache read failed: %s" % e)
+
+        return found
+
+    def put(self, file_path, digest, stat=None):
+        """Store file digest
+
+        Arguments:
+            file_path (str): File path
+            digest (str): Hash value of file content
+            stat (os.stat_result, optional): Stat result taken *before*
+                the content was read, so a file modified while hashing
+                will not be cached as valid.
+
+        """
+        self.put_many([(file_path, digest, stat)])
+
+    def put_many(self, entries):
+        """Store multiple file digests in one transaction
+
+        Arguments:
+            entries (list): List of (file path, digest, stat) tuple
+
+        """
+        now = time.time()
+        rows = list()
+        for file_path, digest, stat in entries:
+            try:
+                size, mtime_ns, inode = file_signature(file_path, stat)
+            except (OSError, IOError) as e:
+                log.warning("Hash cache skipped file: %s" % e)
+                continue
+            rows.append((self._key(file_path),
+                         size, mtime_ns, inode, digest, now))
+        if not rows:
+            return
+
+        try:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO filehash "
+                    "(path, size, mtime_ns, inode, digest, accessed) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+        except _ERRORS as e:
+            log.warning("Hash cache write failed: %s" % e)
+
+    def evict(self, max_age=None, max_entries=None):
+        """Remove expired and least recently used entries
+
+        Arguments:
+            max_age (float, optional): Override `self.max_age`
+            max_entries (int, optional): Override `self.max_entries`
+
+        Returns:
+            int: Number of evicted entries
+
+        """
+        max_age = self.max_age if max_age is None else max_age
+        max_entries = self.max_entries if max_entries is None else max_entries
+
+        try:
+            conn = self._connect()
+            with conn:
+                removed = conn.execute(
+                    "DELETE FROM filehash WHERE accessed < ?",
+                    (time.time() - max_age,)
+                ).rowcount
+                removed += conn.execute(
+                    "DELETE FROM filehash WHERE path NOT IN ("
+                    "SELECT path FROM filehash "
+                    "ORDER BY accessed DESC LIMIT ?)",
+                    (max_entries,)
+                ).rowcount
+        except _ERRORS as e:
+            log.warning("Hash cache eviction failed: %s" % e)
+            return 0
+
+        return removed
+
+    def clear(self):
+        """Remove all entries"""
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM filehash")
+        except _ERRORS as e:
+            log.warning("Hash cache clear failed: %s" % e)
+
+
+_default = dict()
+
+
+def get_default():
+    """Return the shared `HashCache` of this process
+
+    Returns None if hash cache is disabled by setting environment variable
+    `REVERIES_HASH_CACHE_DISABLED`.
+
+    """
+    if os.environ.get("REVERIES_HASH_CACHE_DISABLED"):
+        return None
+
+    db_path = default_cache_path()
+    if db_path not in _default:
+        _default[db_path] = HashCache(db_path)
+
+    return _default[db_path]
@@ -1,5 +1,5 @@
 
-import avalon.api
+from .. import pathremap
 
 
 def env_embedded_path(path):
@@ -9,11 +9,4 @@ def env_embedded_path(path):
     moves to other place.
 
     """
-    path = path.replace(
-        avalon.api.registered_root(), "$AVALON_PROJECTS", 1
-    )
-    path = path.replace(
-        avalon.Session["AVALON_PROJECT"], "$AVALON_PROJECT", 1
-    )
-
-    return path
+    return pathremap.env_remapper().remap_one(path)
@@ -64,19 +64,27 @@ def soft_mtime(path):
     return floor_dec(mtime, 4)
 
 
-def file_cmp(A, B):
+def file_cmp(A, B, scanner=None):
     """Comparing two file by size and modification time
 
     (NOTE) The file modification time (seconds) only take down to 4
            decimal places. See function `soft_mtime`.
 
+    Args:
+        A (str): File path
+        B (str): File path
+        scanner (DirScanner, optional): Take file stats from the cached
+            listings of `reveries.dirscan.DirScanner` if given.
+
     """
+    getsize = scanner.getsize if scanner else os.path.getsize
+    getmtime = scanner.getmtime if scanner else os.path.getmtime
 
     def cmp_size(A, B):
-        return os.path.getsize(A) == os.path.getsize(B)
+        return getsize(A) == getsize(B)
 
     def cmp_mtime(A, B):
-        return soft_mtime(A) == soft_mtime(B)
+        return floor_dec(getmtime(A), 4) == floor_dec(getmtime(B), 4)
 
     same_size = cmp_size(A, B)
     same_time = cmp_mtime(A, B)
@@ -196,6 +204,157 @@ def get_deadline_pools():
     return pools
 
 
+_fallback_clients = dict()
+
+
+def mongo_client():
+    """Return `pymongo.MongoClient` of `avalon.io`
+
+    (NOTE) Deliberately reaching into `avalon.io` private globals, which
+           is the connection `avalon.io` was installed with, for the
+           operations it does not wrap. If those are not there (e.g.
+           `avalon.io` changed), fallback to a client of `AVALON_MONGO`.
+
+    """
+    client = getattr(avalon.io, "_mongo_client", None)
+    if client is not None:
+        return client
+
+    import pymongo
+
+    uri = avalon.api.Session.get("AVALON_MONGO") or os.environ["AVALON_MONGO"]
+    if uri not in _fallback_clients:
+        log.debug("No 'avalon.io._mongo_client', connecting %s" % uri)
+        _fallback_clients[uri] = pymongo.MongoClient(
+            uri, serverSelectionTimeoutMS=5000)
+    return _fallback_clients[uri]
+
+
+def project_collection():
+    """Return `pymongo.collection.Collection` of current project
+
+    For operations that `avalon.io` does not provide, e.g. bulk write and
+    aggregation.
+
+    """
+    # (NOTE) `avalon.io._database` is private, see `mongo_client`
+    database = getattr(avalon.io, "_database", None)
+    if database is None:
+        db_name = (avalon.api.Session.get("AVALON_DB") or
+                   os.environ["AVALON_DB"])
+        database = mongo_client()[db_name]
+
+    return database[avalon.api.Session["AVALON_PROJECT"]]
+
+
+_transaction_support = dict()
+
+
+def supports_transaction():
+    """Return True if connected MongoDB server supports transaction
+
+    Multi-document transaction requires MongoDB 4.0 replica set or 4.2
+    sharded cluster.
+
+    """
+    client = mongo_client()
+    key = id(client)
+    if key not in _transaction_support:
+        try:
+            info = client.admin.command("ismaster")
+        except Exception as e:
+            log.debug("Unable to query server info: %s" % e)
+            supported = False
+        else:
+            wire = info.get("maxWireVersion", 0)
+            supported = (("setName" in info and wire >= 7) or
+                         (info.get("msg") == "isdbgrid" and wire >= 8))
+        _transaction_support[key] = supported
+
+    return _transaction_support[key]
+
+
+def bulk_write(requests, transaction=True):
+    """Write requests to current project in one ordered bulk operation
+
+    The bulk write will be wrapped in one transaction if the server
+    supports it, so either all documents are written or none.
+
+    Arguments:
+        requests (list): List of `pymongo` write operations, e.g.
+            `pymongo.InsertOne`
+        transaction (bool, optional): Use transaction when possible,
+            default True.
+
+    Returns:
+        pymongo.results.BulkWriteResult
+
+    """
+    collection = project_collection()
+
+    if transaction and supports_transaction():
+        client = mongo_client()
+        with client.start_session() as session:
+            with session.start_transaction():
+                return collection.bulk_write(requests,
+                                             ordered=True,
+                                             session=session)
+
+    return collection.bulk_write(requests, ordered=True)
+
+
+def resolve_latest(representation_ids):
+    """Resolve whether representations are from latest version in batch
+
+    One aggregation finds the representations, their parent versions
+    and the highest version name of each subset, so the cost is one round
+    trip no matter how many representations are given.
+
+    Args:
+        representation_ids (list): Representation `ObjectId`s, duplicates
+            are allowed.
+
+    Returns:
+        dict: Map of representation id to a dict with keys "version",
+            "latest" (version names) and "outdated" (bool), or to `None`
+            if the representation is missing in the database.
+
+    """
+    ids = list(set(representation_ids))
+    resolved = dict.fromkeys(ids)
+    if not ids:
+        return resolved
+
+    collection = project_collection()
+    pipeline = [
+        {"$match": {"_id": {"$in": ids}, "type": "representation"}},
+        {"$project": {"parent": True}},
+        # Parent version
+        {"$lookup": {"from": collection.name,
+                     "localField": "parent",
+                     "foreignField": "_id",
+                     "as": "version"}},
+        {"$unwind": "$version"},
+        # Versions under the same subset, plain lookup so it can use the
+        # index of `parent`.
+        {"$lookup": {"from": collection.name,
+                     "localField": "version.parent",
+                     "foreignField": "parent",
+                     "as": "siblings"}},
+        {"$project": {"version": "$version.name",
+                      "latest": {"$max": "$siblings.name"}}},
+    ]
+
+    for doc in collection.aggregate(pipeline):
+        resolved[doc["_id"]] = {
+            "version": doc["version"],
+            "latest": doc["latest"],
+            "outdated": doc["version"] < doc["latest"],
+        }
+
+    return resolved
+
+
 def is_latest(representation):
     """Return whether the representation is from latest version
 
@@ -206,44 +365,24 @@ def is_latest(representation):
         bool: Whether the representation is of latest version.
 
     """
-
-    version = avalon.io.find_one({"_id": representation['parent']})
-
-    # Get highest version under the parent
-    highest_version = avalon.io.find_one({
-        "type": "version",
-        "parent": version["parent"]
-    }, sort=[("name", -1)], projection={"name": True})
-
-    if version["name"] == highest_version["name"]:
-        return True
-    else:
-        return False
+    resolved = resolve_latest([representation["_id"]])[representation["_id"]]
+    return resolved is not None and not resolved["outdated"]
 
 
 def any_outdated():
     """Return whether the current scene has any outdated content"""
 
-    checked = set()
     host = avalon.api.registered_host()
-    for container in host.ls():
-        representation = avalon.io.ObjectId(container["representation"])
-        if representation in checked:
-            continue
-
-        representation_doc = avalon.io.find_one(
-            {"_id": representation, "type": "representation"},
-            projection={"parent": True}
-        )
+    containers = list(host.ls())
+    resolved = resolve_latest([avalon.io.ObjectId(container["representation"])
+                               for container in containers])
 
-        if representation_doc and not is_latest(representation_doc):
-            return True
-
-        elif not representation_doc:
+    for container in containers:
+        representation = avalon.io.ObjectId(container["representation"])
+        if resolved[representation] is None:
             log.debug("Container '{objectName}' has an invalid "
                       "representation, it is missing in the "
                       "database".format(**container))
 
-        checked.add(representation)
-
-    return False
+    return any(result["outdated"] for result in resolved.values()
+               if result is not None)
@@ -10,6 +10,7 @@ from avalon.maya.pipeline import (
 )
 
 from ..plugins import message_box_error
+from .. import doccache
 
 from . import lib
 from . import capsule
@@ -194,7 +195,7 @@ def get_representation(representation_id):
         return _cached_representations[representation_id]
 
     except KeyError:
-        representation = avalon.io.find_one(
+        representation = doccache.find_one(
             {"_id": avalon.io.ObjectId(representation_id)})
 
         if representation is None:
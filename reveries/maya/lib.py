@@ -6,14 +6,11 @@ import itertools
 from collections import defaultdict
 from maya import cmds, mel
 from maya.api import OpenMaya as om
-from maya.app.general.fileTexturePathResolver import (
-    getFilePatternString,
-    findAllFilesForPattern,
-)
+from maya.app.general.fileTexturePathResolver import getFilePatternString
 
 from avalon import io
 
-from .. import lib
+from .. import lib, dirscan, fileinventory
 from ..vendor.six import string_types, moves as six_moves
 from .vendor import capture
 from ..utils import get_representation_path_
@@ -1980,9 +1977,18 @@ def is_versioned_texture_path(path):
     return bool(re.match(pattern, path))
 
 
-def profiling_file_nodes(file_nodes):
+def profiling_file_nodes(file_nodes, scanner=None):
     """Collect texture file data from node for publish use
+
+    Args:
+        file_nodes (list): Maya file nodes
+        scanner (DirScanner, optional): For listing each texture dir once
+            and keeping the file stats for later use, e.g. the one from
+            `reveries.dirscan.of(context)`. A temporary one is used if not
+            given.
+
     """
+    scanner = scanner or dirscan.DirScanner()
     file_data = list()
     file_count = 0
 
@@ -2010,10 +2016,7 @@ def profiling_file_nodes(file_nodes):
             pattern = getFilePatternString(file_path,
                                            is_sequence,
                                            tiling_mode)
-            all_files = [
-                os.path.basename(fpath) for fpath in
-                findAllFilesForPattern(pattern, frameNumber=None)
-            ]
+            all_files = scanner.find(pattern)
 
         if not all_files:
             log.error("%s file not exists." % file_node)
@@ -2043,6 +2046,17 @@ def profiling_file_nodes(file_nodes):
 
 def resolve_file_profile(representation, file_inventory):
     """Resolve texture file abs path from representation
+
+    Each file is resolved into the version that owns it, which may differ
+    between files of one pattern if only some of them were changed in that
+    version (see `reveries.fileinventory.file_versions_of`). The complete
+    set of files is always available in the version dir of the pattern,
+    which is resolved as "dir". File inventory may be in either explicit or
+    compact format.
+
+    Returns:
+        dict: {fpattern: [(inventory data, {"dir": str, "pathMap": dict})]}
+
     """
     resolved_by_fpattern = dict()
 
@@ -2053,22 +2067,23 @@ def resolve_file_profile(representation, file_inventory):
 
         _repr_path_cache = dict()
 
+        def repr_path_of(version_num):
+            if version_num not in _repr_path_cache:
+                version = {"name": version_num}
+                parents = (version, subset, asset, project)
+                _repr_path_cache[version_num] = get_representation_path_(
+                    representation, parents)
+            return _repr_path_cache[version_num]
+
         for data in file_inventory:
             resolved = dict()
             version_num = data["version"]
+            file_versions = fileinventory.file_versions_of(data)
 
-            if version_num in _repr_path_cache:
-                repr_path = _repr_path_cache[version_num]
-
-            else:
-                version = {"name": version_num}
-                parents = (version, subset, asset, project)
-                repr_path = get_representation_path_(representation,
-                                                     parents)
-                _repr_path_cache[version_num] = repr_path
-
+            resolved["dir"] = repr_path_of(version_num)
             resolved["pathMap"] = {
-                fn: repr_path + "/" + fn for fn in data["fnames"]
+                fn: repr_path_of(file_versions.get(fn, version_num)) + "/" + fn
+                for fn in fileinventory.fnames_of(data)
             }
 
             fpattern = data["fpattern"]
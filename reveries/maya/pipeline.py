@@ -14,7 +14,7 @@ from maya import cmds
 from . import lib
 from .vendor import sticker
 from .capsule import namespaced, nodes_locker
-from .. import REVERIES_ICONS, utils
+from .. import REVERIES_ICONS, utils, pathremap
 
 AVALON_GROUP_ATTR = "subsetGroup"
 AVALON_CONTAINER_ATTR = "container"
@@ -71,17 +71,11 @@ def env_embedded_path(path):
     """Embed environment var `$AVALON_PROJECTS` and `$AVALON_PROJECT` into path
 
     This will ensure reference or cache path resolvable when project root
-    moves to other place.
+    moves to other place. Only path under project root is embedded, see
+    `reveries.pathremap.env_remapper`.
 
     """
-    path = path.replace(
-        avalon.api.registered_root(), "$AVALON_PROJECTS", 1
-    )
-    path = path.replace(
-        avalon.Session["AVALON_PROJECT"], "$AVALON_PROJECT", 1
-    )
-
-    return path
+    return pathremap.env_remapper().remap_one(path)
 
 
 def subset_group_name(namespace, name):
@@ -14,6 +14,7 @@ from .utils import (
 )
 
 from ..utils import get_representation_path_
+from .. import doccache
 
 from ..plugins import (
     PackageLoader,
@@ -517,20 +518,25 @@ class HierarchicalLoader(MayaBaseLoader):
         # Load sub-subsets
         self._cache_current_container_ids()
         sub_containers = []
-        for data in members:
+        with doccache.session():
+            # Fetch all members' representation in one query
+            doccache.prefetch([avalon.io.ObjectId(data["representation"])
+                               for data in members])
 
-            repr_id = data["representation"]
-            data["representationDoc"] = get_representation(repr_id)
-            data["loaderCls"] = get_loader(data["loader"], repr_id)
+            for data in members:
 
-            root = group_name
-            with add_subset(data, namespace, root) as sub_container:
+                repr_id = data["representation"]
+                data["representationDoc"] = get_representation(repr_id)
+                data["loaderCls"] = get_loader(data["loader"], repr_id)
 
-                self._cache_container_id(sub_container)
-                self.apply_variation(data=data,
-                                     container=sub_container)
+                root = group_name
+                with add_subset(data, namespace, root) as sub_container:
+
+                    self._cache_container_id(sub_container)
+                    self.apply_variation(data=data,
+                                         container=sub_container)
 
-            sub_containers.append(sub_container["objectName"])
+                sub_containers.append(sub_container["objectName"])
 
         self[:] = hierarchy + sub_containers
 
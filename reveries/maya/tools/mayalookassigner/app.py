@@ -165,6 +165,7 @@ class App(QtWidgets.QWidget):
         # Delete callbacks
         for callback in self._callbacks:
             om.MMessage.removeCallback(callback)
+        commands.close_hash_index()
 
         return super(App, self).closeEvent(event)
 
@@ -1,4 +1,5 @@
 
+import sys
 import logging
 import json
 import os
@@ -21,6 +22,9 @@ from .models import UNDEFINED_SUBSET
 
 log = logging.getLogger(__name__)
 
+self = sys.modules[__name__]
+self._hash_index = None
+
 
 def get_workfile():
     path = cmds.file(query=True, sceneName=True) or "untitled"
@@ -439,6 +443,20 @@ def _apply_ai_attrs(look, relationship, nodes):
             )
 
 
+def scene_hash_index():
+    """Return the mesh hash index shared by look assignments"""
+    if self._hash_index is None:
+        self._hash_index = utils.SceneHashIndex()
+    return self._hash_index
+
+
+def close_hash_index():
+    """Remove callbacks of the mesh hash index and drop it"""
+    if self._hash_index is not None:
+        self._hash_index.close()
+        self._hash_index = None
+
+
 def _look_via_uv(look, relationships, nodes):
     """Assign looks via namespaces and using UV hash as hint
 
@@ -451,28 +469,31 @@ def _look_via_uv(look, relationships, nodes):
     is correct, the rest of the models can compare with thier UV hashes and
     use that as a hint to apply look.
 
+    UV hashes are taken from published `modelProfile` if possible, or from
+    the scene hash cache, see `scene_hash_index`.
+
     """
 
-    hasher = utils.MeshHasher()
     uv_via_id = dict()
     id_via_uv = dict()
 
     hierarchy = list_descendents(nodes)
 
+    mesh_by_id = dict()
     for mesh in cmds.ls(list(set(nodes + hierarchy)),
                         type="mesh",  # We can only hash meshes.
                         ):
         node = cmds.listRelatives(mesh, parent=True, path=True)[0]
 
         id = utils.get_id(node)
-        if id in uv_via_id:
-            continue
+        if id not in mesh_by_id:
+            mesh_by_id[id] = node
 
-        hasher.clear()
-        hasher.set_mesh(node)
-        hasher.update_uvmap()
-        uv_hash = hasher.digest().get("uvmap")
+    ids = list(mesh_by_id)
+    uv_hashes = scene_hash_index().hashes([mesh_by_id[id] for id in ids],
+                                          component="uvmap")
 
+    for id, uv_hash in zip(ids, uv_hashes):
         if uv_hash is None:
             continue
 
@@ -47,18 +47,6 @@ def show():
         module.window = window
 
 
-_hasher = utils.MeshHasher()
-
-
-def _hash(mesh):
-    _hasher.clear()
-    _hasher.set_mesh(mesh)
-    _hasher.update_points()
-    _hasher.update_uvmap()
-
-    return _hasher.digest()
-
-
 def profile_from_host(container=None):
     """
     Args:
@@ -95,8 +83,9 @@ def profile_from_host(container=None):
         return
 
     profile = dict()
+    digests = utils.hash_meshes(meshes, components=("points", "uvmap"))
 
-    for mesh in meshes:
+    for mesh, digest in zip(meshes, digests):
         transform = cmds.listRelatives(mesh, parent=True, fullPath=True)[0]
 
         if root and transform.startswith(root):
@@ -111,7 +100,7 @@ def profile_from_host(container=None):
             "points": None,
             "uvmap": None,
         }
-        data.update(_hash(mesh))
+        data.update(digest)
 
         profile[name] = data
 
@@ -14,7 +14,7 @@ except ImportError:
 from datetime import datetime
 
 from avalon import api, io
-from avalon.maya.pipeline import AVALON_CONTAINERS
+from avalon.maya.pipeline import AVALON_CONTAINERS, AVALON_CONTAINER_ID
 
 import avalon_sftpc
 
@@ -23,6 +23,7 @@ from maya.api import OpenMaya as om
 
 from ..vendor import six
 from ..utils import _C4Hasher, get_representation_path_, localtz
+from .. import doccache, dirscan, pathremap, meshhash
 from .pipeline import (
     find_stray_textures,
     env_embedded_path,
@@ -35,6 +36,49 @@ from . import lib, capsule
 log = logging.getLogger(__name__)
 
 
+def file_texture_names(nodes):
+    """Return {node: fileTextureName} of file nodes, unexpanded
+
+    Values are read through API in one pass instead of one `getAttr` per
+    node.
+
+    """
+    selection = om.MSelectionList()
+    for node in nodes:
+        selection.add(node)
+
+    fn_node = om.MFnDependencyNode()
+    names = OrderedDict()
+    for i, node in enumerate(nodes):
+        fn_node.setObject(selection.getDependNode(i))
+        names[node] = fn_node.findPlug("fileTextureName", False).asString()
+
+    return names
+
+
+def set_file_texture_names(path_by_node):
+    """Set file nodes' file path in one undo chunk
+
+    Args:
+        path_by_node (dict): {file node: new file path}
+
+    Returns:
+        list: Nodes that failed to edit, e.g. locked attribute
+
+    """
+    failed = list()
+    with capsule.undo_chunk(undo_on_exit=False):
+        for node, path in path_by_node.items():
+            try:
+                cmds.setAttr(node + ".fileTextureName", path, type="string")
+            except RuntimeError:
+                log.warning("Failed to set file path: %s -> %s"
+                            "" % (node, path))
+                failed.append(node)
+
+    return failed
+
+
 def texture_path_expand(nodes=lib._no_val):
     """Expand file nodes' file path that has environment variable embedded
 
@@ -44,11 +88,16 @@ def texture_path_expand(nodes=lib._no_val):
 
     """
     args = (nodes, ) if nodes is not lib._no_val else ()
+    names = file_texture_names(cmds.ls(*args, type="file"))
+
+    expanding = pathremap.env_remapper().reversed()
+    expanded = [os.path.expandvars(path)
+                for path in expanding.remap(names.values())]
 
-    for node in cmds.ls(*args, type="file"):
-        attr = node + ".fileTextureName"
-        path = cmds.getAttr(attr, expandEnvironmentVariables=True)
-        cmds.setAttr(attr, path, type="string")
+    set_file_texture_names({
+        node: path for (node, origin), path in zip(names.items(), expanded)
+        if path != origin
+    })
 
 
 def texture_path_embed(nodes=lib._no_val):
@@ -64,19 +113,15 @@ def texture_path_embed(nodes=lib._no_val):
 
     """
     args = (nodes, ) if nodes is not lib._no_val else ()
+    names = file_texture_names(cmds.ls(*args, type="file"))
 
-    for node in cmds.ls(*args, type="file"):
-        attr = node + ".fileTextureName"
-        path = cmds.getAttr(attr, expandEnvironmentVariables=True)
-        embedded_path = env_embedded_path(path)
+    expanded = [os.path.expandvars(path) for path in names.values()]
+    embedded = pathremap.env_remapper().remap(expanded)
 
-        if not embedded_path == path:
-            try:
-                cmds.setAttr(attr, embedded_path, type="string")
-            except RuntimeError:
-                print(attr)
-                print(path)
-                print(embedded_path)
+    set_file_texture_names({
+        node: path for (node, origin), path in zip(names.items(), embedded)
+        if path != origin
+    })
 
 
 def remap_to_published_texture(nodes, representation_id, dry_run=False):
@@ -91,8 +136,10 @@ def remap_to_published_texture(nodes, representation_id, dry_run=False):
     (NOTE) The issue should be resolved in following commits. :')
 
     """
+    scanner = dirscan.DirScanner()
+
     file_nodes = cmds.ls(nodes, type="file")
-    count, file_data = lib.profiling_file_nodes(file_nodes)
+    count, file_data = lib.profiling_file_nodes(file_nodes, scanner)
     if not count:
         return
 
@@ -114,72 +161,37 @@ def remap_to_published_texture(nodes, representation_id, dry_run=False):
         return
 
     resolved_by_fpattern = lib.resolve_file_profile(repr, file_inventory)
+    index = pathremap.PublishedIndex(resolved_by_fpattern, scanner.isfile)
 
     # MAPPING
 
+    nodes_by_path = OrderedDict()
+
     for fpattern, file_datas in node_by_fpattern.items():
-        if fpattern not in resolved_by_fpattern:
-            fpattern_ = fpattern.rsplit(".", 1)[0]
-            for resolved_fpattern in resolved_by_fpattern:
-                if fpattern_ == resolved_fpattern.rsplit(".", 1)[0]:
-                    versioned_data = resolved_by_fpattern[resolved_fpattern]
-                    break
-            else:
-                continue
-        else:
-            versioned_data = resolved_by_fpattern[fpattern]
+        if index.fpattern_of(fpattern) is None:
+            continue
 
         data = file_datas[0]
-        file_nodes = [dat["node"] for dat in file_datas]
-        versioned_data.sort(key=lambda elem: elem[0]["version"],
-                            reverse=True)  # elem: (data, tmp_data)
-
-        for ver_data, resolved in versioned_data:
-
-            previous_files = resolved["pathMap"]
-
-            for file, abs_path in data["pathMap"].items():
-                if file not in previous_files:
-                    file = file.rsplit(".", 1)[0]
-                    for pre_file in previous_files:
-                        if file == pre_file.rsplit(".", 1)[0]:
-                            file = pre_file
-                            abs_previous = previous_files[pre_file]
-                            ext = pre_file.rsplit(".", 1)[1]
-                            abs_path = abs_path.rsplit(".", 1)[0] + "." + ext
-                            if not os.path.isfile(abs_path):
-                                continue
-                            else:
-                                break
-                    else:
-                        # Possible different file pattern
-                        break  # Try previous version
-                else:
-                    abs_previous = previous_files[file]
-
-                if not os.path.isfile(abs_previous):
-                    # Previous file not exists (should not happen)
-                    break  # Try previous version
-
-                # (NOTE) We don't need to check on file size and modification
-                #        time here since we are trying to map file to latest
-                #        version of published one.
-
-            else:
-                # Version matched, consider as same file
-                head_file = sorted(previous_files)[0]
-                resolved_path = abs_previous[:-len(file)] + head_file
-                embedded_path = env_embedded_path(resolved_path)
-                fix_texture_file_nodes(file_nodes, embedded_path, dry_run)
-
-                # Proceed to next pattern
-                break
-
-        else:
+        # (NOTE) We don't need to check on file size and modification
+        #        time here since we are trying to map file to latest
+        #        version of published one.
+        matched = index.lookup(fpattern, data["pathMap"])
+        if matched is None:
             # Not match with any previous version, this should not happen
             log.warning("No version matched.")
-            with open(dry_run, "a") as path_log:
-                path_log.write("\n * " + data["dir"] + "/" + fpattern + "\n\n")
+            if isinstance(dry_run, six.string_types):
+                with open(dry_run, "a") as path_log:
+                    path_log.write("\n * " + data["dir"] + "/" + fpattern +
+                                   "\n\n")
+            continue
+
+        _, resolved_path = matched
+        nodes = nodes_by_path.setdefault(resolved_path, list())
+        nodes.extend(dat["node"] for dat in file_datas)
+
+    embedded = pathremap.env_remapper().remap(nodes_by_path)
+    for embedded_path, file_nodes in zip(embedded, nodes_by_path.values()):
+        fix_texture_file_nodes(file_nodes, embedded_path, dry_run)
 
 
 def fix_texture_file_nodes(nodes=lib._no_val, file_path=None, dry_run=False):
@@ -243,26 +255,6 @@ def fix_texture_file_nodes(nodes=lib._no_val, file_path=None, dry_run=False):
 #       implement __eq__ to compare files
 
 
-def _hash_MPoint(x, y, z, w):
-    x = (x + 1) * 233
-    y = (y + x) * 239
-    z = (z + y) * 241
-    return (x + y + z) * w
-
-
-def _hash_MFloatVectors(x, y, z):
-    x = (x + 1) * 383
-    y = (y + x) * 389
-    z = (z + y) * 397
-    return x + y + z
-
-
-def _hash_UV(u, v):
-    u = (u + 1) * 547
-    v = (v + u) * 557
-    return u * v
-
-
 class MeshHasher(object):
     """A mesh geometry hasher for Maya
 
@@ -271,6 +263,10 @@ class MeshHasher(object):
 
     Order matters, transform does not.
 
+    Hashes are computed by `reveries.meshhash`, vectorized if NumPy is
+    available. Set `exact` to False for faster hashes that can only be
+    compared with other in-session fast hashes.
+
     Example Usage:
         >> hasher = MeshHasher()
         >> hasher.set_mesh("path|to|mesh")
@@ -295,9 +291,12 @@ class MeshHasher(object):
         You can still adding more meshes until you call `clear`
         >> hasher.clear()
 
+        Or hash each mesh in one call, see `hash_meshes`
+
     """
 
-    def __init__(self):
+    def __init__(self, exact=True):
+        self.exact = exact
         self.clear()
 
     def clear(self):
@@ -313,43 +312,239 @@ class MeshHasher(object):
             dag_path (str): Mesh node's DAG path
 
         """
-        sel_list = om.MSelectionList()
-        sel_list.add(dag_path)
-        sel_obj = sel_list.getDagPath(0)
-        self._mesh = om.MFnMesh(sel_obj)
+        self._mesh = _mfn_mesh(dag_path)
 
     def update_points(self):
-        for i, vt in enumerate(self._mesh.getPoints()):
-            self._points += _hash_MPoint(*vt) + i
+        self._points = meshhash.update("points",
+                                       self._mesh.getPoints(),
+                                       self._points,
+                                       self.exact)
 
     def update_normals(self):
-        for i, vt in enumerate(self._mesh.getNormals()):
-            self._normals += _hash_MFloatVectors(*vt) + i
+        self._normals = meshhash.update("normals",
+                                        self._mesh.getNormals(),
+                                        self._normals,
+                                        self.exact)
 
     def update_uvmap(self, uv_set=""):
-        for i, uv in enumerate(zip(*self._mesh.getUVs(uv_set))):
-            self._uvmap += _hash_UV(*uv) + i
+        self._uvmap = meshhash.update("uvmap",
+                                      self._mesh.getUVs(uv_set),
+                                      self._uvmap,
+                                      self.exact)
 
     def digest(self):
-        result = dict()
-        hasher = _C4Hasher()
+        return _digest_hashes({"points": self._points,
+                               "normals": self._normals,
+                               "uvmap": self._uvmap})
 
-        if self._points:
-            hasher.hash_obj.update(str(self._points))
-            result["points"] = hasher.digest()
-            hasher.clear()
 
-        if self._normals:
-            hasher.hash_obj.update(str(self._normals))
-            result["normals"] = hasher.digest()
-            hasher.clear()
+def _mfn_mesh(dag_path):
+    sel_list = om.MSelectionList()
+    sel_list.add(dag_path)
+    return om.MFnMesh(sel_list.getDagPath(0))
+
 
-        if self._uvmap:
-            hasher.hash_obj.update(str(self._uvmap))
-            result["uvmap"] = hasher.digest()
+def _digest_hashes(hashes):
+    result = dict()
+    hasher = _C4Hasher()
+
+    for key in ("points", "normals", "uvmap"):
+        value = hashes.get(key)
+        if value:
+            hasher.hash_obj.update(str(value))
+            result[key] = hasher.digest()
             hasher.clear()
 
-        return result
+    return result
+
+
+_MESH_DATA = {
+    "points": lambda mfn, uv_set: mfn.getPoints(),
+    "normals": lambda mfn, uv_set: mfn.getNormals(),
+    "uvmap": lambda mfn, uv_set: mfn.getUVs(uv_set),
+}
+
+
+def hash_meshes(meshes,
+                components=("points", "normals", "uvmap"),
+                uv_set="",
+                exact=True):
+    """Return `MeshHasher` digest of each mesh
+
+    Same as hashing each mesh with a cleared `MeshHasher`, but each
+    component of all meshes is hashed in one batch.
+
+    Arguments:
+        meshes (list): Mesh nodes' DAG paths
+        components (tuple, optional): Names of components to hash
+        uv_set (str, optional): UV set name, default current UV set
+        exact (bool, optional): See `MeshHasher`
+
+    Returns:
+        list: Digest of each mesh
+
+    """
+    mfns = [_mfn_mesh(mesh) for mesh in meshes]
+
+    hashes = [dict() for _ in mfns]
+    for key in components:
+        datas = (_MESH_DATA[key](mfn, uv_set) for mfn in mfns)
+        for value, mesh_hashes in zip(meshhash.hash_many(key, datas, exact),
+                                      hashes):
+            mesh_hashes[key] = value
+
+    return [_digest_hashes(mesh_hashes) for mesh_hashes in hashes]
+
+
+def _mesh_token(mfn):
+    return (mfn.numVertices,
+            mfn.numPolygons,
+            mfn.numFaceVertices,
+            mfn.numUVs(),
+            mfn.currentUVSetName())
+
+
+class SceneHashIndex(meshhash.HashIndex):
+    """`meshhash.HashIndex` of current scene
+
+    Published hashes are found through the container of mesh node's
+    namespace. Scene hashes are computed in batch by `hash_meshes` on cache
+    miss, keyed by node UUID and a token of topology counts and current UV
+    set. Cached hashes are dropped on any attribute change or connection
+    change of the mesh, or attribute change of the history node connected
+    to its `inMesh`. All of them are dropped on scene new or open.
+
+    Only attribute change messages are watched, not evaluation, so nothing
+    runs on playback. Call `invalidate` to rehash meshes changed by
+    evaluation alone, e.g. animated deformers. Call `close` when done to
+    remove all callbacks.
+
+    Example Usage:
+        >> index = SceneHashIndex()
+        >> index.hashes(["|foo:bar|foo:barShape", "|bar|barShape"])
+        ['c45JRQTPxgMNYfcijAbm31vkJRt6CUUSn7ew2X1Mnyjwi...', None]
+
+    """
+
+    def __init__(self, fetch=None):
+        super(SceneHashIndex, self).__init__(fetch)
+        self._watched = dict()
+        # Meshes that `inMesh` was reconnected, watch new history node
+        self._rewatch = set()
+        self._scene_callbacks = [
+            om.MSceneMessage.addCallback(message, self._on_scene_changed)
+            for message in (om.MSceneMessage.kBeforeNew,
+                            om.MSceneMessage.kBeforeOpen)
+        ]
+
+    def _on_scene_changed(self, *args):
+        self.invalidate()
+
+    def _on_mesh_changed(self, node_uuid):
+        # Callback is kept, mesh may be cached again
+        super(SceneHashIndex, self).invalidate(node_uuid)
+
+    def _watch(self, node_uuid, mfn):
+        if node_uuid in self._watched:
+            if node_uuid not in self._rewatch:
+                return
+            om.MMessage.removeCallbacks(self._watched.pop(node_uuid))
+        self._rewatch.discard(node_uuid)
+
+        connection = (om.MNodeMessage.kConnectionMade |
+                      om.MNodeMessage.kConnectionBroken)
+
+        def on_mesh_changed(message, plug, *args):
+            if (message & connection and
+                    plug.partialName(useLongNames=True) == "inMesh"):
+                self._rewatch.add(node_uuid)
+            self._on_mesh_changed(node_uuid)
+
+        callbacks = [
+            om.MNodeMessage.addAttributeChangedCallback(mfn.object(),
+                                                        on_mesh_changed),
+        ]
+
+        history = mfn.findPlug("inMesh", False).source()
+        if not history.isNull:
+            callbacks.append(om.MNodeMessage.addAttributeChangedCallback(
+                history.node(),
+                lambda *args: self._on_mesh_changed(node_uuid)))
+
+        self._watched[node_uuid] = callbacks
+
+    def invalidate(self, uuid=None):
+        if uuid is None:
+            callbacks = sum(self._watched.values(), [])
+            self._watched.clear()
+            self._rewatch.clear()
+        else:
+            callbacks = self._watched.pop(uuid, [])
+            self._rewatch.discard(uuid)
+        if callbacks:
+            om.MMessage.removeCallbacks(callbacks)
+        super(SceneHashIndex, self).invalidate(uuid)
+
+    def close(self):
+        """Remove all callbacks"""
+        self.invalidate()
+        om.MMessage.removeCallbacks(self._scene_callbacks)
+        self._scene_callbacks = []
+
+    def _representations(self):
+        """Return {namespace: representation id} of loaded containers"""
+        representations = dict()
+        for container in lib.lsAttrs({"id": AVALON_CONTAINER_ID}):
+            namespace = cmds.getAttr(container + ".namespace")
+            representations[namespace] = cmds.getAttr(
+                container + ".representation")
+        return representations
+
+    def hashes(self, nodes, component="uvmap"):
+        """Return hash digest of one component of each mesh node
+
+        Arguments:
+            nodes (list): Mesh or mesh transform nodes
+            component (str, optional): "points", "normals" or "uvmap"
+
+        Returns:
+            list: Hash digest of each node, None if mesh has no such
+                component
+
+        """
+        representations = self._representations()
+        self.prefetch(set(representations.values()))
+
+        results = [None] * len(nodes)
+        missed = list()
+
+        for index, node in enumerate(nodes):
+            representation = representations.get(lib.get_ns(node))
+            id = get_id(node)
+            if representation and id:
+                results[index] = self.published(representation, id,
+                                                component)
+                if results[index] is not None:
+                    continue
+
+            mfn = _mfn_mesh(node)
+            node_uuid = cmds.ls(node, uuid=True)[0]
+            token = _mesh_token(mfn)
+            found, results[index] = self.cached(node_uuid, token, component)
+            if not found:
+                missed.append((index, node, node_uuid, token, mfn))
+
+        if missed:
+            digests = hash_meshes([node for _, node, _, _, _ in missed],
+                                  components=(component,))
+            for (index, _, node_uuid, token, mfn), digest in zip(missed,
+                                                                 digests):
+                results[index] = digest.get(component)
+                self.store(node_uuid, token, {component: results[index]})
+                self._watch(node_uuid, mfn)
+
+        log.debug("Hashed %d of %d meshes." % (len(missed), len(nodes)))
+        return results
 
 
 def remove_unused_plugins():
@@ -954,7 +1149,7 @@ def get_output_paths(output_dir, renderer, layer, camera):
     return paths
 
 
-def update_dependency(container):
+def update_dependency(container, cache=None):
     """Update subset data and references
 
     This is for updating dependencies and relink them to assets in current
@@ -963,17 +1158,23 @@ def update_dependency(container):
     You need to manually update the representation id value in container before
     using this function.
 
+    Arguments:
+        container (str): Container node
+        cache (DocumentCache, optional): Query through this cache, default
+            through the active cache of `doccache`, if any.
+
     """
+    cache = cache or doccache
 
     representation_id = cmds.getAttr(container + ".representation")
     representation_id = io.ObjectId(representation_id)
 
-    representation = io.find_one({"_id": representation_id})
+    representation = cache.find_one({"_id": representation_id})
 
     if representation is None:
         raise Exception("Representation not found.")
 
-    version, subset, asset, project = io.parenthood(representation)
+    version, subset, asset, project = cache.parenthood(representation)
 
     cmds.setAttr(container + ".assetId", str(asset["_id"]), type="string")
     cmds.setAttr(container + ".subsetId", str(subset["_id"]), type="string")
@@ -1102,9 +1303,12 @@ class MayaSFTPCJobExporter(avalon_sftpc.util.JobExporter):
                                             "name": {"$lt": version["name"]}},
                                            sort=[("name", -1)]):
 
-                    pre_repr = io.find_one({"parent": pre_version["_id"]})
+                    # Only need to know whether file inventory exists
+                    pre_repr = io.find_one(
+                        {"parent": pre_version["_id"]},
+                        projection={"data.fileInventory.version": True})
 
-                    if "fileInventory" in pre_repr["data"]:
+                    if "fileInventory" in pre_repr.get("data", {}):
                         representations.add(str(pre_repr["_id"]))
                     else:
                         break
@@ -0,0 +1,230 @@
+"""Polynomial hash of mesh points, normals and UVs
+
+The hash of a mesh component is the sum of a polynomial of each element
+plus its index, which is order sensitive and cheap to compute:
+
+    point  (x, y, z, w)  ->  ((x + 1) * 233 ...) * w + index
+    normal (x, y, z)     ->  ((x + 1) * 383 ...) + index
+    uv     (u, v)        ->  ((u + 1) * 547 ...) + index
+
+With NumPy, the polynomial is computed over whole component arrays, and
+there are two ways of summing up:
+
+    * exact: Sequential sum, bit-exact to the pure Python loop, so hashes
+      match the ones that were published in `modelProfile`.
+    * fast: Pairwise sum, faster but rounds differently. Only compare fast
+      hashes with fast hashes computed in the same session, never store
+      them.
+
+Without NumPy, both fall back to the pure Python loop. Arrays are plain
+sequences here, this module does not depend on Maya.
+
+`HashIndex` keeps hash digests of meshes that were published or already
+hashed, so matching meshes by hash (e.g. assigning looks via UV) is a
+dictionary lookup instead of hashing every mesh again.
+
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def hash_point(x, y, z, w):
+    x = (x + 1) * 233
+    y = (y + x) * 239
+    z = (z + y) * 241
+    return (x + y + z) * w
+
+
+def hash_vector(x, y, z):
+    x = (x + 1) * 383
+    y = (y + x) * 389
+    z = (z + y) * 397
+    return x + y + z
+
+
+def hash_uv(u, v):
+    u = (u + 1) * 547
+    v = (v + u) * 557
+    return u * v
+
+
+def _loop(func, elements, total):
+    for i, element in enumerate(elements):
+        total += func(*element) + i
+    return total
+
+
+def _point_terms(points):
+    points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 4)
+    x, y, z, w = points.T
+    x = (x + 1) * 233
+    y = (y + x) * 239
+    z = (z + y) * 241
+    return (x + y + z) * w
+
+
+def _vector_terms(vectors):
+    vectors = numpy.asarray(vectors, dtype=numpy.float64).reshape(-1, 3)
+    x, y, z = vectors.T
+    x = (x + 1) * 383
+    y = (y + x) * 389
+    z = (z + y) * 397
+    return x + y + z
+
+
+def _uv_terms(uvs):
+    us, vs = uvs
+    u = numpy.asarray(us, dtype=numpy.float64)
+    v = numpy.asarray(vs, dtype=numpy.float64)
+    u = (u + 1) * 547
+    v = (v + u) * 557
+    return u * v
+
+
+_KINDS = {
+    # kind: (element hash, array terms, elements from data)
+    "points": (hash_point, _point_terms, lambda data: data),
+    "normals": (hash_vector, _vector_terms, lambda data: data),
+    "uvmap": (hash_uv, _uv_terms, lambda data: zip(*data)),
+}
+
+
+def _accumulate(terms, total, exact):
+    if not len(terms):
+        return total
+    terms = terms + numpy.arange(len(terms), dtype=numpy.float64)
+    if exact:
+        # `add.accumulate` adds in order, like the Python loop does
+        return float(numpy.add.accumulate(
+            numpy.concatenate([[total], terms]))[-1])
+    return total + float(terms.sum())
+
+
+def update(kind, data, total=0, exact=True):
+    """Add hash of one mesh component into total and return it
+
+    Arguments:
+        kind (str): "points", "normals" or "uvmap"
+        data: Points as (x, y, z, w) rows, normals as (x, y, z) rows, or
+            uvmap as a pair of (u values, v values)
+        total (float, optional): Hash of previous meshes
+        exact (bool, optional): Bit-exact to the pure Python loop
+
+    """
+    element_hash, array_terms, elements = _KINDS[kind]
+    if numpy is None:
+        return _loop(element_hash, elements(data), total)
+    return _accumulate(array_terms(data), total, exact)
+
+
+def hash_many(kind, datas, exact=True):
+    """Return hash of one component of each mesh
+
+    Arguments:
+        kind (str): "points", "normals" or "uvmap"
+        datas (list): Component data of each mesh, see `update`
+        exact (bool, optional): Bit-exact to the pure Python loop
+
+    Returns:
+        list: Hash of each mesh, 0 if mesh has no such component
+
+    """
+    return [update(kind, data, 0, exact) for data in datas]
+
+
+def profile_hashes(model_profile, component="uvmap"):
+    """Return {Avalon id: hash} of one component from a `modelProfile`
+
+    Ids of duplicated meshes that have different hashes are left out,
+    since those can not tell which mesh is which.
+
+    """
+    hashes = dict()
+    for id, meshes_data in model_profile.items():
+        values = set(data.get(component) for data in meshes_data)
+        if len(values) == 1 and None not in values:
+            hashes[id] = values.pop()
+    return hashes
+
+
+class HashIndex(object):
+    """Mesh hash digests from publish and from scene
+
+    Published hashes are the `modelProfile` of representations, looked up
+    by representation id and Avalon id, so meshes loaded from a published
+    model need no hashing at all.
+
+    Scene hashes are cached by node UUID, along with a token of mesh
+    topology (e.g. vertex and UV counts) and edits, a cached digest is
+    only used if the token is unchanged.
+
+    Arguments:
+        fetch (callable, optional): Called with a list of representation
+            ids, returns {representation id: modelProfile or None}.
+            Default reads representation documents via `doccache`.
+
+    """
+
+    def __init__(self, fetch=None):
+        self._fetch = fetch or _fetch_profiles
+        self._profiles = dict()
+        self._published = dict()
+        self._scene = dict()
+
+    def prefetch(self, representation_ids):
+        """Fetch model profiles of representations not fetched yet"""
+        missing = [_id for _id in set(representation_ids)
+                   if _id not in self._profiles]
+        if missing:
+            profiles = self._fetch(missing)
+            for _id in missing:
+                self._profiles[_id] = profiles.get(_id) or dict()
+
+    def published(self, representation_id, id, component="uvmap"):
+        """Return published hash of a mesh, or None"""
+        key = (representation_id, component)
+        if key not in self._published:
+            self.prefetch([representation_id])
+            self._published[key] = profile_hashes(
+                self._profiles[representation_id], component)
+        return self._published[key].get(id)
+
+    def cached(self, uuid, token, component="uvmap"):
+        """Return (found, hash) of cached scene hash of a mesh
+
+        Not found if not cached or token changed. Hash may be None if the
+        mesh has no such component.
+
+        """
+        entry = self._scene.get(uuid)
+        if entry is None or entry[0] != token or component not in entry[1]:
+            return False, None
+        return True, entry[1][component]
+
+    def store(self, uuid, token, digest):
+        """Cache scene hash digest of a mesh, as {component: hash}"""
+        entry = self._scene.get(uuid)
+        if entry is None or entry[0] != token:
+            entry = self._scene[uuid] = (token, dict())
+        entry[1].update(digest)
+
+    def invalidate(self, uuid=None):
+        """Drop cached scene hash of a mesh, or all if uuid not given"""
+        if uuid is None:
+            self._scene.clear()
+        else:
+            self._scene.pop(uuid, None)
+
+
+def _fetch_profiles(representation_ids):
+    from avalon import io
+    from . import doccache
+
+    docs = doccache.find(
+        {"_id": {"$in": [io.ObjectId(_id) for _id in representation_ids]}},
+        projection={"data.modelProfile": True})
+    return {str(doc["_id"]): doc.get("data", {}).get("modelProfile")
+            for doc in docs}
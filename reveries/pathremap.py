@@ -0,0 +1,264 @@
+"""Prefix-trie path remapping
+
+A rule set maps path prefixes to other prefixes, e.g. project root into
+environment variables. Rules are compiled into a trie of path components,
+so remapping a path costs one walk of its components, no matter how many
+rules there are, and the longest matching prefix wins:
+
+    >>> remapper = PathRemapper([
+    ...     ("/projects/Foo", "$AVALON_PROJECTS/$AVALON_PROJECT"),
+    ...     ("/projects", "$AVALON_PROJECTS"),
+    ... ])
+    >>> remapper.remap(["/projects/Foo/a.tif", "/projects/Bar/b.tif"])
+    ['$AVALON_PROJECTS/$AVALON_PROJECT/a.tif', '$AVALON_PROJECTS/Bar/b.tif']
+
+Prefixes are matched on whole components, "/projects" does not match
+"/projects2/a.tif". Both slash and backslash are separators, remapped paths
+are joined with slash.
+
+`PublishedIndex` is the reverse direction of texture publishing, which
+looks up published files of a file pattern from a resolved `fileInventory`.
+
+"""
+import os
+import sys
+import logging
+
+
+log = logging.getLogger(__name__)
+
+
+_RULE = object()  # Trie node key of rule target
+
+_CASE_INSENSITIVE = sys.platform == "win32"
+
+
+def split_path(path):
+    """Return path components, both slash and backslash are separators"""
+    return path.replace("\\", "/").rstrip("/").split("/")
+
+
+def _key(part):
+    return part.lower() if _CASE_INSENSITIVE else part
+
+
+class PathRemapper(object):
+    """Remap paths with prefix rules compiled into a trie
+
+    Arguments:
+        rules (list, optional): List of (source prefix, target prefix)
+
+    """
+
+    def __init__(self, rules=None):
+        self._trie = dict()
+        self._rules = list()
+        for source, target in rules or []:
+            self.add(source, target)
+
+    def add(self, source, target):
+        """Add rule, replace the target if source already exists"""
+        node = self._trie
+        for part in split_path(source):
+            node = node.setdefault(_key(part), dict())
+        node[_RULE] = target.replace("\\", "/").rstrip("/")
+
+        self._rules = [(s, t) for s, t in self._rules
+                       if split_path(s) != split_path(source)]
+        self._rules.append((source, target))
+
+    def rules(self):
+        """Return list of (source prefix, target prefix)"""
+        return list(self._rules)
+
+    def reversed(self):
+        """Return remapper of the swapped rules"""
+        return PathRemapper([(t, s) for s, t in self._rules])
+
+    def _walk(self, parts, node=None, depth=0, match=None):
+        """Return (longest match, trie node of all parts consumed)
+
+        Match is a tuple of (component count, target) or None, node is
+        None if walking stopped before the last part.
+
+        """
+        node = self._trie if node is None else node
+        for part in parts:
+            node = node.get(_key(part))
+            if node is None:
+                return match, None
+            depth += 1
+            if _RULE in node:
+                match = (depth, node[_RULE])
+        return match, node
+
+    @staticmethod
+    def _apply(match, parts, path):
+        if match is None:
+            return path
+        depth, target = match
+        return "/".join([target] + parts[depth:])
+
+    def remap_one(self, path):
+        """Return remapped path, or the path itself if no rule matched"""
+        parts = split_path(path)
+        match, _ = self._walk(parts)
+        return self._apply(match, parts, path)
+
+    def remap(self, paths):
+        """Return remapped paths in order
+
+        Paths are usually in a handful of dirs, each dir is walked once and
+        only file names are walked from there.
+
+        """
+        walked = dict()
+        remapped = list()
+
+        for path in paths:
+            parts = split_path(path)
+            dir_key = tuple(parts[:-1])
+
+            if dir_key not in walked:
+                walked[dir_key] = self._walk(dir_key)
+            match, node = walked[dir_key]
+
+            if node is not None and parts:
+                match, _ = self._walk(parts[-1:], node, len(dir_key), match)
+
+            remapped.append(self._apply(match, parts, path))
+
+        return remapped
+
+    def mapping(self, paths):
+        """Return {path: remapped path} of changed paths only"""
+        paths = list(paths)
+        return {path: new for path, new in zip(paths, self.remap(paths))
+                if new != path}
+
+
+def env_embedding_rules(root, project):
+    """Return rules that embed `$AVALON_PROJECTS` and `$AVALON_PROJECT`"""
+    root = root.replace("\\", "/").rstrip("/")
+    return [
+        (root + "/" + project, "$AVALON_PROJECTS/$AVALON_PROJECT"),
+        (root, "$AVALON_PROJECTS"),
+    ]
+
+
+_env_remappers = dict()
+
+
+def env_remapper(root=None, project=None):
+    """Return cached remapper that embeds project root env vars into path
+
+    Use `.reversed()` for expanding them. Root and project name default to
+    current Avalon session.
+
+    """
+    if root is None or project is None:
+        import avalon.api
+        root = root or avalon.api.registered_root()
+        project = project or avalon.api.Session["AVALON_PROJECT"]
+
+    key = (root, project)
+    if key not in _env_remappers:
+        _env_remappers[key] = PathRemapper(env_embedding_rules(root, project))
+    return _env_remappers[key]
+
+
+def _stem(fname):
+    return fname.rsplit(".", 1)[0]
+
+
+def _ext(fname):
+    return fname.rsplit(".", 1)[-1]
+
+
+class PublishedIndex(object):
+    """Reverse lookup from file pattern to published texture files
+
+    A file pattern matches to published one with same name, or with only
+    a different extension (e.g. ".tif" and ".tx"). Versions are tried from
+    latest, the first version that has every file of the pattern wins.
+
+    Arguments:
+        resolved_by_fpattern (dict): From
+            `reveries.maya.lib.resolve_file_profile`, which is
+            {fpattern: [(inventory data, {"dir": str, "pathMap": dict})]}
+        isfile (callable, optional): File existence check, e.g. from
+            `reveries.dirscan.DirScanner`, default `os.path.isfile`
+
+    """
+
+    def __init__(self, resolved_by_fpattern, isfile=None):
+        self.isfile = isfile or os.path.isfile
+
+        self._versions = dict()
+        self._by_stem = dict()
+
+        for fpattern in sorted(resolved_by_fpattern):
+            versioned = sorted(resolved_by_fpattern[fpattern],
+                               key=lambda elem: elem[0]["version"],
+                               reverse=True)
+            indexed = list()
+            for data, resolved in versioned:
+                by_stem = dict()
+                for fname in sorted(resolved["pathMap"]):
+                    by_stem.setdefault(_stem(fname), []).append(fname)
+                indexed.append((data, resolved, by_stem))
+
+            self._versions[fpattern] = indexed
+            self._by_stem.setdefault(_stem(fpattern), fpattern)
+
+    def fpattern_of(self, fpattern):
+        """Return published file pattern that the pattern maps to"""
+        if fpattern in self._versions:
+            return fpattern
+        return self._by_stem.get(_stem(fpattern))
+
+    def _match(self, path_map, resolved, by_stem):
+        previous_files = resolved["pathMap"]
+
+        for fname, abs_path in path_map.items():
+            if fname in previous_files:
+                abs_previous = previous_files[fname]
+            else:
+                # Same name with different extension, only if current
+                # file with that extension exists.
+                base = abs_path.rsplit(".", 1)[0]
+                for pre_file in by_stem.get(_stem(fname), []):
+                    if self.isfile(base + "." + _ext(pre_file)):
+                        abs_previous = previous_files[pre_file]
+                        break
+                else:
+                    return False
+
+            if not self.isfile(abs_previous):
+                # Previous file not exists (should not happen)
+                return False
+
+        return True
+
+    def lookup(self, fpattern, path_map):
+        """Return published path of the file pattern
+
+        Arguments:
+            fpattern (str): File name pattern
+            path_map (dict): {file name: abs path} of current files
+
+        Returns:
+            tuple: (inventory data, published path of the first file), or
+                None if no version matched.
+
+        """
+        published = self.fpattern_of(fpattern)
+        if published is None:
+            return None
+
+        for data, resolved, by_stem in self._versions[published]:
+            if self._match(path_map, resolved, by_stem):
+                head_file = sorted(resolved["pathMap"])[0]
+                return data, resolved["dir"] + "/" + head_file
+
+        return None
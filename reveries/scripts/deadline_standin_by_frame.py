@@ -1,30 +1,49 @@
-
 import os
+import sys
 import json
-import pyblish.api
+
+
+def load_extractor():
+    """Import `ExtractArnoldStandIn` from plugin file
+
+    Plugin file is imported directly instead of discovering all pyblish
+    plugins in every task.
+
+    """
+    import reveries
+
+    name = "extract_arnold_standin"
+    path = os.path.join(reveries.PLUGINS_DIR,
+                        "maya", "publish", name + ".py")
+
+    if sys.version_info[0] == 2:
+        import imp
+        module = imp.load_source(name, path)
+    else:
+        import importlib.util
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+    return module.ExtractArnoldStandIn
 
 
 if __name__ == "__main__":
-    # Maya script job per frame
+    # Maya script job per frame block, all frames of the task are exported
+    # with one scene load.
     from maya import mel
 
-    # Find extractor plugin
-    plugin = None
-    for p in pyblish.api.discover():
-        if p.__name__ == "ExtractArnoldStandIn":
-            plugin = p
-            break
-
-    assert plugin, "Pyblish plugin not found."
+    plugin = load_extractor()
 
     # Parse data for extractor
     data_path = os.environ["REMOTE_DATA_PATH"]
     with open(data_path, "r") as fp:
         data = json.load(fp)
 
-    # Frame range
+    # Frame range of this task
     start = int(mel.eval("DeadlineValue(\"StartFrame\")"))
     end = int(mel.eval("DeadlineValue(\"EndFrame\")"))
+    step = int(data.get("byFrameStep", 1))
 
     # Export
-    plugin.export_ass(data, start, end, 1)
+    plugin.export_ass(data, start, end, step)
@@ -0,0 +1,637 @@
+import os
+import time
+import json
+import errno
+import shutil
+import logging
+import threading
+
+from multiprocessing.pool import ThreadPool
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+
+
+log = logging.getLogger(__name__)
+
+
+# Errors that may go away if we try again, mostly from network storage
+TRANSIENT_ERRNO = set(getattr(errno, name) for name in (
+    "EAGAIN",
+    "EBUSY",
+    "EINTR",
+    "EIO",
+    "ESTALE",
+    "ETIMEDOUT",
+    "ECONNRESET",
+    "ECONNABORTED",
+) if hasattr(errno, name))
+
+# Errors that means the fast copy syscall is not usable for this file pair
+_FALLBACK_ERRNO = set(getattr(errno, name) for name in (
+    "ENOSYS",
+    "EXDEV",
+    "EINVAL",
+    "ENOTSUP",
+    "EOPNOTSUPP",
+    "ENOTSOCK",
+    "EBADF",
+) if hasattr(errno, name))
+
+# Errors that means hardlink is not usable for this file pair
+_LINK_FALLBACK_ERRNO = _FALLBACK_ERRNO | set(
+    getattr(errno, name) for name in ("EPERM", "EMLINK")
+    if hasattr(errno, name))
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# linux/fs.h `_IOW(0x94, 9, int)`
+FICLONE = 0x40049409
+
+# Package transfer strategies, from cheapest to most expensive
+RENAME = "rename"
+REFLINK = "reflink"
+HARDLINK = "hardlink"
+COPY = "copy"
+
+STRATEGIES = (RENAME, REFLINK, HARDLINK, COPY)
+
+
+def makedirs(dir_path):
+    """Create dir and it's parents, no error if dir exists"""
+    try:
+        os.makedirs(dir_path)
+    except OSError as e:
+        if e.errno != errno.EEXIST or not os.path.isdir(dir_path):
+            raise
+
+
+def _copy_file_range(fsrc, fdst, size):
+    offset = 0
+    while offset < size:
+        sent = os.copy_file_range(fsrc, fdst, size - offset)
+        if sent == 0:
+            break
+        offset += sent
+    return offset
+
+
+def _sendfile(fsrc, fdst, size):
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(fdst, fsrc, offset, size - offset)
+        if sent == 0:
+            break
+        offset += sent
+    return offset
+
+
+_FAST_COPY = [func for name, func in (
+    ("copy_file_range", _copy_file_range),
+    ("sendfile", _sendfile),
+) if hasattr(os, name)]
+
+
+def copy_content(src, dst):
+    """Copy file content with in-kernel copy if possible
+
+    Try `os.copy_file_range` and `os.sendfile` where available, and fallback
+    to buffered copy if the syscall is not supported for the files.
+
+    Returns:
+        int: Copied bytes
+
+    """
+    with open(src, "rb") as fsrc:
+        with open(dst, "wb") as fdst:
+            size = os.fstat(fsrc.fileno()).st_size
+
+            for fast_copy in _FAST_COPY:
+                try:
+                    copied = fast_copy(fsrc.fileno(), fdst.fileno(), size)
+                except OSError as e:
+                    if e.errno not in _FALLBACK_ERRNO:
+                        raise
+                    # Not supported, rewind and try next
+                    fsrc.seek(0)
+                    fdst.seek(0)
+                    fdst.truncate()
+                else:
+                    if copied == size:
+                        return copied
+                    # Source changed while copying, do it again plainly
+                    fsrc.seek(0)
+                    fdst.seek(0)
+                    fdst.truncate()
+                    break
+
+            shutil.copyfileobj(fsrc, fdst, COPY_BUFFER_SIZE)
+            return fdst.tell()
+
+
+def copy_file(src, dst):
+    """Copy file content and stat, like `shutil.copy2`"""
+    size = copy_content(src, dst)
+    shutil.copystat(src, dst)
+    return size
+
+
+def hardlink_file(src, dst):
+    """Create hardlink, skip if destination exists"""
+    if os.path.isfile(dst):
+        log.warning("File exists, skip creating hardlink: %s" % dst)
+        return 0
+
+    if hasattr(os, "link"):
+        os.link(src, dst)
+    else:
+        # Python 2 on Windows
+        from avalon.vendor import filelink
+        filelink.create(src, dst, filelink.HARDLINK)
+
+    return os.path.getsize(dst)
+
+
+def reflink_file(src, dst):
+    """Clone file with `FICLONE` ioctl (copy-on-write file systems)
+
+    Raises:
+        OSError: If reflink is not supported on the platform or between
+            the files' file system.
+
+    """
+    if fcntl is None:
+        raise OSError(errno.ENOTSUP, "Reflink not supported", dst)
+
+    try:
+        with open(src, "rb") as fsrc:
+            with open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    except (IOError, OSError):
+        if os.path.isfile(dst):
+            os.remove(dst)
+        raise
+
+    shutil.copystat(src, dst)
+    return os.path.getsize(dst)
+
+
+def link_file(src, dst):
+    """Create hardlink, replace destination if exists"""
+    if os.path.isfile(dst):
+        os.remove(dst)
+    return hardlink_file(src, dst)
+
+
+def device_of(path):
+    """Return `st_dev` of path, or of it's nearest existing parent"""
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return os.stat(path).st_dev
+
+
+class TransferManifest(object):
+    """Append-only record of transferred files
+
+    Each line is one JSON object of a finished transfer, so a crashed
+    process leaves at most one broken line which will be ignored on read.
+
+    Arguments:
+        path (str): Manifest file path
+
+    """
+
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._last_flush = 0
+
+    def load(self):
+        """Return {dst: size} of previously finished transfers"""
+        finished = dict()
+        if not os.path.isfile(self.path):
+            return finished
+
+        with open(self.path, "r") as fp:
+            for line in fp:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                finished[entry["dst"]] = entry["size"]
+
+        return finished
+
+    def record(self, job, dst, size, strategy=None):
+        if self._file is None:
+            makedirs(os.path.dirname(self.path))
+            self._file = open(self.path, "a")
+
+        entry = {"job": job, "dst": dst, "size": size}
+        if strategy:
+            entry["strategy"] = strategy
+
+        self._file.write(json.dumps(entry) + "\n")
+
+        now = time.time()
+        if now - self._last_flush > self.FLUSH_INTERVAL:
+            self._file.flush()
+            self._last_flush = now
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        self.close()
+        if os.path.isfile(self.path):
+            os.remove(self.path)
+
+
+class FileTransfer(object):
+    """Bounded parallel file transfer engine
+
+    Transfers are queued by job type, destinations are deduplicated, and
+    then all files are transferred by a pool of worker threads. Package
+    directories are expanded into per-file transfers so large packages are
+    transferred in parallel as well.
+
+    Packages (staged representation dirs) are transferred with the
+    cheapest strategy that works, chosen per device pair by comparing
+    `st_dev` of source and destination. On the same device, try in order:
+    atomic rename of the whole package dir, reflink, hardlink, then full
+    copy as last resort. On different devices, copy directly. Strategy
+    failed on a device pair will not be tried again in this session, and
+    the strategy used for each package can be queried by `strategy_of`.
+
+    If `manifest_dir` is given, every finished transfer is recorded into a
+    manifest file in that dir, a re-run of the same transfers will skip
+    files that were finished with the same size. The manifest is removed
+    after all transfers succeeded.
+
+    Example:
+        >>> engine = FileTransfer(manifest_dir="/path/to/v003")
+        >>> engine.add("packages", "/tmp/staging/mayaBinary",
+        ...            "/path/to/v003/mayaBinary")
+        >>> engine.add("files", "/src/file.exr", "/path/to/v003/file.exr")
+        >>> stats = engine.run()
+        >>> engine.strategy_of("/path/to/v003/mayaBinary")
+        'rename'
+
+    Arguments:
+        manifest_dir (str, optional): Where to write the transfer manifest
+        workers (int, optional): Thread pool size, default 8
+        retries (int, optional): Retry times on transient errors, default 3
+        retry_delay (float, optional): Base seconds of exponential backoff
+            between retries, default 1.0
+        strategies (tuple, optional): Allowed package transfer strategies,
+            default all of `STRATEGIES`. `COPY` is always allowed.
+        logger (logging.Logger, optional): Logger for progress report
+
+    """
+
+    MANIFEST = ".transfer.manifest"
+
+    JOBS = ("packages", "files", "hardlinks")
+
+    def __init__(self,
+                 manifest_dir=None,
+                 workers=8,
+                 retries=3,
+                 retry_delay=1.0,
+                 strategies=STRATEGIES,
+                 logger=None):
+        self.workers = workers
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.strategies = tuple(s for s in STRATEGIES
+                                if s in strategies or s == COPY)
+        self.log = logger or log
+
+        self._queued = set()
+        self._transfers = list()
+        self._manifest = None
+        if manifest_dir:
+            manifest_path = os.path.join(manifest_dir, self.MANIFEST)
+            self._manifest = TransferManifest(manifest_path)
+
+        self._lock = threading.Lock()
+        self._failed = dict()  # {(src dev, dst dev): set(strategies)}
+        self._used = dict()  # {package dst: strategy}
+
+    def _norm(self, path):
+        return os.path.abspath(os.path.normpath(os.path.expandvars(path)))
+
+    def add(self, job, src, dst):
+        """Queue one transfer
+
+        Arguments:
+            job (str): One of "packages", "files" or "hardlinks"
+            src (str): Source path, a dir if job is "packages"
+            dst (str): Destination path
+
+        Returns:
+            bool: False if the transfer skipped
+
+        """
+        assert job in self.JOBS, "Unknown transfer job: %s" % job
+
+        src = self._norm(src)
+        dst = self._norm(dst)
+
+        self.log.debug("Src: {!r}".format(src))
+        self.log.debug("Dst: {!r}".format(dst))
+
+        if src == dst:
+            self.log.debug("Source and destination are the same, "
+                           "will not copy.")
+            return False
+
+        if dst in self._queued:
+            self.log.warning("File transfered: %s" % dst)
+            return False
+
+        self._queued.add(dst)
+        self._transfers.append((job, src, dst))
+
+        return True
+
+    def strategy_of(self, package_dst):
+        """Return the strategy used to transfer the package
+
+        If different strategies were used on the package's files, the most
+        expensive one is returned.
+
+        Arguments:
+            package_dst (str): Package destination path
+
+        Returns:
+            str: One of `STRATEGIES`, or None if not transferred
+
+        """
+        return self._used.get(self._norm(package_dst))
+
+    def _use(self, package, strategy):
+        with self._lock:
+            used = self._used.get(package)
+            if used is None or (STRATEGIES.index(strategy) >
+                                STRATEGIES.index(used)):
+                self._used[package] = strategy
+
+    def _devices(self, src, dst):
+        return os.stat(src).st_dev, device_of(dst)
+
+    def _candidates(self, devices):
+        """Return strategies that may work for the device pair"""
+        src_dev, dst_dev = devices
+        if src_dev != dst_dev:
+            return (COPY,)
+
+        failed = self._failed.get(devices, set())
+        return tuple(s for s in self.strategies if s not in failed)
+
+    def _strategy_failed(self, devices, strategy, error):
+        self.log.debug("Transfer strategy %r not usable: %s"
+                       % (strategy, error))
+        with self._lock:
+            self._failed.setdefault(devices, set()).add(strategy)
+
+    def _move_packages(self, finished):
+        """Rename package dirs into place when possible
+
+        Returns:
+            list: Transfers that still need to be done per file
+
+        """
+        remained = list()
+
+        for job, src, dst in self._transfers:
+            if job != "packages":
+                remained.append((job, src, dst))
+                continue
+
+            if not os.path.isdir(src):
+                if dst in finished and os.path.isdir(dst):
+                    # Renamed in previous run
+                    self._use(dst, RENAME)
+                    continue
+                raise OSError(errno.ENOENT, "Package dir not found", src)
+
+            devices = self._devices(src, dst)
+            if RENAME in self._candidates(devices) and not (
+                    os.path.exists(dst)):
+                makedirs(os.path.dirname(dst))
+                try:
+                    os.rename(src, dst)
+                except OSError as e:
+                    self._strategy_failed(devices, RENAME, e)
+                else:
+                    self._use(dst, RENAME)
+                    if self._manifest is not None:
+                        self._manifest.record(job, dst, -1, RENAME)
+                    self.log.debug("Renamed package: %s" % dst)
+                    continue
+
+            remained.append((job, src, dst))
+
+        return remained
+
+    def _expand(self, transfers):
+        """Expand package dirs into per-file transfers
+
+        Returns:
+            list: (job, src file, dst file, package dst) tuples
+            set: Destination dirs that need to be created
+
+        """
+        tasks = list()
+        dirs = set()
+
+        for job, src, dst in transfers:
+            if job != "packages":
+                tasks.append((job, src, dst, None))
+                dirs.add(os.path.dirname(dst))
+                continue
+
+            dirs.add(dst)
+            for root, subdirs, files in os.walk(src):
+                dst_root = os.path.join(dst, os.path.relpath(root, src))
+                dst_root = os.path.normpath(dst_root)
+                for name in subdirs:
+                    dirs.add(os.path.join(dst_root, name))
+                for name in files:
+                    tasks.append((job,
+                                  os.path.join(root, name),
+                                  os.path.join(dst_root, name),
+                                  dst))
+
+        return tasks, dirs
+
+    def _transfer_package_file(self, src, dst, package):
+        """Transfer one package file with the cheapest working strategy"""
+        devices = self._devices(src, dst)
+
+        for strategy in self._candidates(devices):
+            if strategy == RENAME:
+                # Only for whole package dir
+                continue
+
+            if strategy == COPY:
+                break
+
+            transfer = reflink_file if strategy == REFLINK else link_file
+            try:
+                size = transfer(src, dst)
+            except (IOError, OSError) as e:
+                if e.errno in TRANSIENT_ERRNO:
+                    raise
+                self._strategy_failed(devices, strategy, e)
+            else:
+                self._use(package, strategy)
+                return size
+
+        self._use(package, COPY)
+        return copy_file(src, dst)
+
+    def _transfer(self, job, src, dst, package):
+        """Transfer one file, return transferred bytes"""
+        if job == "hardlinks":
+            try:
+                return hardlink_file(src, dst)
+            except (IOError, OSError) as e:
+                if e.errno not in _LINK_FALLBACK_ERRNO:
+                    raise
+                self.log.debug("Hardlink not usable (%s), copy instead: %s"
+                               % (e, dst))
+                return copy_file(src, dst)
+        if job == "packages":
+            return self._transfer_package_file(src, dst, package)
+        return copy_file(src, dst)
+
+    def _transfer_with_retry(self, task):
+        job, src, dst, package = task
+
+        attempt = 0
+        while True:
+            try:
+                return task, self._transfer(job, src, dst, package), None
+            except (IOError, OSError) as e:
+                if e.errno in TRANSIENT_ERRNO and attempt < self.retries:
+                    delay = self.retry_delay * (2 ** attempt)
+                    attempt += 1
+                    self.log.warning("Transfer failed (%s), retry %d in "
+                                     "%.1f sec: %s" % (e, attempt, delay, dst))
+                    time.sleep(delay)
+                    continue
+
+                return task, 0, e
+
+    def run(self):
+        """Transfer all queued files
+
+        Returns:
+            dict: Per-job stats, {job: {"count", "bytes", "seconds"}}
+
+        Raises:
+            OSError: The first error that occurred, after all other
+                transfers finished.
+
+        """
+        finished = dict()
+        if self._manifest is not None:
+            finished = self._manifest.load()
+
+        transfers = self._move_packages(finished)
+        tasks, dirs = self._expand(transfers)
+
+        if finished:
+            resumable = list()
+            for task in tasks:
+                dst = task[2]
+                size = finished.get(dst)
+                if size is not None and (os.path.isfile(dst) and
+                                         os.path.getsize(dst) == size):
+                    continue
+                resumable.append(task)
+
+            self.log.info("Resuming transfer, %d of %d files done "
+                          "previously." % (len(tasks) - len(resumable),
+                                           len(tasks)))
+            tasks = resumable
+
+        for dir_path in sorted(dirs):
+            makedirs(dir_path)
+
+        stats = {job: {"count": 0, "bytes": 0, "seconds": 0.0}
+                 for job in self.JOBS}
+        started = {job: None for job in self.JOBS}
+        errors = list()
+
+        def transfer(task):
+            job = task[0]
+            with self._lock:
+                if started[job] is None:
+                    started[job] = time.time()
+            return self._transfer_with_retry(task)
+
+        pool = ThreadPool(max(1, min(self.workers, len(tasks))))
+        try:
+            for task, size, error in pool.imap_unordered(transfer, tasks):
+                job, src, dst, package = task
+                if error is not None:
+                    self.log.error("Failed %s: %s -> %s" % (job, src, dst))
+                    errors.append(error)
+                    continue
+
+                stats[job]["count"] += 1
+                stats[job]["bytes"] += size
+                stats[job]["seconds"] = time.time() - started[job]
+
+                if self._manifest is not None:
+                    self._manifest.record(job, dst, size)
+        finally:
+            pool.close()
+            pool.join()
+            if self._manifest is not None:
+                self._manifest.close()
+
+        if errors:
+            raise errors[0]
+
+        if self._manifest is not None:
+            self._manifest.remove()
+
+        self._report(stats)
+
+        return stats
+
+    def _report(self, stats):
+        for job in self.JOBS:
+            count = stats[job]["count"]
+            if not count:
+                continue
+
+            size = stats[job]["bytes"]
+            seconds = stats[job]["seconds"]
+            rate = (size / seconds) if seconds else 0
+
+            self.log.info("Transferred {job}: {count} files, {mb:.2f} MB in "
+                          "{sec:.2f} sec ({rate:.2f} MB/s)".format(
+                              job=job,
+                              count=count,
+                              mb=size / 1048576.0,
+                              sec=seconds,
+                              rate=rate / 1048576.0))
+
+        for package, strategy in sorted(self._used.items()):
+            self.log.info("Package transferred by %s: %s"
+                          % (strategy, package))
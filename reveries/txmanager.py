@@ -0,0 +1,186 @@
+"""Check and regenerate .tx maps of texture files
+
+A .tx map is considered up to date when its modification time (in whole
+seconds) equals to its source texture's, which is how Arnold's Tx Manager
+leaves them. Maps regenerated here get the same treatment.
+
+The `maketx` executable is resolved from env var `REVERIES_MAKETX`, which
+may contain arguments, e.g. `python /path/to/maketx_stub.py`, then from
+`PATH`.
+
+"""
+import os
+import sys
+import shlex
+import logging
+import subprocess
+from multiprocessing.pool import ThreadPool
+
+from . import dirscan
+
+
+log = logging.getLogger(__name__)
+
+
+# Status
+UPDATED = "updated"
+STALE = "stale"
+MISSING_TX = "missingTx"
+MISSING_SOURCE = "missingSource"
+
+# (NOTE) No `-u`, which skips maps newer than source, e.g. after source
+#        was reverted. `check` already picked what to rebuild.
+DEFAULT_ARGS = ["-v", "--unpremult", "--oiio"]
+
+
+def tx_path(source):
+    """Return .tx map path of source texture"""
+    return os.path.splitext(source)[0] + ".tx"
+
+
+def maketx_executable():
+    """Return `maketx` command as list, or None if not found"""
+    command = os.getenv("REVERIES_MAKETX")
+    if command:
+        return shlex.split(command, posix=sys.platform != "win32")
+
+    exe = "maketx.exe" if sys.platform == "win32" else "maketx"
+    for path in os.getenv("PATH", "").split(os.pathsep):
+        candidate = os.path.join(path, exe)
+        if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+            return [candidate]
+
+    return None
+
+
+def check(sources, scanner=None, workers=8):
+    """Return .tx map status of source textures
+
+    Dirs of sources and tx maps are listed concurrently, and the file
+    stats are taken from the scanner's cached listings, so passing the
+    publish's scanner (`reveries.dirscan.of(context)`) makes repeated
+    checks free.
+
+    Arguments:
+        sources (list): Source texture file paths
+        scanner (DirScanner, optional): Scanner for caching file stats
+        workers (int, optional): Max concurrent dir listings, default 8
+
+    Returns:
+        dict: {source: status}, status is one of `UPDATED`, `STALE`,
+            `MISSING_TX` or `MISSING_SOURCE`
+
+    """
+    scanner = scanner or dirscan.DirScanner()
+
+    dirs = set()
+    for source in sources:
+        dirs.add(os.path.dirname(source))
+        dirs.add(os.path.dirname(tx_path(source)))
+
+    if len(dirs) > 1:
+        pool = ThreadPool(min(workers, len(dirs)))
+        try:
+            pool.map(scanner.listing, sorted(dirs))
+        finally:
+            pool.close()
+            pool.join()
+
+    status = dict()
+    for source in sources:
+        tx = tx_path(source)
+        if not scanner.isfile(source):
+            status[source] = MISSING_SOURCE
+        elif not scanner.isfile(tx):
+            status[source] = MISSING_TX
+        elif int(scanner.getmtime(source)) != int(scanner.getmtime(tx)):
+            status[source] = STALE
+        else:
+            status[source] = UPDATED
+
+    return status
+
+
+def make_tx(sources, executable=None, args=None, workers=None, scanner=None):
+    """Regenerate .tx maps with a bounded pool of `maketx` processes
+
+    Each generated map gets its source's modification time, so it will be
+    seen as up to date by `check`.
+
+    Arguments:
+        sources (list): Source texture file paths
+        executable (str or list, optional): `maketx` command, default
+            from `maketx_executable`
+        args (list, optional): Extra `maketx` arguments, default
+            `DEFAULT_ARGS`
+        workers (int, optional): Max concurrent processes, default is
+            CPU count.
+        scanner (DirScanner, optional): Scanner to invalidate the cached
+            listings of regenerated maps' dirs.
+
+    Returns:
+        dict: {source: error message}, of failed ones
+
+    Raises:
+        RuntimeError: If no `maketx` executable found.
+
+    """
+    if executable is None:
+        executable = maketx_executable()
+    if not executable:
+        raise RuntimeError("No 'maketx' executable found, set env var "
+                           "'REVERIES_MAKETX'.")
+    if not isinstance(executable, (list, tuple)):
+        executable = [executable]
+
+    args = DEFAULT_ARGS if args is None else args
+    workers = workers or _cpu_count()
+
+    def run(source):
+        tx = tx_path(source)
+        cmd = list(executable) + list(args) + [source, "-o", tx]
+        log.debug("Running: %s" % " ".join(cmd))
+
+        proc = subprocess.Popen(cmd,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT)
+        output, _ = proc.communicate()
+        if proc.returncode != 0:
+            return source, output.decode("utf-8", "replace")
+
+        try:
+            mtime = os.path.getmtime(source)
+            os.utime(tx, (mtime, mtime))
+        except OSError as e:
+            return source, str(e)
+
+        return source, None
+
+    sources = sorted(set(sources))
+    errors = dict()
+
+    pool = ThreadPool(max(1, min(workers, len(sources))))
+    try:
+        for source, error in pool.imap_unordered(run, sources):
+            if error is None:
+                log.info("Made tx: %s" % source)
+            else:
+                log.error("Failed to make tx: %s\n%s" % (source, error))
+                errors[source] = error
+    finally:
+        pool.close()
+        pool.join()
+
+    if scanner is not None:
+        for dir_path in set(os.path.dirname(tx_path(s)) for s in sources):
+            scanner.invalidate(dir_path)
+
+    return errors
+
+
+def _cpu_count():
+    try:
+        import multiprocessing
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
@@ -1,6 +1,7 @@
 # -*-coding: utf-8
 
 import os
+import mmap
 import tempfile
 import hashlib
 import codecs
@@ -9,7 +10,9 @@ import weakref
 import getpass
 import pymongo
 import datetime
+import multiprocessing
 
+from multiprocessing.pool import ThreadPool
 from distutils import dir_util, errors as distutils_err
 
 from avalon import io, Session
@@ -19,6 +22,7 @@ import avalon
 from pyblish_qml.ipc import formatting
 
 from .plugins import message_box_error
+from . import hashcache, doccache
 
 
 class LocalTZ(datetime.tzinfo):
@@ -69,7 +73,10 @@ def clear_stage(prefix="pyblish_tmp_"):
     os.chdir(cwd_backup)
 
 
-def get_timeline_data(project=None, asset_name=None, current_fps=None):
+def get_timeline_data(project=None,
+                      asset_name=None,
+                      current_fps=None,
+                      cache=None):
     """Get asset timeline data from project document
 
     Get timeline data from asset if asset has it's own settings, or get from
@@ -82,6 +89,9 @@ def get_timeline_data(project=None, asset_name=None, current_fps=None):
             not provided.
         current_fps (float, optional): For preserving current FPS setting if
             project has multiple valid FPS.
+        cache (DocumentCache, optional): Query through this cache, e.g.
+            `doccache.of(context)` while publishing. Default through the
+            active cache of `doccache`, if any.
 
     Returns:
         edit_in (int),
@@ -90,10 +100,11 @@ def get_timeline_data(project=None, asset_name=None, current_fps=None):
         fps (float)
 
     """
+    cache = cache or doccache
     if project is None:
-        project = avalon.io.find_one({"type": "project"})
+        project = cache.find_one({"type": "project"})
     asset_name = asset_name or avalon.Session["AVALON_ASSET"]
-    asset = avalon.io.find_one({"name": asset_name, "type": "asset"})
+    asset = cache.find_one({"name": asset_name, "type": "asset"})
 
     assert asset is not None, ("Asset {!r} not found, this is a bug."
                                "".format(asset_name))
@@ -114,7 +125,10 @@ def get_timeline_data(project=None, asset_name=None, current_fps=None):
     return edit_in, edit_out, handles, fps
 
 
-def compose_timeline_data(project=None, asset_name=None, current_fps=None):
+def compose_timeline_data(project=None,
+                          asset_name=None,
+                          current_fps=None,
+                          cache=None):
     """Compute and return start frame, end frame and fps
 
     Get timeline data from asset if asset has it's own settings, or get from
@@ -127,6 +141,9 @@ def compose_timeline_data(project=None, asset_name=None, current_fps=None):
             not provided.
         current_fps (float, optional): For preserving current FPS setting if
             project has multiple valid FPS.
+        cache (DocumentCache, optional): Query through this cache, e.g.
+            `doccache.of(context)` while publishing. Default through the
+            active cache of `doccache`, if any.
 
     Returns:
         start_frame (int),
@@ -136,14 +153,15 @@ def compose_timeline_data(project=None, asset_name=None, current_fps=None):
     """
     edit_in, edit_out, handles, fps = get_timeline_data(project,
                                                         asset_name,
-                                                        current_fps)
+                                                        current_fps,
+                                                        cache=cache)
     start_frame = edit_in - handles
     end_frame = edit_out + handles
 
     return start_frame, end_frame, fps
 
 
-def get_resolution_data(project=None, asset_name=None):
+def get_resolution_data(project=None, asset_name=None, cache=None):
     """Get resolution data from asset/project settings
 
     If resolution data is not defined in asset, query from project.
@@ -153,16 +171,20 @@ def get_resolution_data(project=None, asset_name=None):
             not provided.
         asset_name (str, optional): Asset name, get from `avalon.Session` if
             not provided.
+        cache (DocumentCache, optional): Query through this cache, e.g.
+            `doccache.of(context)` while publishing. Default through the
+            active cache of `doccache`, if any.
 
     Returns:
         resolution_width (int),
         resolution_height (int)
 
     """
+    cache = cache or doccache
     if project is None:
-        project = avalon.io.find_one({"type": "project"})
+        project = cache.find_one({"type": "project"})
     asset_name = asset_name or avalon.Session["AVALON_ASSET"]
-    asset = avalon.io.find_one({"name": asset_name, "type": "asset"})
+    asset = cache.find_one({"name": asset_name, "type": "asset"})
 
     assert asset is not None, ("Asset {!r} not found, this is a bug."
                                "".format(asset_name))
@@ -233,12 +255,125 @@ def publish_results_formatting(context):
     return formatted
 
 
-def hash_file(file_path):
-    hasher = AssetHasher()
+def hash_file(file_path, cache=True):
+    """Return C4 ID of one file
+
+    Arguments:
+        file_path (str): File path
+        cache (bool or HashCache, optional): Look up and store content
+            digest in hash cache, use default cache if True.
+
+    """
+    hasher = AssetHasher(cache=cache)
     hasher.add_file(file_path)
     return hasher.digest()
 
 
+SAMPLE_BLOCK_SIZE = 64 * 1024
+
+
+def sample_digest(file_path, block_size=SAMPLE_BLOCK_SIZE):
+    """Return SHA-1 hex digest of file's head, middle and tail blocks
+
+    File that is not larger than three blocks is digested entirely.
+
+    """
+    hash_obj = hashlib.sha1()
+
+    with open(file_path, "rb") as file:
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+
+        if size <= block_size * 3:
+            offsets = [0]
+            block_size = size
+        else:
+            offsets = [0, (size - block_size) // 2, size - block_size]
+
+        for offset in offsets:
+            file.seek(offset)
+            hash_obj.update(file.read(block_size))
+
+    return hash_obj.hexdigest()
+
+
+def identical_files(groups, scanner=None, workers=8, cache=True):
+    """Return whether files in each group have identical content
+
+    Files are compared in stages, each only on groups that survived the
+    previous one:
+
+        1. File size
+        2. Sampled digest of head, middle and tail blocks
+        3. Full content digest, through the hash cache
+
+    Modification time is not compared, so copied files are still seen as
+    identical.
+
+    Arguments:
+        groups (list): Lists of file paths
+        scanner (DirScanner, optional): Take file size from the cached
+            listings of `reveries.dirscan.DirScanner` if given.
+        workers (int, optional): Max thread count for hashing, default 8
+        cache (bool or HashCache, optional): Use given hash cache, or the
+            default one if True.
+
+    Returns:
+        list: bool for each group
+
+    """
+    getsize = scanner.getsize if scanner else os.path.getsize
+    results = [True] * len(groups)
+    sizes = dict()
+
+    def compare(stage, digest):
+        candidates = [i for i, paths in enumerate(groups)
+                      if results[i] and stage(paths)]
+        files = sorted(set(path for i in candidates for path in groups[i]))
+        if not files:
+            return
+
+        digests = dict(zip(files, digest(files)))
+        for i in candidates:
+            if len(set(digests[path] for path in groups[i])) > 1:
+                results[i] = False
+
+    # Stage 1, file size
+    for i, paths in enumerate(groups):
+        try:
+            for path in paths:
+                if path not in sizes:
+                    sizes[path] = getsize(path)
+        except OSError:
+            results[i] = False
+            continue
+
+        if len(set(sizes[path] for path in paths)) > 1:
+            results[i] = False
+
+    def map_in_pool(func, files):
+        if len(files) == 1:
+            return [func(files[0])]
+        pool = ThreadPool(min(workers, len(files)))
+        try:
+            return pool.map(func, files)
+        finally:
+            pool.close()
+            pool.join()
+
+    # Stage 2, sampled digest
+    compare(lambda paths: len(set(paths)) > 1,
+            lambda files: map_in_pool(sample_digest, files))
+
+    # Stage 3, full digest, only needed if sample did not cover whole file
+    hasher = AssetHasher(legacy=False, workers=workers, cache=cache)
+    compare(lambda paths: (len(set(paths)) > 1 and
+                           sizes[paths[0]] > SAMPLE_BLOCK_SIZE * 3),
+            hasher._digest_files)
+
+    return results
+
+
 def plugins_by_range(base=1.5, offset=2, paths=None):
     """Find plugins by thier order which fits in range
 
@@ -269,6 +404,33 @@ def plugins_by_range(base=1.5, offset=2, paths=None):
     return plugins
 
 
+def _digest_file(file_path, buffer_size):
+    """Return raw SHA-512 digest of one file's content
+
+    File content is read through a read-only memory map in `buffer_size`
+    slices, and fallback to plain buffered read if the file can not be
+    mapped (e.g. empty file or special file system).
+
+    """
+    hash_obj = hashlib.sha512()
+
+    with open(file_path, "rb") as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, mmap.error, OSError):
+            for chunk in iter(lambda: file.read(buffer_size), b""):
+                hash_obj.update(chunk)
+        else:
+            try:
+                size = len(mapped)
+                for offset in range(0, size, buffer_size):
+                    hash_obj.update(mapped[offset:offset + buffer_size])
+            finally:
+                mapped.close()
+
+    return hash_obj.digest()
+
+
 class _C4Hasher(object):
 
     CHUNK_SIZE = 4096 * 10  # magic number
@@ -304,8 +466,13 @@ class _C4Hasher(object):
     def digest(self):
         """Return hash value of data added so far
         """
+        return self._c4encode(self.hash_obj.digest())
+
+    def _c4encode(self, raw_digest):
+        """Encode raw SHA-512 digest into C4 ID
+        """
         c4_id_length = 90
-        b58_hash = self._b58encode(self.hash_obj.digest())
+        b58_hash = self._b58encode(raw_digest)
 
         padding = ""
         if len(b58_hash) < (c4_id_length - 2):
@@ -340,8 +507,55 @@ class AssetHasher(_C4Hasher):
         Until you call `clear`
         >> hasher.clear()
 
+    Parallel mode:
+        >> hasher = AssetHasher(legacy=False)
+
+        Files are queued and hashed in a thread pool with memory-mapped
+        reads when `digest` is called, then each file's digest is folded
+        into the C4 ID in the order they were added. Directories are
+        walked once and files are added in sorted order, so the result
+        is deterministic.
+
+        (NOTE) The parallel mode produces different hash value than the
+               legacy mode, which is the default for keeping previously
+               computed IDs comparable.
+
+    Hash cache:
+        With `cache` enabled, per-file digests are looked up from the
+        persistent hash cache (see `reveries.hashcache`), so unchanged
+        files only cost one `stat`. In legacy mode this applies when
+        exactly one file is hashed, since multiple files are streamed
+        into one digest.
+
+    Arguments:
+        legacy (bool, optional): Stream all content into one digest and
+            walk directories like before, default True.
+        workers (int, optional): Max thread count in parallel mode,
+            default is CPU count (at least 4).
+        cache (bool or HashCache, optional): Use given hash cache, or the
+            default one if True, default True.
+
     """
 
+    BUFFER_SIZE = 1024 * 1024 * 8
+
+    def __init__(self, legacy=True, workers=None, cache=True):
+        self.legacy = legacy
+        self.workers = workers or max(4, multiprocessing.cpu_count())
+        self.cache = hashcache.get_default() if cache is True else cache
+        self._pending = list()
+        self._streamed = list()
+        self._dirty = False
+        super(AssetHasher, self).__init__()
+
+    def clear(self):
+        """Start a new hash session
+        """
+        super(AssetHasher, self).clear()
+        self._pending = list()
+        self._streamed = list()
+        self._dirty = False
+
     def add_file(self, file_path):
         """Add one file to hasher
 
@@ -349,12 +563,26 @@ class AssetHasher(_C4Hasher):
             file_path (str): File path string
 
         """
+        if not self.legacy:
+            self._pending.append(file_path)
+            return
+
+        if self.cache:
+            # Defer reading, single file digest may be in cache
+            self._streamed.append(file_path)
+            return
+
+        self._stream(file_path)
+
+    def _stream(self, file_path):
         chunk_size = self.CHUNK_SIZE
 
         with open(file_path, "rb") as file:
             for chunk in iter(lambda: file.read(chunk_size), b""):
                 self.hash_obj.update(chunk)
 
+        self._dirty = True
+
     def add_dir(self, dir_path, recursive=True, followlinks=True):
         """Add one directory to hasher
 
@@ -365,6 +593,11 @@ class AssetHasher(_C4Hasher):
                 symlinks, default is True
 
         """
+        if not self.legacy:
+            for file_path in self._walk_once(dir_path, recursive, followlinks):
+                self.add_file(file_path)
+            return
+
         for root, dirs, files in os.walk(dir_path, followlinks=followlinks):
             for name in files:
                 self.add_file(os.path.join(root, name))
@@ -376,6 +609,88 @@ class AssetHasher(_C4Hasher):
                 path = os.path.join(root, name)
                 self.add_dir(path, recursive=True, followlinks=followlinks)
 
+    def digest(self):
+        """Return hash value of data added so far
+        """
+        if not self.legacy:
+            self._flush()
+
+        elif len(self._streamed) == 1 and not self._dirty:
+            # Only one file in this session, the digest of stream is the
+            # digest of that file.
+            file_path = self._streamed[0]
+            return self._c4encode(self._digest_files([file_path])[0])
+
+        else:
+            streamed, self._streamed = self._streamed, list()
+            for file_path in streamed:
+                self._stream(file_path)
+
+        return super(AssetHasher, self).digest()
+
+    def _walk_once(self, dir_path, recursive, followlinks):
+        """Yield each file under `dir_path` exactly once, in sorted order
+        """
+        for root, dirs, files in os.walk(dir_path, followlinks=followlinks):
+            dirs.sort()
+            for name in sorted(files):
+                yield os.path.join(root, name)
+
+            if not recursive:
+                break
+
+    def _flush(self):
+        """Hash queued files in parallel and fold digests in added order
+        """
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, list()
+        for file_digest in self._digest_files(pending):
+            self.hash_obj.update(file_digest)
+
+    def _digest_files(self, file_paths):
+        """Return raw digest of each file, consult hash cache if enabled
+        """
+        buffer_size = self.BUFFER_SIZE
+        digests = dict()
+        stats = dict()
+
+        if self.cache:
+            # Stat before reading, so file modified while hashing will
+            # not be cached as valid.
+            stats = {path: os.stat(path) for path in file_paths}
+            cached = self.cache.get_many(list(stats.items()))
+            for path, hex_digest in cached.items():
+                digests[path] = codecs.decode(hex_digest, "hex_codec")
+
+        missed = [path for path in set(file_paths) if path not in digests]
+
+        def digest_file(file_path):
+            return _digest_file(file_path, buffer_size)
+
+        if len(missed) > 1:
+            pool = ThreadPool(min(self.workers, len(missed)))
+            try:
+                # `map` preserves input order
+                hashed = pool.map(digest_file, missed)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            hashed = [digest_file(path) for path in missed]
+
+        digests.update(zip(missed, hashed))
+
+        if self.cache and missed:
+            self.cache.put_many([
+                (path, codecs.encode(digests[path], "hex_codec").decode(),
+                 stats[path])
+                for path in missed
+            ])
+
+        return [digests[path] for path in file_paths]
+
 
 def get_representation_path_(representation, parents):
     """Get filename from representation document
@@ -0,0 +1,254 @@
+"""Journaled version directory commit
+
+A publish writes into a hidden sibling dir of the final version dir, e.g.
+`.v012.partial` next to `v012`, with a journal file inside. After the
+database write succeeded, the partial dir is renamed into place in one
+atomic operation, so a crashed or cancelled publish never leaves a
+half-populated version dir behind.
+
+Stale dirs are never deleted recursively while publishing, they are
+renamed aside into `.v012.trash.<timestamp>` and removed later in bulk by
+`sweep`, which can be run from command line:
+
+    python -m reveries.versiondir /path/to/publish/root [--dry-run]
+
+"""
+import os
+import re
+import sys
+import json
+import time
+import errno
+import shutil
+import socket
+import logging
+
+
+log = logging.getLogger(__name__)
+
+
+JOURNAL_FILE = ".publish.journal.json"
+
+PARTIAL_SUFFIX = ".partial"
+TRASH_SUFFIX = ".trash"
+
+# Journal states
+OPEN = "open"
+COMMITTING = "committing"
+
+_PARTIAL_RE = re.compile(r"^\.(?P<name>.+)\.partial$")
+_TRASH_RE = re.compile(r"^\.(?P<name>.+)\.trash\.\d+(\.\d+)?$")
+
+
+def partial_dir_of(version_dir):
+    """Return the hidden sibling partial dir path of version dir"""
+    parent, name = os.path.split(os.path.normpath(version_dir))
+    return os.path.join(parent, "." + name + PARTIAL_SUFFIX)
+
+
+def read_journal(dir_path):
+    """Return journal data in dir, or None if no readable journal"""
+    journal_path = os.path.join(dir_path, JOURNAL_FILE)
+    try:
+        with open(journal_path, "r") as fp:
+            return json.load(fp)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def write_journal(dir_path, state, **data):
+    """Write journal into dir, replace atomically where supported"""
+    journal = {
+        "state": state,
+        "host": socket.gethostname(),
+        "pid": os.getpid(),
+        "time": time.time(),
+    }
+    journal.update(data)
+
+    journal_path = os.path.join(dir_path, JOURNAL_FILE)
+    tmp_path = journal_path + ".tmp"
+    with open(tmp_path, "w") as fp:
+        json.dump(journal, fp, indent=4)
+
+    if os.path.isfile(journal_path) and sys.platform == "win32":
+        # Python 2 on Windows can not rename over existing file
+        os.remove(journal_path)
+    os.rename(tmp_path, journal_path)
+
+    return journal
+
+
+def move_aside(dir_path):
+    """Rename dir into a hidden trash dir for `sweep` to remove later
+
+    This is O(1) compares to a recursive delete.
+
+    Returns:
+        str: Trash dir path, or None if `dir_path` not exists
+
+    """
+    if not os.path.exists(dir_path):
+        return None
+
+    parent, name = os.path.split(os.path.normpath(dir_path))
+    match = _PARTIAL_RE.match(name)
+    if match:
+        name = match.group("name")
+
+    trash = ".%s%s.%f" % (name, TRASH_SUFFIX, time.time())
+    trash = os.path.join(parent, trash)
+    os.rename(dir_path, trash)
+    log.info("Moved aside: %s -> %s" % (dir_path, trash))
+
+    return trash
+
+
+def prepare(version_dir, **data):
+    """Create a fresh partial dir with an open journal for version dir
+
+    Previous partial dir (from a crashed publish) is moved aside.
+
+    Returns:
+        str: Partial dir path
+
+    """
+    partial = partial_dir_of(version_dir)
+    move_aside(partial)
+    os.makedirs(partial)
+    write_journal(partial, OPEN, versionDir=version_dir, **data)
+
+    return partial
+
+
+def commit(version_dir):
+    """Rename partial dir into place as version dir
+
+    Raises:
+        OSError: If version dir already exists or partial dir is missing.
+
+    """
+    partial = partial_dir_of(version_dir)
+    journal = read_journal(partial) or dict()
+    journal.pop("state", None)
+    write_journal(partial, COMMITTING, **journal)
+
+    if os.path.exists(version_dir):
+        raise OSError(errno.EEXIST, "Version dir exists", version_dir)
+
+    os.rename(partial, version_dir)
+    os.remove(os.path.join(version_dir, JOURNAL_FILE))
+
+
+def _is_alive(journal):
+    """Return True if the journal owner process may still be running"""
+    if journal.get("host") != socket.gethostname():
+        return False  # Can't tell, rely on age
+    try:
+        os.kill(journal["pid"], 0)
+    except OSError as e:
+        return e.errno == errno.EPERM
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return False
+    return True
+
+
+def sweep(root, max_age=60 * 60 * 24, dry_run=False):
+    """Roll forward or garbage-collect orphaned partial dirs under root
+
+    * Trash dirs are removed.
+    * Partial dirs in "committing" state (database written) are renamed
+      into place if the version dir does not exist.
+    * Partial dirs in "open" state or without journal, which are older
+      than `max_age` seconds and not owned by a running process on this
+      host, are removed.
+
+    Version dirs are not walked into, so sweeping a project root only
+    lists subset dirs.
+
+    Arguments:
+        root (str): Dir to search from
+        max_age (float, optional): Seconds before an open partial dir is
+            considered orphaned, default 1 day.
+        dry_run (bool, optional): Only report, change nothing
+
+    Returns:
+        dict: {"removed": [path], "committed": [path], "kept": [path]}
+
+    """
+    report = {"removed": list(), "committed": list(), "kept": list()}
+    now = time.time()
+
+    def remove(path):
+        report["removed"].append(path)
+        if not dry_run:
+            shutil.rmtree(path, ignore_errors=True)
+
+    for parent, dirs, _ in os.walk(root):
+        subdirs = list()
+        for name in dirs:
+            path = os.path.join(parent, name)
+
+            if _TRASH_RE.match(name):
+                remove(path)
+                continue
+
+            match = _PARTIAL_RE.match(name)
+            if not match:
+                if not re.match(r"^v\d+$", name):
+                    subdirs.append(name)
+                continue
+
+            journal = read_journal(path) or dict()
+            version_dir = os.path.join(parent, match.group("name"))
+
+            if journal.get("state") == COMMITTING:
+                if os.path.exists(version_dir):
+                    remove(path)
+                else:
+                    report["committed"].append(version_dir)
+                    if not dry_run:
+                        os.rename(path, version_dir)
+                        os.remove(os.path.join(version_dir, JOURNAL_FILE))
+                continue
+
+            started = journal.get("time")
+            if started is None:
+                started = os.path.getmtime(path)
+            if now - started > max_age and not (journal and
+                                                _is_alive(journal)):
+                remove(path)
+            else:
+                report["kept"].append(path)
+
+        dirs[:] = subdirs
+
+    return report
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m reveries.versiondir",
+        description="Sweep orphaned partial publish dirs.")
+    parser.add_argument("root", help="Publish root to sweep")
+    parser.add_argument("--max-age", type=float, default=24.0,
+                        help="Hours before an open partial dir is "
+                             "considered orphaned, default 24.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only report, change nothing.")
+    args = parser.parse_args(argv)
+
+    report = sweep(args.root,
+                   max_age=args.max_age * 60 * 60,
+                   dry_run=args.dry_run)
+
+    for key in ("committed", "removed", "kept"):
+        for path in report[key]:
+            print("%-9s %s" % (key, path))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
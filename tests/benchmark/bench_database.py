@@ -0,0 +1,66 @@
+import pytest
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+import reveries.utils
+
+from conftest import load_plugin_module
+from synthetic import make_file_inventory
+
+pytest.importorskip("pytest_benchmark")
+
+
+class _Context(object):
+    def __init__(self, data):
+        self.data = data
+
+
+class _Instance(object):
+    def __init__(self, context, data):
+        self.context = context
+        self.data = data
+
+
+def test_version_dir(benchmark, workdir, mongo_project):
+    module = load_plugin_module("publish_versioner")
+
+    context = _Context({
+        "projectDoc": mongo_project["project"],
+        "assetDoc": mongo_project["asset"],
+        "currentMaking": workdir + "/model.ma",
+    })
+    instance = _Instance(context, {"subset": "model10"})
+
+    with mock.patch("avalon.api.registered_root", return_value=workdir):
+        versioner = module.PublishVersioner(instance)
+        version_dir = benchmark(versioner.version_dir)
+
+    assert version_dir.endswith("v201")
+
+
+def test_get_versions_from_sourcefile(benchmark, mongo_project):
+    source = ("/root/BenchProject/assets/hero/work/model05_v100.ma")
+
+    def query():
+        return list(reveries.utils.get_versions_from_sourcefile(
+            source, "BenchProject"))
+
+    versions = benchmark(query)
+    assert len(versions) == 1
+
+
+def test_resolve_file_profile(benchmark, mongo_project):
+    pytest.importorskip("maya")
+    from reveries.maya import lib as maya_lib
+
+    collection = mongo_project["collection"]
+    representation = collection.find_one({"type": "representation"})
+    inventory = make_file_inventory()
+
+    resolved = benchmark(maya_lib.resolve_file_profile,
+                         representation,
+                         inventory)
+    assert len(resolved) == 500
@@ -0,0 +1,82 @@
+import pytest
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+from conftest import load_plugin_module
+
+pytest.importorskip("pytest_benchmark")
+
+
+class _Context(list):
+    def __init__(self, data):
+        super(_Context, self).__init__()
+        self.data = data
+
+
+class _Instance(object):
+    def __init__(self, context, data):
+        self.context = context
+        self.data = data
+
+
+def _context(count):
+    session = {
+        "AVALON_PROJECT": "BenchProject",
+        "AVALON_ASSET": "hero",
+        "AVALON_DEADLINE_APP": "deadlinecommand",
+    }
+    session.update({"AVALON_VAR%d" % i: "value%d" % i for i in range(50)})
+
+    context = _Context({
+        "USE_DEADLINE_APP": True,
+        "user": "bench",
+        "comment": "",
+        "results": [],
+        "projectDoc": {"_id": "5c6159dbed9f0d0509a34e27",
+                       "name": "BenchProject",
+                       "data": {}},
+        "assetDoc": {"name": "hero"},
+        "currentMaking": "/work/hero/scenes/hero_v001.ma",
+        "workspaceDir": "/work/hero",
+        "mayaVersion": "2018",
+    })
+    for i in range(count):
+        context.append(_Instance(context, {
+            "subset": "model%03d" % i,
+            "versionNext": 1,
+            "deadlinePool": "none",
+            "deadlinePriority": 50,
+            "childInstances": [],
+        }))
+
+    return context, session
+
+
+def test_deadline_publish_payload(benchmark):
+    submitter_module = load_plugin_module("publish_deadline_submitter")
+    plugin_module = load_plugin_module("submit_deadline_publish",
+                                       host="maya")
+    context, session = _context(200)
+
+    def build_and_submit():
+        submitter = submitter_module.DeadlineSubmitter(context)
+        context.data["deadlineSubmitter"] = submitter
+        plugin_module.SubmitDeadlinePublish().process(context)
+
+        # Info files are written, `deadlinecommand` is not called
+        def run_command(args, count):
+            return ["job%d" % i for i in range(count)]
+
+        with mock.patch.object(submitter, "_run_command",
+                               side_effect=run_command):
+            submitter.submit()
+
+        return submitter
+
+    with mock.patch.dict("avalon.api.Session", session):
+        submitter = benchmark(build_and_submit)
+
+    assert not submitter._jobs
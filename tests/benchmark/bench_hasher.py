@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+import reveries.utils
+import reveries.hashcache
+
+pytest.importorskip("pytest_benchmark")
+
+
+def test_asset_hasher_legacy(benchmark, file_tree):
+
+    def digest():
+        hasher = reveries.utils.AssetHasher(cache=False)
+        hasher.add_dir(file_tree)
+        return hasher.digest()
+
+    assert benchmark(digest)
+
+
+def test_asset_hasher_parallel(benchmark, file_tree):
+
+    def digest():
+        hasher = reveries.utils.AssetHasher(legacy=False, cache=False)
+        hasher.add_dir(file_tree)
+        return hasher.digest()
+
+    assert benchmark(digest)
+
+
+def test_asset_hasher_cached(benchmark, file_tree, workdir):
+    db_path = os.path.join(workdir, "cache.db")
+    cache = reveries.hashcache.HashCache(db_path)
+
+    def digest():
+        hasher = reveries.utils.AssetHasher(legacy=False, cache=cache)
+        hasher.add_dir(file_tree)
+        return hasher.digest()
+
+    digest()  # Warm up cache
+    assert benchmark(digest)
+    cache.close()
+
+
+def test_asset_hasher_udim(benchmark, udim_dir):
+
+    def digest():
+        hasher = reveries.utils.AssetHasher(legacy=False, cache=False)
+        hasher.add_dir(udim_dir)
+        return hasher.digest()
+
+    assert benchmark(digest)
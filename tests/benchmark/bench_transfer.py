@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+import reveries.transfer
+
+from synthetic import make_files
+
+pytest.importorskip("pytest_benchmark")
+
+
+def _transfer(workdir, job, src, strategies):
+
+    def setup():
+        dst = tempfile.mkdtemp(prefix="dst_", dir=workdir)
+        version_dir = os.path.join(dst, "v001")
+        engine = reveries.transfer.FileTransfer(manifest_dir=version_dir,
+                                                strategies=strategies)
+        if job == "packages":
+            package = os.path.join(dst, "staging", "package")
+            shutil.copytree(src, package)
+            engine.add(job, package, os.path.join(version_dir, "package"))
+        else:
+            for name in os.listdir(src):
+                engine.add(job,
+                           os.path.join(src, name),
+                           os.path.join(version_dir, name))
+        return (engine,), dict()
+
+    return setup
+
+
+def test_transfer_copy_files(benchmark, workdir):
+    src = os.path.join(workdir, "src")
+    make_files(src, 1000, dirs=1)
+    src = os.path.join(src, "d000")
+
+    setup = _transfer(workdir, "files", src, (reveries.transfer.COPY,))
+    stats = benchmark.pedantic(lambda engine: engine.run(),
+                               setup=setup, rounds=5)
+    assert stats["files"]["count"] == 1000
+
+
+def test_transfer_copy_udim(benchmark, workdir, udim_dir):
+    setup = _transfer(workdir, "files", udim_dir, (reveries.transfer.COPY,))
+    stats = benchmark.pedantic(lambda engine: engine.run(),
+                               setup=setup, rounds=5)
+    assert stats["files"]["count"] == 90
+
+
+def test_transfer_link_package(benchmark, workdir, file_tree):
+    strategies = (reveries.transfer.REFLINK,
+                  reveries.transfer.HARDLINK,
+                  reveries.transfer.COPY)
+    setup = _transfer(workdir, "packages", file_tree, strategies)
+    stats = benchmark.pedantic(lambda engine: engine.run(),
+                               setup=setup, rounds=5)
+    assert stats["packages"]["count"] == 2000
@@ -0,0 +1,24 @@
+import copy
+
+import pytest
+
+import reveries.utils
+
+pytest.importorskip("pytest_benchmark")
+
+
+def _nested(depth, width, leaf):
+    if depth == 0:
+        return leaf
+    return {"k%d" % i: _nested(depth - 1, width, leaf) for i in range(width)}
+
+
+def test_deep_update(benchmark):
+    base = _nested(4, 10, 0)
+    update = _nested(4, 10, 1)
+
+    def deep_update():
+        return reveries.utils.deep_update(copy.deepcopy(base), update)
+
+    result = benchmark(deep_update)
+    assert result["k9"]["k9"]["k9"]["k9"] == 1
@@ -0,0 +1,173 @@
+"""Benchmark suite of host-independent publish hot paths
+
+Run with `pytest-benchmark` and store results as JSON for comparing
+between commits:
+
+    tox -e benchmark
+
+    # or
+    pytest tests/benchmark -o python_files="bench_*.py" \\
+        --benchmark-autosave --benchmark-storage=file://.benchmarks
+
+    pytest-benchmark --storage file://.benchmarks compare 0001 0002
+
+Benchmark modules are named `bench_*.py` so the regular test run does not
+collect them.
+
+"""
+import os
+import shutil
+import tempfile
+
+import pytest
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+from tests.fixtures.avalon import import_module
+from synthetic import make_files, make_udim_set
+
+
+PLUGINS = os.path.join(os.path.dirname(__file__), "..", "..", "plugins")
+
+PUBLISH_TEMPLATE = ("{root}/{project}/{silo}/{asset}/publish/"
+                    "{subset}/v{version:0>3}/{representation}")
+
+
+def load_plugin_module(name, host="global"):
+    """Import publish plugin file as module"""
+    return import_module("bench_%s_%s" % (host, name),
+                         os.path.join(PLUGINS, host, "publish", name + ".py"))
+
+
+@pytest.fixture
+def workdir():
+    path = tempfile.mkdtemp(prefix="bench_")
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture(scope="module")
+def file_tree():
+    """2000 small files in 20 sub-dirs"""
+    path = tempfile.mkdtemp(prefix="bench_tree_")
+    make_files(path, 2000)
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture(scope="module")
+def udim_dir():
+    """3 maps x 30 UDIM tiles"""
+    path = tempfile.mkdtemp(prefix="bench_udim_")
+    make_udim_set(path)
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture(scope="module")
+def mongo_project():
+    """mongomock-backed project with deep version histories
+
+    20 subsets, each has 200 versions with 2 representations.
+
+    Yields:
+        dict: Documents and the project collection
+
+    """
+    mongomock = pytest.importorskip("mongomock")
+    import avalon.api
+    import avalon.io
+
+    project_name = "BenchProject"
+    client = mongomock.MongoClient()
+    database = client["avalon"]
+    collection = database[project_name]
+
+    project = {
+        "_id": mongomock.ObjectId(),
+        "type": "project",
+        "name": project_name,
+        "config": {"template": {"publish": PUBLISH_TEMPLATE}},
+    }
+    asset = {
+        "_id": mongomock.ObjectId(),
+        "type": "asset",
+        "name": "hero",
+        "silo": "assets",
+        "parent": project["_id"],
+    }
+    collection.insert_many([project, asset])
+
+    subsets = list()
+    documents = list()
+    for s in range(20):
+        subset = {
+            "_id": mongomock.ObjectId(),
+            "type": "subset",
+            "name": "model%02d" % s,
+            "parent": asset["_id"],
+            "data": {"families": ["reveries.model"]},
+        }
+        documents.append(subset)
+        subsets.append(subset)
+
+        for v in range(1, 201):
+            version = {
+                "_id": mongomock.ObjectId(),
+                "type": "version",
+                "name": v,
+                "parent": subset["_id"],
+                "data": {
+                    "source": "{root}/%s/assets/hero/work/model%02d_v%03d.ma"
+                              "" % (project_name, s, v),
+                    "time": "20190101T000000Z",
+                },
+            }
+            documents.append(version)
+            for name in ("mayaBinary", "Alembic"):
+                documents.append({
+                    "_id": mongomock.ObjectId(),
+                    "type": "representation",
+                    "name": name,
+                    "parent": version["_id"],
+                    "data": {},
+                })
+    collection.insert_many(documents)
+
+    def find(filter, projection=None, sort=None):
+        return collection.find(filter, projection=projection, sort=sort)
+
+    def find_one(filter, projection=None, sort=None):
+        return collection.find_one(filter, projection=projection, sort=sort)
+
+    def parenthood(document):
+        parents = list()
+        while document.get("parent") is not None:
+            document = collection.find_one({"_id": document["parent"]})
+            if document is None:
+                break
+            parents.append(document)
+        return parents
+
+    session = {
+        "AVALON_PROJECT": project_name,
+        "AVALON_SILO": "assets",
+        "AVALON_ASSET": "hero",
+    }
+
+    with mock.patch.dict(avalon.api.Session, session), \
+            mock.patch.object(avalon.io, "_database", database,
+                              create=True), \
+            mock.patch.object(avalon.io, "find", find), \
+            mock.patch.object(avalon.io, "find_one", find_one), \
+            mock.patch.object(avalon.io, "parenthood", parenthood,
+                              create=True):
+        yield {
+            "collection": collection,
+            "project": project,
+            "asset": asset,
+            "subsets": subsets,
+        }
@@ -0,0 +1,59 @@
+"""Synthetic data generators for benchmarks"""
+import os
+
+
+def make_files(root, count, size=4096, dirs=20, ext=".bin"):
+    """Write `count` files of `size` bytes, spread in `dirs` sub-dirs
+
+    Returns:
+        list: File paths
+
+    """
+    paths = list()
+    for i in range(count):
+        dir_path = os.path.join(root, "d%03d" % (i % dirs))
+        if not os.path.isdir(dir_path):
+            os.makedirs(dir_path)
+        path = os.path.join(dir_path, "f%06d%s" % (i, ext))
+        with open(path, "wb") as fp:
+            fp.write(os.urandom(size))
+        paths.append(path)
+    return paths
+
+
+def make_udim_set(root, maps=("diffuse", "specular", "normal"), tiles=30,
+                  size=256 * 1024):
+    """Write UDIM tiled texture files
+
+    Returns:
+        dict: {fpattern: [file name]}
+
+    """
+    if not os.path.isdir(root):
+        os.makedirs(root)
+
+    udim_set = dict()
+    for name in maps:
+        fnames = list()
+        for tile in range(tiles):
+            fname = "%s.%d.tif" % (name, 1001 + tile)
+            with open(os.path.join(root, fname), "wb") as fp:
+                fp.write(os.urandom(size))
+            fnames.append(fname)
+        udim_set[name + ".<UDIM>.tif"] = fnames
+    return udim_set
+
+
+def make_file_inventory(patterns=500, versions=10, tiles=20):
+    """Return a large texture `fileInventory` list"""
+    inventory = list()
+    for p in range(patterns):
+        for v in range(1, versions + 1):
+            inventory.append({
+                "fpattern": "tex%04d.<UDIM>.tif" % p,
+                "version": v,
+                "colorSpace": "sRGB",
+                "fnames": ["tex%04d.%d.tif" % (p, 1001 + t)
+                           for t in range(tiles)],
+            })
+    return inventory
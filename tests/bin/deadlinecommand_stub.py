@@ -0,0 +1,58 @@
+"""Stand-in `deadlinecommand` for tests
+
+Accepts job submission in both forms, and prints one `JobID` per job like
+`deadlinecommand` does:
+
+    deadlinecommand <job info> <plugin info>
+    deadlinecommand -SubmitMultipleJobs [-dependent] -job <job> <plugin> ...
+
+Each call is appended as a JSON line into the file of env var
+`DEADLINE_STUB_LOG`, with job info contents.
+
+"""
+import os
+import sys
+import json
+import uuid
+
+
+def read_info(path):
+    with open(path) as fp:
+        return dict(line.rstrip("\n").split("=", 1)
+                    for line in fp if "=" in line)
+
+
+def main(argv):
+    dependent = False
+    jobs = list()
+
+    if argv and argv[0] == "-SubmitMultipleJobs":
+        args = iter(argv[1:])
+        for arg in args:
+            if arg == "-dependent":
+                dependent = True
+            elif arg == "-job":
+                jobs.append((next(args), next(args)))
+    else:
+        jobs.append((argv[0], argv[1]))
+
+    submitted = list()
+    for job_info, _ in jobs:
+        jobid = uuid.uuid4().hex[:24]
+        submitted.append({"jobId": jobid, "jobInfo": read_info(job_info)})
+
+        sys.stdout.write("Submitting job..\n"
+                         "Result=Success\n"
+                         "JobID=%s\n\n" % jobid)
+
+    log_file = os.getenv("DEADLINE_STUB_LOG")
+    if log_file:
+        with open(log_file, "a") as fp:
+            fp.write(json.dumps({"dependent": dependent,
+                                 "jobs": submitted}) + "\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,36 @@
+"""Stand-in `maketx` for tests
+
+Accepts `maketx` style arguments `[options] <input> -o <output>`, and
+copies input to output. Exit with error if input not exists. With `-u`,
+output that is not older than input is left as is, like `maketx` does.
+
+    REVERIES_MAKETX="python tests/bin/maketx_stub.py"
+
+"""
+import os
+import sys
+import shutil
+
+
+def main(argv):
+    output = argv[argv.index("-o") + 1]
+    inputs = [arg for i, arg in enumerate(argv)
+              if not arg.startswith("-") and argv[i - 1] != "-o"]
+    source = inputs[-1]
+
+    try:
+        if ("-u" in argv and os.path.isfile(output) and
+                os.path.getmtime(output) >= os.path.getmtime(source)):
+            sys.stdout.write("maketx: %s is up to date\n" % output)
+            return 0
+        shutil.copyfile(source, output)
+    except (IOError, OSError) as e:
+        sys.stderr.write("maketx: %s\n" % e)
+        return 1
+
+    sys.stdout.write("maketx: %s -> %s\n" % (source, output))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,5 +1,14 @@
 
 import os
+import shutil
+import tempfile
+
+import pytest
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
 
 from .fixtures.avalon import (
     minmum_environment_setup,
@@ -21,6 +30,37 @@ __all__ = [
 ]
 
 
+@pytest.fixture
+def workdir():
+    """Temporary dir, removed after test"""
+    path = tempfile.mkdtemp(prefix="test_")
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def isolated_hash_cache():
+    """Keep `AssetHasher` away from the user's hash cache"""
+    wdir = tempfile.mkdtemp(prefix="test_hashcache_")
+    environ = {"REVERIES_HASH_CACHE": os.path.join(wdir, "hashcache.db")}
+    try:
+        with mock.patch.dict(os.environ, environ):
+            yield wdir
+    finally:
+        shutil.rmtree(wdir, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def isolated_deadline_spool():
+    """Keep `DeadlineSubmitter` away from the user's Deadline spool"""
+    wdir = tempfile.mkdtemp(prefix="test_spool_")
+    try:
+        with mock.patch.dict(os.environ, {"REVERIES_DEADLINE_SPOOL": wdir}):
+            yield wdir
+    finally:
+        shutil.rmtree(wdir, ignore_errors=True)
+
+
 collect_ignore = []
 
 if not os.environ.get("REVERIES_IN_HOUSE_TEST"):
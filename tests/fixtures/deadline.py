@@ -0,0 +1,80 @@
+
+import json
+import time
+import threading
+
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+
+
+class _ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _DeadlineStub(BaseHTTPRequestHandler):
+    """Stub of Deadline web service, `POST /api/jobs` only
+
+    Responds 503 while `server.unavailable` is greater than 0, which is
+    decreased on each request. Job is created before responding after
+    `server.delay` seconds, like a web service that is too slow.
+
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        payload = json.loads(self.rfile.read(length).decode("utf-8"))
+
+        server = self.server
+        with server.lock:
+            server.clients.add(self.client_address)
+            if server.unavailable > 0:
+                server.unavailable -= 1
+                jobid = None
+            else:
+                jobid = "job%d" % len(server.jobs)
+                server.jobs[jobid] = payload
+
+        if server.delay:
+            time.sleep(server.delay)
+
+        if jobid is None:
+            status, body = 503, b"Service Unavailable"
+        else:
+            status, body = 200, json.dumps({"_id": jobid}).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_deadline_stub(unavailable=0):
+    """Start stub of Deadline web service in thread, return the server
+
+    Submitted payloads are in `server.jobs`, by job id. Call `shutdown`
+    and `server_close` when done.
+
+    """
+    server = _ThreadingServer(("127.0.0.1", 0), _DeadlineStub)
+    server.lock = threading.Lock()
+    server.jobs = dict()
+    server.clients = set()
+    server.unavailable = unavailable
+    server.delay = 0
+    server.url = "http://127.0.0.1:%d" % server.server_port
+
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    return server
@@ -0,0 +1,142 @@
+
+import os
+import gzip
+import shutil
+import tempfile
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+from reveries import assrewrite
+
+
+ASS = b"""\
+image
+{
+ name wall
+ filename "/projects/Foo/publish/wall.tx"
+}
+
+alembic
+{
+ name cache
+ filename "/projects/Foo/publish/cache.abc"
+ nodes "/projects/Foo/publish/notAPath"
+}
+"""
+
+
+def _write(path, content):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wb") as fp:
+        fp.write(content)
+
+
+def _read(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as fp:
+        return fp.read()
+
+
+def test_rewrite():
+    root = tempfile.mkdtemp(prefix="test_assrewrite_")
+    rules = assrewrite.embedding_rules("/projects", "Foo")
+
+    try:
+        paths = [os.path.join(root, "standin.%04d.ass" % frame)
+                 for frame in range(1, 4)]
+        paths.append(os.path.join(root, "standin.0004.ass.gz"))
+        for path in paths:
+            _write(path, ASS)
+
+        unchanged = os.path.join(root, "other.ass")
+        _write(unchanged, b"image\n{\n name other\n}\n")
+        mtime = os.path.getmtime(unchanged)
+
+        changed = assrewrite.rewrite_files(paths + [unchanged], rules,
+                                           processes=2)
+        assert changed == paths
+
+        expected = ASS.replace(
+            b' filename "/projects/Foo/',
+            b' filename "[AVALON_PROJECTS]/[AVALON_PROJECT]/')
+        for path in paths:
+            assert _read(path) == expected
+        assert os.path.getmtime(unchanged) == mtime
+
+        # No temp file left
+        assert sorted(os.listdir(root)) == sorted(
+            os.path.basename(path) for path in paths + [unchanged])
+
+        # Already embedded
+        assert not assrewrite.rewrite(paths[0], rules)
+
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_can_spawn():
+    for exe, expected in [("/usr/bin/python3", True),
+                          ("C:/Program Files/Maya/bin/mayapy.exe", True),
+                          ("/usr/autodesk/maya/bin/maya.bin", False),
+                          ("C:/Program Files/Maya/bin/maya.exe", False)]:
+        with mock.patch.object(assrewrite.sys, "executable", exe):
+            assert assrewrite._can_spawn() is expected
+
+
+def test_rewrite_files_in_threads():
+    root = tempfile.mkdtemp(prefix="test_assrewrite_")
+    rules = assrewrite.embedding_rules("/projects", "Foo")
+
+    try:
+        paths = [os.path.join(root, "standin.%04d.ass" % frame)
+                 for frame in range(1, 3)]
+        for path in paths:
+            _write(path, ASS)
+
+        with mock.patch.object(assrewrite.multiprocessing, "Pool") as pool:
+            changed = assrewrite.rewrite_files(paths, rules, processes=2,
+                                               threads=True)
+            assert not pool.called
+        assert changed == paths
+
+        # Embedded interpreter
+        for path in paths:
+            _write(path, ASS)
+        with mock.patch.object(assrewrite.multiprocessing, "Pool") as pool, \
+                mock.patch.object(assrewrite.sys, "executable", "maya.bin"):
+            changed = assrewrite.rewrite_files(paths, rules, processes=2)
+            assert not pool.called
+        assert changed == paths
+
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_rewrite_unchanged_not_written():
+    root = tempfile.mkdtemp(prefix="test_assrewrite_")
+    rules = assrewrite.embedding_rules("/projects", "Foo")
+
+    try:
+        path = os.path.join(root, "standin.ass.gz")
+        _write(path, ASS.replace(b"/projects/Foo/", b"/elsewhere/"))
+
+        with mock.patch.object(assrewrite, "_temp_file",
+                               wraps=assrewrite._temp_file) as temp_file:
+            assert not assrewrite.rewrite(path, rules)
+            assert not temp_file.called
+
+            # Unchanged head is copied when the change comes later
+            _write(path, b"options\n{\n}\n" * 1000 + ASS)
+            assert assrewrite.rewrite(path, rules)
+            assert temp_file.call_count == 1
+
+        assert _read(path).startswith(b"options\n{\n}\n" * 1000 + b"image")
+        assert b"[AVALON_PROJECTS]/[AVALON_PROJECT]/publish/wall.tx" in \
+            _read(path)
+        assert os.listdir(root) == ["standin.ass.gz"]
+
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
@@ -0,0 +1,98 @@
+import os
+import time
+
+import reveries.casstore as casstore
+
+
+def test_store_and_gc(workdir):
+    root = workdir
+    src_dir = os.path.join(workdir, "src")
+    os.makedirs(src_dir)
+
+    paths = list()
+    for name in ("a.tif", "b.tif"):
+        path = os.path.join(src_dir, name)
+        with open(path, "w") as f:
+            f.write("same pixels")
+        paths.append(path)
+
+    cid_a, blob_a, stored = casstore.store(root, paths[0],
+                                           content_id="c4abcdef")
+    assert stored
+    assert blob_a == casstore.blob_path(root, "c4abcdef")
+
+    # Same content stored once
+    cid_b, blob_b, stored = casstore.store(root, paths[1],
+                                           content_id="c4abcdef")
+    assert not stored
+    assert blob_b == blob_a
+
+    # Referenced by one published file
+    published = os.path.join(src_dir, "published.tif")
+    os.link(blob_a, published)
+    assert casstore.ref_count(blob_a) == 1
+
+    casstore.store(root, paths[0], content_id="c4ghijkl")
+    orphan = casstore.blob_path(root, "c4ghijkl")
+
+    # Grace period
+    report = casstore.gc(root)
+    assert not report["removed"]
+
+    report = casstore.gc(root, max_age=0, dry_run=True)
+    assert report["removed"] == [orphan]
+    assert os.path.isfile(orphan)
+
+    casstore.gc(root, max_age=0)
+    assert not os.path.exists(orphan)
+    assert os.path.isfile(blob_a)
+
+
+def test_gc_grace_period_of_old_file(workdir):
+    root = workdir
+    src_dir = os.path.join(workdir, "src")
+    os.makedirs(src_dir)
+
+    src = os.path.join(src_dir, "old.tif")
+    with open(src, "w") as f:
+        f.write("old pixels")
+    # Texture last modified a year ago
+    old = time.time() - 60 * 60 * 24 * 365
+    os.utime(src, (old, old))
+
+    _, blob, stored = casstore.store(root, src, content_id="c4oldold")
+    assert stored
+
+    # Not linked by publish yet, but still in grace period
+    report = casstore.gc(root)
+    assert report["removed"] == []
+    assert os.path.isfile(blob)
+
+    published = os.path.join(src_dir, "published.tif")
+    os.link(blob, published)
+    assert casstore.ref_count(blob) == 1
+
+
+def test_gc_grace_period_of_reused_blob(workdir):
+    root = workdir
+    src_dir = os.path.join(workdir, "src")
+    os.makedirs(src_dir)
+
+    src = os.path.join(src_dir, "orphan.tif")
+    with open(src, "w") as f:
+        f.write("orphan pixels")
+
+    _, blob, stored = casstore.store(root, src, content_id="c4orphan")
+    assert stored
+    # Orphan blob left by a publish long ago
+    old = time.time() - 60 * 60 * 24 * 365
+    os.utime(blob, (old, old))
+
+    _, reused, stored = casstore.store(root, src, content_id="c4orphan")
+    assert reused == blob
+    assert not stored
+
+    # Not removed before the new publish links it
+    report = casstore.gc(root)
+    assert report["removed"] == []
+    assert os.path.isfile(blob)
@@ -0,0 +1,113 @@
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+from reveries.deadline import chunking
+
+
+def test_fit():
+    # 60 sec. scene load, 2 sec. per frame
+    samples = [(f, 60 + 2 * f) for f in (1, 1, 5, 10)]
+    overhead, per_frame = chunking.fit(samples)
+    assert abs(overhead - 60) < 1e-6
+    assert abs(per_frame - 2) < 1e-6
+
+    # Only one frame count, overhead can not be told apart
+    assert chunking.fit([(1, 62), (1, 62)]) == (0.0, 62.0)
+    assert chunking.fit([]) is None
+
+
+def test_chunk_size():
+    root = tempfile.mkdtemp(prefix="test_chunking_")
+    store = chunking.JsonStore(os.path.join(root, "stats", "tasks.json"))
+    scheduler = chunking.ChunkScheduler(store, target=300, max_chunk=100)
+    key = chunking.stats_key("Foo", "hero", "standinMain", "standin")
+
+    try:
+        assert scheduler.chunk_size(key, default=3) == 3
+
+        # Cheap export, scene load dominated
+        scheduler.record(key, [(1, 62)] * 10)
+        assert scheduler.chunk_size(key) == 4
+        scheduler.record(key, [(4, 68)] * 10)
+        assert scheduler.chunk_size(key) == 100
+        assert scheduler.chunk_size(key, frame_count=24) == 24
+
+        # Heavy frames stay one per task
+        heavy = chunking.stats_key("Foo", "hero", "renderMain", "render")
+        scheduler.record(heavy, [(1, 900), (2, 1800)])
+        assert scheduler.chunk_size(heavy, default=5) == 1
+
+        # Samples are capped
+        scheduler.limit = 5
+        scheduler.record(key, [(1, 62)] * 10)
+        assert len(store.samples(key)) == 5
+
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_mongo_store():
+    mongomock = pytest.importorskip("mongomock")
+    collection = mongomock.MongoClient()["avalon"][chunking.COLLECTION]
+    store = chunking.MongoStore(collection)
+
+    store.add("key", [(1, 10), (1, 12)], limit=3)
+    store.add("key", [(2, 20), (2, 22)], limit=3)
+    assert store.samples("key") == [(1, 12), (2, 20), (2, 22)]
+    assert store.samples("missing") == []
+
+
+def test_of_context():
+    root = tempfile.mkdtemp(prefix="test_chunking_")
+
+    class _Context(object):
+        data = dict()
+
+    environ = {"REVERIES_TASK_STATS": os.path.join(root, "tasks.json")}
+    try:
+        with mock.patch.dict(os.environ, environ):
+            context = _Context()
+            scheduler = chunking.of(context)
+            assert isinstance(scheduler.store, chunking.JsonStore)
+            assert chunking.of(context) is scheduler
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_block_size():
+    root = tempfile.mkdtemp(prefix="test_chunking_")
+    store = chunking.JsonStore(os.path.join(root, "tasks.json"))
+    scheduler = chunking.ChunkScheduler(store, target=1200, max_chunk=100)
+    key = chunking.stats_key("Foo", "hero", "standinMain", "standin")
+
+    try:
+        assert scheduler.block_size(key) == 1
+
+        # Overhead unknown yet, same as chunk size
+        scheduler.record(key, [(1, 70)] * 3)
+        assert scheduler.block_size(key) == scheduler.chunk_size(key) == 17
+
+        # 60 sec. scene load, 10 sec. per frame, smallest block that keeps
+        # scene load within 10% of task time.
+        scheduler.record(key, [(17, 230)] * 3)
+        assert scheduler.block_size(key) == 54
+        assert scheduler.block_size(key, overhead_ratio=0.5) == 6
+        assert scheduler.block_size(key, frame_count=10) == 10
+
+        # But not longer than target
+        scheduler.target = 600
+        assert scheduler.block_size(key) == 54
+        scheduler.target = 300
+        assert scheduler.block_size(key) == 24
+
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
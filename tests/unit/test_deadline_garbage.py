@@ -0,0 +1,120 @@
+
+import pytest
+
+from reveries.deadline import garbage
+
+
+def _job(job_id, name, deps=(), batch="batch", avalon=True):
+    doc = {
+        "_id": job_id,
+        "Props": {
+            "Name": name,
+            "Batch": batch,
+            "Dep": [{"JobID": dep, "Notes": ""} for dep in deps],
+            "Env": {"AVALON_ASSET": "hero"} if avalon else {},
+        },
+    }
+    return doc
+
+
+@pytest.fixture
+def jobs():
+    mongomock = pytest.importorskip("mongomock")
+    collection = mongomock.MongoClient()["deadline10db"]["Jobs"]
+    collection.insert_many([
+        _job("render1", "renderMain v001"),
+        _job("pub1", "_intergrate renderMain v001", ["render1"]),
+        # Dependency deleted
+        _job("pub2", "_intergrate renderMain v002", ["render2"]),
+        # One of dependencies exists
+        _job("pub3", "_intergrate fx v001", ["render1", "render3"]),
+        # Not Avalon job
+        _job("pub4", "_intergrate other", ["render4"], avalon=False),
+        # Not integration job
+        _job("comp1", "comp v001", ["render5"]),
+        # Other batch
+        _job("pub5", "_intergrate renderMain v001", ["render1"],
+             batch="other"),
+        # Not in batch
+        _job("render6", "renderMain v006", batch=""),
+        _job("pub6", "_intergrate renderMain v006", ["render6"], batch=""),
+        _job("comp6", "comp v006", ["render6"], batch="comp"),
+    ])
+    return collection
+
+
+def test_wipe(jobs):
+    index = garbage.JobIndex.load(jobs)
+    assert index.dependents["render1"] == {"pub1", "pub3", "pub5"}
+    assert index.orphaned() == ["pub2"]
+
+    report = garbage.wipe(jobs, deleter=None, dry_run=True)
+    assert report["candidates"] == [("pub2",
+                                     "_intergrate renderMain v002")]
+    assert report["deleted"] == []
+
+    calls = list()
+
+    def deleter(job_ids):
+        calls.append(job_ids)
+        jobs.delete_many({"_id": {"$in": job_ids}})
+
+    report = garbage.wipe(jobs, deleter)
+    assert report["deleted"] == ["pub2"]
+    assert calls == [["pub2"]]
+    assert jobs.find_one({"_id": "pub2"}) is None
+
+
+def test_collect(jobs):
+    assert garbage.dependents(jobs, "render1") == {
+        "pub1": "_intergrate renderMain v001",
+        "pub3": "_intergrate fx v001",
+        "pub5": "_intergrate renderMain v001",
+    }
+
+    calls = list()
+
+    def deleter(job_ids):
+        calls.append(job_ids)
+        return job_ids[:1]
+
+    report = garbage.collect(jobs, "render1", "batch", deleter)
+    assert [job_id for job_id, _ in report["candidates"]] == ["pub1", "pub3"]
+    assert report["deleted"] == ["pub1"]
+
+    # Batched
+    report = garbage.delete(["a", "b", "c"], deleter, batch_size=2)
+    assert calls[-2:] == [["a", "b"], ["c"]]
+
+
+def test_collect_unbatched(jobs):
+    report = garbage.collect(jobs, "render6", "", deleter=None,
+                             dry_run=True)
+    assert report["candidates"] == [("pub6",
+                                     "_intergrate renderMain v006")]
+
+
+def test_repository_deleter():
+
+    class RepositoryUtils(object):
+        jobs = {"a": "job a", "b": "job b"}
+        deleted = list()
+
+        @classmethod
+        def GetJob(cls, job_id, invalidate):
+            return cls.jobs.get(job_id)
+
+        @classmethod
+        def DeleteJob(cls, job):
+            cls.deleted.append(job)
+
+    deleter = garbage.repository_deleter(RepositoryUtils)
+    assert deleter(["a", "missing", "b"]) == ["a", "b"]
+    assert RepositoryUtils.deleted == ["job a", "job b"]
+
+
+def test_is_dry_run():
+    assert garbage.is_dry_run("1")
+    assert garbage.is_dry_run("yes")
+    assert not garbage.is_dry_run("0")
+    assert not garbage.is_dry_run("")
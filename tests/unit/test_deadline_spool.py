@@ -0,0 +1,210 @@
+
+import os
+import time
+import shutil
+import tempfile
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+from reveries.deadline import spool as deadline_spool
+from tests.fixtures.avalon import import_module
+from tests.fixtures.deadline import serve_deadline_stub
+
+
+PLUGIN = os.path.join(os.path.dirname(__file__), "..", "..", "plugins",
+                      "global", "publish", "publish_deadline_submitter.py")
+
+
+def _jobs():
+    return {
+        "1": {"JobInfo": {"Name": "render",
+                          "JobDependencies": "0",
+                          "EnvironmentKeyValue0":
+                              "AVALON_DELEGATED_SUBSETS=renderMain:3"},
+              "PluginInfo": {}},
+        "2": {"JobInfo": {"Name": "publish",
+                          "JobDependencies": "1"},
+              "PluginInfo": {}},
+    }
+
+
+def test_spool_flush():
+    root = tempfile.mkdtemp(prefix="test_spool_")
+    server = serve_deadline_stub(unavailable=1)
+    url = server.url + "/api/jobs"
+
+    try:
+        spool = deadline_spool.Spool(root)
+        key = spool.put(url, _jobs(), submitted={"0": "job_before"})
+        # Idempotent
+        assert spool.put(url, _jobs(), submitted={"0": "job_before"}) == key
+        assert spool.keys() == [key]
+
+        # Web service still down
+        now = time.time()
+        report = spool.flush(now=now)
+        assert report["retrying"] == [key]
+        entry = spool.get(key)
+        assert entry["attempts"] == 1
+        assert entry["nextAttempt"] == now + spool.base_delay
+
+        # Not due yet
+        assert spool.flush(now=now + 1)["skipped"] == [key]
+
+        report = spool.flush(now=now + spool.base_delay)
+        assert report["submitted"] == [key]
+        assert spool.keys() == []
+
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(root, ignore_errors=True)
+
+    jobs = {payload["JobInfo"]["Name"]: (jobid, payload["JobInfo"])
+            for jobid, payload in server.jobs.items()}
+    render_id, render = jobs["render"]
+    assert render["JobDependencies"] == "job_before"
+    assert render["EnvironmentKeyValue0"] == \
+        "AVALON_DELEGATED_SUBSETS=renderMain:3"
+    assert jobs["publish"][1]["JobDependencies"] == render_id
+
+    assert spool.delay(1) == spool.base_delay
+    assert spool.delay(3) == spool.base_delay * 4
+    assert spool.delay(100) == spool.max_delay
+
+
+def test_spool_on_failure():
+    module = import_module("test_publish_deadline_submitter", PLUGIN)
+    root = tempfile.mkdtemp(prefix="test_spool_")
+    # Down after first job submitted
+    server = serve_deadline_stub()
+
+    class _Context(object):
+        data = {"user": "tester", "comment": ""}
+
+    session = {"AVALON_PROJECT": "Foo", "AVALON_DEADLINE": server.url}
+    environ = {"AVALON_DEADLINE_AUTH": "a:b",
+               "REVERIES_DEADLINE_SPOOL": root}
+
+    try:
+        with mock.patch.dict("avalon.api.Session", session), \
+                mock.patch.dict(os.environ, environ), \
+                mock.patch.object(module.deadline_spool,
+                                  "start_flusher") as start_flusher:
+            submitter = module.DeadlineSubmitter(_Context())
+            for payload in [{"JobInfo": {"Name": "cache"},
+                             "PluginInfo": {}}] + list(_jobs().values()):
+                submitter.add_job(payload)
+
+            original = module.deadline_jobs.post_job
+
+            def post_job(*args, **kwargs):
+                jobid = original(*args, **kwargs)
+                server.unavailable = 10
+                return jobid
+
+            with mock.patch.object(module.deadline_jobs, "post_job",
+                                   side_effect=post_job):
+                submitter.submit()  # Should not raise
+
+            assert start_flusher.called
+            spool = deadline_spool.Spool(root)
+            assert len(spool.keys()) == 1
+            entry = spool.entries()[0]
+            assert sorted(entry["jobs"]) == ["1", "2"]
+            assert entry["submitted"] == {"0": "job0"}
+
+            server.unavailable = 0
+            assert len(spool.flush()["submitted"]) == 1
+
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(root, ignore_errors=True)
+
+    assert len(server.jobs) == 3
+
+
+def test_spool_read_timeout():
+    root = tempfile.mkdtemp(prefix="test_spool_")
+    server = serve_deadline_stub()
+    url = server.url + "/api/jobs"
+
+    try:
+        spool = deadline_spool.Spool(root)
+        spool.timeout = 0.2
+        key = spool.put(url, _jobs(), submitted={"0": "job_before"})
+
+        # Job created, but response too late
+        server.delay = 1
+        report = spool.flush()
+        assert report["failed"] == [key]
+        entry = spool.get(key)
+        assert entry["state"] == deadline_spool.FAILED
+        assert "may have been submitted" in entry["lastError"]
+
+        # Not retried automatically
+        server.delay = 0
+        assert spool.flush(now=time.time() + spool.max_delay)["skipped"] \
+            == [key]
+
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(root, ignore_errors=True)
+
+    assert len(server.jobs) == 1
+
+
+def test_spool_key_of_dependencies():
+    root = tempfile.mkdtemp(prefix="test_spool_")
+    url = "http://localhost/api/jobs"
+
+    try:
+        spool = deadline_spool.Spool(root)
+        key = spool.put(url, _jobs(), submitted={"0": "job_before"})
+        # Same jobs depend on another submitted job, e.g. re-publish
+        other = spool.put(url, _jobs(), submitted={"0": "job_after"})
+        assert other != key
+        assert sorted(spool.keys()) == sorted([key, other])
+        assert spool.get(other)["submitted"] == {"0": "job_after"}
+        assert spool.get(key)["submitted"] == {"0": "job_before"}
+
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def test_resume_spool():
+    module = import_module("test_publish_deadline_submitter", PLUGIN)
+    root = tempfile.mkdtemp(prefix="test_spool_")
+
+    class _Context(object):
+        data = {"user": "tester", "comment": ""}
+
+    session = {"AVALON_PROJECT": "Foo",
+               "AVALON_DEADLINE": "http://localhost"}
+    environ = {"AVALON_DEADLINE_AUTH": "a:b",
+               "REVERIES_DEADLINE_SPOOL": root}
+
+    try:
+        with mock.patch.dict("avalon.api.Session", session), \
+                mock.patch.dict(os.environ, environ), \
+                mock.patch.object(module.deadline_spool,
+                                  "start_flusher") as start_flusher:
+            # Nothing spooled
+            module.DeadlineSubmitter(_Context())
+            assert not start_flusher.called
+
+            # Left by last session
+            deadline_spool.Spool(root).put(session["AVALON_DEADLINE"],
+                                           _jobs())
+            module.DeadlineSubmitter(_Context())
+            assert start_flusher.call_count == 1
+            spool = start_flusher.call_args[0][0]
+            assert spool.root == root
+
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
@@ -0,0 +1,169 @@
+
+import os
+import sys
+import json
+import tempfile
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+from tests.fixtures.avalon import import_module
+from tests.fixtures.deadline import serve_deadline_stub
+
+
+PLUGIN = os.path.join(os.path.dirname(__file__), "..", "..", "plugins",
+                      "global", "publish", "publish_deadline_submitter.py")
+COMMAND = os.path.join(os.path.dirname(__file__),
+                       "..", "bin", "deadlinecommand_stub.py")
+
+
+class _Context(object):
+    def __init__(self, data):
+        self.data = data
+
+
+def test_submit_in_waves():
+    module = import_module("test_publish_deadline_submitter", PLUGIN)
+    server = serve_deadline_stub()
+
+    session = {
+        "AVALON_PROJECT": "Foo",
+        "AVALON_DEADLINE": server.url,
+    }
+    context = _Context({"user": "tester", "comment": ""})
+
+    try:
+        with mock.patch.dict("avalon.api.Session", session), \
+                mock.patch.dict(os.environ, {"AVALON_DEADLINE_AUTH": "a:b"}):
+            submitter = module.DeadlineSubmitter(context)
+
+            # 12 render jobs, each has a publish job depends on it
+            for i in range(12):
+                render = submitter.add_job({
+                    "JobInfo": {"Name": "render%d" % i},
+                    "PluginInfo": {},
+                })
+                submitter.add_job({
+                    "JobInfo": {"Name": "publish%d" % i,
+                                "JobDependencies": render},
+                    "PluginInfo": {},
+                })
+
+            assert [len(wave) for wave in submitter.waves()] == [12, 12]
+            submitter.submit()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(server.jobs) == 24
+    assert len(submitter.latency) == 24
+    # Connections were reused
+    assert len(server.clients) <= submitter.workers
+
+    names = {payload["JobInfo"]["Name"]: jobid
+             for jobid, payload in server.jobs.items()}
+    for jobid, payload in server.jobs.items():
+        job_info = payload["JobInfo"]
+        if job_info["Name"].startswith("publish"):
+            render = "render" + job_info["Name"][len("publish"):]
+            assert job_info["JobDependencies"] == names[render]
+
+
+def test_waves_error():
+    module = import_module("test_publish_deadline_submitter", PLUGIN)
+
+    submitter = module.DeadlineSubmitter.__new__(module.DeadlineSubmitter)
+    submitter._submitted = dict()
+    submitter._jobs = {
+        "0": {"JobInfo": {"JobDependencies": "1"}},
+        "1": {"JobInfo": {"JobDependencies": "0"}},
+    }
+    try:
+        submitter.waves()
+    except Exception as e:
+        assert "Circular" in str(e)
+    else:
+        assert False, "Should have raised."
+
+
+def _command_submitter(module):
+    session = {
+        "AVALON_PROJECT": "Foo",
+        "AVALON_DEADLINE_APP": COMMAND,
+    }
+    context = _Context({"user": "tester",
+                        "comment": "",
+                        "USE_DEADLINE_APP": True})
+
+    with mock.patch.dict("avalon.api.Session", session):
+        submitter = module.DeadlineSubmitter(context)
+    submitter._cmd = [sys.executable, COMMAND]
+
+    return submitter
+
+
+def _calls(log_file):
+    with open(log_file) as fp:
+        return [json.loads(line) for line in fp]
+
+
+def test_submit_multiple_jobs():
+    module = import_module("test_publish_deadline_submitter", PLUGIN)
+    log_file = tempfile.mktemp(prefix="deadline_stub_", suffix=".log")
+    tmp_dirs = set(os.listdir(tempfile.gettempdir()))
+
+    with mock.patch.dict(os.environ, {"DEADLINE_STUB_LOG": log_file}):
+        # Render and publish pairs, submitted in two calls
+        submitter = _command_submitter(module)
+        renders = list()
+        for i in range(5):
+            render = submitter.add_job({
+                "JobInfo": {"Name": "render%d" % i},
+                "PluginInfo": {},
+            })
+            renders.append(render)
+            submitter.add_job({
+                "JobInfo": {"Name": "publish%d" % i,
+                            "JobDependencies": render},
+                "PluginInfo": {},
+            })
+        submitter.submit()
+
+        calls = _calls(log_file)
+        assert len(calls) == 2
+        assert not any(call["dependent"] for call in calls)
+        for job in calls[1]["jobs"]:
+            render = "render" + job["jobInfo"]["Name"][len("publish"):]
+            index = renders[int(render[len("render"):])]
+            assert job["jobInfo"]["JobDependencies"] == \
+                submitter._submitted[index]
+
+        submitted = [job["jobId"] for call in calls for job in call["jobs"]]
+        assert sorted(submitted) == sorted(submitter._submitted.values())
+
+        # Single chain, submitted in one dependent call
+        os.remove(log_file)
+        submitter = _command_submitter(module)
+        previous = None
+        for i in range(3):
+            job_info = {"Name": "step%d" % i}
+            if previous is not None:
+                job_info["JobDependencies"] = previous
+            previous = submitter.add_job({"JobInfo": job_info,
+                                          "PluginInfo": {}})
+        submitter.submit()
+
+        calls = _calls(log_file)
+        assert len(calls) == 1
+        assert calls[0]["dependent"]
+        assert [job["jobInfo"]["Name"] for job in calls[0]["jobs"]] == \
+            ["step0", "step1", "step2"]
+        assert not any("JobDependencies" in job["jobInfo"]
+                       for job in calls[0]["jobs"])
+
+    os.remove(log_file)
+    # Info file dirs are cleaned up
+    new_dirs = set(os.listdir(tempfile.gettempdir())) - tmp_dirs
+    assert not [name for name in new_dirs if name.startswith("deadline_")]
@@ -0,0 +1,51 @@
+import os
+
+import reveries.dirscan as dirscan
+
+
+def test_compile_pattern():
+    regex = dirscan.compile_pattern("wall.<UDIM>.tif")
+    assert regex.match("wall.1001.tif")
+    assert not regex.match("wall.101.tif")
+    assert not regex.match("wall.1001.tif.bak")
+
+    regex = dirscan.compile_pattern("rock_u<U>_v<V>[1].exr")
+    assert regex.match("rock_u1_v2[1].exr")
+    assert not regex.match("rock_u1_v2.exr")
+
+    regex = dirscan.compile_pattern("smoke.####.png")
+    assert regex.match("smoke.0012.png")
+    assert not regex.match("smoke.12.png")
+
+    assert dirscan.compile_pattern("fire.<f>.png").match("fire.12.png")
+
+
+def test_dir_scanner(workdir):
+    root = workdir
+    names = ["wall.1001.tif", "wall.1002.tif", "wall.1001.tx", "floor.tif"]
+    for name in names:
+        with open(os.path.join(root, name), "w") as f:
+            f.write(name)
+    os.makedirs(os.path.join(root, "wall.1003.tif"))  # Not a file
+
+    scanner = dirscan.DirScanner()
+    pattern = os.path.join(root, "wall.<UDIM>.tif")
+    assert scanner.find(pattern) == ["wall.1001.tif", "wall.1002.tif"]
+    assert scanner.find(os.path.join(root, "floor.tif")) == ["floor.tif"]
+
+    path = os.path.join(root, "wall.1001.tx")
+    assert scanner.isfile(path)
+    assert scanner.getsize(path) == len("wall.1001.tx")
+    assert scanner.getmtime(path) == os.path.getmtime(path)
+    assert not scanner.isfile(os.path.join(root, "wall.1003.tif"))
+    assert not scanner.isfile(os.path.join(root, "missing", "a.tif"))
+
+    # Listed once
+    assert scanner.scans == 2  # root and the missing dir
+
+    # Cached until invalidated
+    with open(os.path.join(root, "wall.1004.tif"), "w") as f:
+        f.write("new")
+    assert len(scanner.find(pattern)) == 2
+    scanner.invalidate(root)
+    assert len(scanner.find(pattern)) == 3
@@ -0,0 +1,65 @@
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+import reveries.doccache as doccache
+
+
+@mock.patch.dict('avalon.api.Session', {"AVALON_PROJECT": "Test"})
+@mock.patch('avalon.io.find')
+@mock.patch('avalon.io.find_one')
+def test_document_cache(find_one, find):
+    docs = {
+        1: {"_id": 1, "type": "version", "name": 3, "parent": 2},
+        2: {"_id": 2, "type": "subset", "name": "modelDefault"},
+    }
+    find_one.side_effect = lambda filter, **kwargs: docs.get(filter["_id"])
+    find.side_effect = lambda filter, **kwargs: [
+        docs[_id] for _id in filter["_id"]["$in"]]
+
+    # Passthrough if no active cache
+    assert doccache.current() is None
+    doccache.find_one({"_id": 1})
+    doccache.find_one({"_id": 1})
+    assert find_one.call_count == 2
+
+    with doccache.session() as cache:
+        version = doccache.find_one({"_id": 1})
+        version["name"] = 0  # Returned a copy
+        assert doccache.find_one({"_id": 1})["name"] == 3
+        assert find_one.call_count == 3
+
+        # Served from `_id` index
+        doccache.find_one({"_id": 2})
+        assert doccache.find_one({"_id": 2, "type": "subset"},
+                                 projection={"name": True}) == {
+            "_id": 2, "name": "modelDefault"}
+        assert find_one.call_count == 4
+
+        cache.invalidate([1, 2])
+        assert doccache.prefetch([1, 2]) == 2
+        assert doccache.prefetch([1, 2]) == 0
+        doccache.find_one({"_id": 1})
+        doccache.find_one({"_id": 2})
+        assert find_one.call_count == 4
+        assert find.call_count == 1
+
+        stats = cache.stats()
+        assert stats["misses"] == 2
+        assert stats["hits"] == 4
+
+    assert doccache.current() is None
+
+
+def test_of_context():
+
+    class _Context(object):
+        data = dict()
+
+    context = _Context()
+    cache = doccache.of(context)
+    assert isinstance(cache, doccache.DocumentCache)
+    assert doccache.of(context) is cache
+    # Not activated process wide
+    assert doccache.current() is None
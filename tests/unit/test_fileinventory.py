@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+import reveries.fileinventory as fileinventory
+
+
+def test_ranges():
+    assert fileinventory.format_ranges([1003, 1001, 1002, 1005]) == \
+        "1001-1003,1005"
+    assert fileinventory.parse_ranges("1001-1003,1005") == \
+        [1001, 1002, 1003, 1005]
+    assert fileinventory.format_ranges([]) == ""
+
+
+def test_compact_fnames():
+    fnames = ["wall.%d.tif" % i for i in list(range(1001, 1100)) + [1101]]
+    compact = fileinventory.compact_fnames(fnames)
+    assert compact == {"prefix": "wall.", "suffix": ".tif", "padding": 4,
+                       "ranges": "1001-1099,1101"}
+    assert fileinventory.expand_fnames(compact) == fnames
+
+    # Frame number is not the last number
+    fnames = ["seq/smoke.%04d.v2.png" % i for i in range(1, 11)]
+    compact = fileinventory.compact_fnames(fnames)
+    assert compact["prefix"] == "seq/smoke."
+    assert compact["padding"] == 4
+    assert fileinventory.expand_fnames(compact) == fnames
+
+    # Two varying numbers, can not encode
+    assert fileinventory.compact_fnames(["a_u1_v1.tif",
+                                         "a_u2_v2.tif"]) is None
+    assert fileinventory.compact_fnames(["single.tif"]) is None
+
+
+def test_compact_entry():
+    fnames = ["wall.%d.tif" % i for i in range(1001, 1201)]
+    entry = {
+        "fpattern": "wall.<UDIM>.tif",
+        "version": 5,
+        "colorSpace": "sRGB",
+        "fnames": fnames,
+        "fileVersions": [[fn, (3 if fn < "wall.1100" else 5)]
+                         for fn in fnames],
+    }
+    file_versions = dict(entry["fileVersions"])
+
+    compact = fileinventory.compact_entry(entry)
+    assert "fnames" not in compact
+    assert compact["fileVersionRanges"] == {"3": "1001-1099",
+                                            "5": "1100-1200"}
+    assert len(json.dumps(compact)) * 20 < len(json.dumps(entry))
+
+    # Readers accept both formats
+    for data in (entry, compact):
+        assert fileinventory.fnames_of(data) == fnames
+        assert fileinventory.file_versions_of(data) == file_versions
+
+    assert fileinventory.expand_entry(compact) == entry
+    assert fileinventory.compact_entry(compact) == compact
+
+
+def test_content_ids():
+    bson = pytest.importorskip("bson")
+
+    fnames = ["wall.%d.tif" % i for i in range(1001, 1004)]
+    content_ids = {fn: "c4%d" % i for i, fn in enumerate(fnames)}
+    content_ids["wall.1001.tx"] = "c4tx"
+    entry = {
+        "fpattern": "wall.<UDIM>.tif",
+        "version": 1,
+        "fnames": fnames,
+        "contentIds": fileinventory.content_id_pairs(content_ids),
+    }
+
+    compact = fileinventory.compact_entry(entry)
+    for data in (entry, compact):
+        assert fileinventory.content_ids_of(data) == content_ids
+        # MongoDB rejects dotted keys
+        bson.encode({"fileInventory": [data]}, check_keys=True)
+
+    assert fileinventory.content_ids_of({"fnames": fnames}) == {}
+
+
+def test_explicit_entry_keys():
+    bson = pytest.importorskip("bson")
+
+    # Can not be compacted, two varying numbers
+    fnames = ["a_u1_v1.tif", "a_u2_v2.tif"]
+    file_versions = {"a_u1_v1.tif": 3, "a_u2_v2.tif": 5}
+    entry = {
+        "fpattern": "a_u<U>_v<V>.tif",
+        "version": 5,
+        "fnames": fnames,
+        "fileVersions": fileinventory.file_version_pairs(file_versions),
+    }
+
+    explicit = fileinventory.compact_entry(entry)
+    assert explicit == entry
+    assert fileinventory.file_versions_of(explicit) == file_versions
+    bson.encode({"fileInventory": [explicit]}, check_keys=True)
+
+    # Mapping is turned into pairs as well
+    entry["fileVersions"] = file_versions
+    explicit = fileinventory.compact_entry(entry)
+    assert explicit["fileVersions"] == [["a_u1_v1.tif", 3],
+                                        ["a_u2_v2.tif", 5]]
@@ -0,0 +1,177 @@
+import os
+
+import pytest
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+from tests.fixtures.avalon import import_module
+
+
+PLUGIN = os.path.join(os.path.dirname(__file__), "..", "..", "plugins",
+                      "global", "publish", "integrate_avalon_database.py")
+
+
+class _Context(list):
+    def __init__(self, instances, data):
+        super(_Context, self).__init__(instances)
+        self.data = data
+
+
+class _Instance(object):
+    def __init__(self, data):
+        self.data = data
+        self.context = None
+
+
+class _IO(object):
+    """`avalon.io` on a mongomock collection"""
+
+    def __init__(self, collection):
+        import bson
+        self.ObjectId = bson.ObjectId
+        self.collection = collection
+
+    def find_one(self, filter, **kwargs):
+        return self.collection.find_one(filter, **kwargs)
+
+    def find(self, filter, **kwargs):
+        return self.collection.find(filter, **kwargs)
+
+    def insert_one(self, doc):
+        return self.collection.insert_one(doc)
+
+    def insert_many(self, docs):
+        return self.collection.insert_many(docs)
+
+    def update_many(self, filter, update):
+        return self.collection.update_many(filter, update)
+
+
+def _ids():
+    import bson
+    return {name: bson.ObjectId() for name in (
+        "asset", "modelA", "modelA_v1", "modelA_v1_mb", "dependency",
+        "modelA_v2", "modelA_v2_mb", "lookB", "lookB_v1", "lookB_v1_ld",
+        "subsetOfDependency", "decoy",
+    )}
+
+
+def _setup(collection, ids):
+    collection.insert_many([
+        {"_id": ids["asset"], "type": "asset", "name": "hero"},
+        {"_id": ids["modelA"], "type": "subset", "name": "modelA",
+         "parent": ids["asset"]},
+        {"_id": ids["modelA_v1"], "type": "version", "name": 1,
+         "parent": ids["modelA"], "data": {"time": "old"}},
+        {"_id": ids["modelA_v1_mb"], "type": "representation",
+         "name": "mayaBinary", "parent": ids["modelA_v1"],
+         "data": {"old": True}},
+        {"_id": ids["dependency"], "type": "version", "name": 3,
+         "parent": ids["subsetOfDependency"], "data": {}},
+        # A non-subset document named as a new subset
+        {"_id": ids["decoy"], "type": "version", "name": "lookB",
+         "parent": ids["asset"]},
+    ])
+
+    def to_database(subset, version, representation):
+        subset_doc = {"_id": ids[subset], "type": "subset", "name": subset,
+                      "parent": ids["asset"]}
+        version_doc = {"type": "version", "name": version,
+                       "parent": ids[subset], "data": {"time": "now"}}
+        repr_doc = {"_id": ids[representation], "type": "representation",
+                    "name": representation.rsplit("_", 1)[-1],
+                    "data": {"new": True}}
+        return subset_doc, version_doc, [repr_doc]
+
+    dependencies = {str(ids["dependency"]): {"count": 2}}
+    instances = [
+        # Existing subset and version
+        _Instance({"toDatabase": to_database("modelA", 1, "modelA_v1_mb"),
+                   "dependencies": dependencies,
+                   "pregeneratedVersionId": ids["modelA_v1"]}),
+        # Existing subset, new version with dependents
+        _Instance({"toDatabase": to_database("modelA", 2, "modelA_v2_mb"),
+                   "dependencies": dependencies,
+                   "pregeneratedVersionId": ids["modelA_v2"]}),
+        # New subset and version
+        _Instance({"toDatabase": to_database("lookB", 1, "lookB_v1_ld"),
+                   "dependencies": {},
+                   "pregeneratedVersionId": ids["lookB_v1"]}),
+    ]
+    # Same representation name as the existing one
+    instances[0].data["toDatabase"][2][0]["name"] = "mayaBinary"
+
+    context = _Context(instances, {
+        "results": [{"success": True}],
+        "assetDoc": {"_id": ids["asset"]},
+        "time": "now",
+    })
+    for instance in instances:
+        instance.context = context
+        instance.data["versioner"] = mock.Mock()
+
+    return context
+
+
+def _integrate(ids, bulk):
+    mongomock = pytest.importorskip("mongomock")
+    module = import_module("test_integrate_avalon_database", PLUGIN)
+
+    collection = mongomock.MongoClient()["avalon"]["Foo"]
+    context = _setup(collection, ids)
+
+    environ = {"REVERIES_BULK_INTEGRATE": "1" if bulk else ""}
+    session = {"AVALON_PROJECT": "Foo"}
+    with mock.patch.dict(os.environ, environ), \
+            mock.patch.dict("avalon.api.Session", session), \
+            mock.patch.object(module, "io", _IO(collection)), \
+            mock.patch.object(module.lib, "project_collection",
+                              return_value=collection), \
+            mock.patch.object(module.lib, "supports_transaction",
+                              return_value=False):
+        if bulk:
+            module.IntegrateAvalonDatabaseBulk().process(context)
+        for instance in context:
+            module.IntegrateAvalonDatabase().process(instance)
+
+    for instance in context:
+        instance.data["versioner"].commit.assert_called_once_with()
+
+    return context, collection
+
+
+def test_bulk_integrate():
+    ids = _ids()
+    context, collection = _integrate(ids, bulk=True)
+
+    assert context.data["databaseReport"]["queries"] == 3
+    assert collection.count_documents({"type": "subset"}) == 2
+
+    # Existing version updated
+    assert collection.find_one(ids["modelA_v1"])["data"]["time"] == "now"
+    assert collection.find_one(ids["modelA_v1_mb"])["data"] == {"new": True}
+
+    # New versions and representations
+    assert collection.find_one(ids["modelA_v2_mb"])["parent"] == \
+        ids["modelA_v2"]
+    assert collection.find_one(ids["lookB_v1_ld"])["parent"] == \
+        ids["lookB_v1"]
+    assert context[1].data["insertedVersionId"] == ids["modelA_v2"]
+
+    # Dependents
+    dependents = collection.find_one(ids["dependency"])["data"]["dependents"]
+    assert dependents == {str(ids["modelA_v2"]): {"count": 2}}
+
+
+def test_bulk_matches_per_instance():
+    ids = _ids()
+    _, bulk = _integrate(ids, bulk=True)
+    _, per_instance = _integrate(ids, bulk=False)
+
+    def documents(collection):
+        return sorted(collection.find({}), key=lambda doc: doc["_id"])
+
+    assert documents(bulk) == documents(per_instance)
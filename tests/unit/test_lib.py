@@ -0,0 +1,66 @@
+import pytest
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+import reveries.lib
+
+
+@pytest.fixture
+def project_collection():
+    mongomock = pytest.importorskip("mongomock")
+    collection = mongomock.MongoClient()["avalon"]["Foo"]
+    collection.insert_many([
+        {"_id": "subset1", "type": "subset", "parent": "asset"},
+        {"_id": "subset2", "type": "subset", "parent": "asset"},
+    ] + [
+        {"_id": "v1_%d" % name, "type": "version", "name": name,
+         "parent": "subset1"} for name in (1, 2, 3)
+    ] + [
+        {"_id": "v2_1", "type": "version", "name": 1, "parent": "subset2"},
+        {"_id": "a", "type": "representation", "parent": "v1_3"},
+        {"_id": "b", "type": "representation", "parent": "v1_1"},
+        {"_id": "d", "type": "representation", "parent": "v2_1"},
+    ])
+
+    with mock.patch("reveries.lib.project_collection",
+                    return_value=collection):
+        yield collection
+
+
+def test_resolve_latest(project_collection):
+    resolved = reveries.lib.resolve_latest(["a", "b", "a", "c", "d"])
+
+    assert resolved["a"] == {"version": 3, "latest": 3, "outdated": False}
+    assert resolved["b"] == {"version": 1, "latest": 3, "outdated": True}
+    assert resolved["d"] == {"version": 1, "latest": 1, "outdated": False}
+    assert resolved["c"] is None
+
+    assert reveries.lib.resolve_latest([]) == dict()
+
+
+def test_resolve_latest_one_round_trip(project_collection):
+    with mock.patch.object(project_collection, "aggregate",
+                           wraps=project_collection.aggregate) as aggregate:
+        reveries.lib.resolve_latest(["a", "b", "d"])
+    assert aggregate.call_count == 1
+
+
+def test_project_collection_fallback():
+    mongomock = pytest.importorskip("mongomock")
+    session = {"AVALON_PROJECT": "Foo",
+               "AVALON_MONGO": "mongodb://fallback:27017",
+               "AVALON_DB": "avalon"}
+
+    with mock.patch.dict("avalon.api.Session", session), \
+            mock.patch("pymongo.MongoClient", mongomock.MongoClient), \
+            mock.patch.object(reveries.lib.avalon.io, "_database", None,
+                              create=True), \
+            mock.patch.object(reveries.lib.avalon.io, "_mongo_client", None,
+                              create=True):
+        collection = reveries.lib.project_collection()
+        assert collection.name == "Foo"
+        assert collection.database.name == "avalon"
+        assert reveries.lib.mongo_client() is collection.database.client
@@ -0,0 +1,114 @@
+
+import random
+
+import pytest
+
+from reveries import meshhash
+
+
+def _mesh(count, seed):
+    rand = random.Random(seed)
+    points = [(rand.uniform(-100, 100),
+               rand.uniform(-100, 100),
+               rand.uniform(-100, 100),
+               1.0) for _ in range(count)]
+    normals = [(rand.uniform(-1, 1),
+                rand.uniform(-1, 1),
+                rand.uniform(-1, 1)) for _ in range(count)]
+    uvmap = ([rand.random() for _ in range(count)],
+             [rand.random() for _ in range(count)])
+    return {"points": points, "normals": normals, "uvmap": uvmap}
+
+
+def _python_hash(kind, data, total=0):
+    # The per element loop that `MeshHasher` used to run
+    element_hash = {
+        "points": meshhash.hash_point,
+        "normals": meshhash.hash_vector,
+        "uvmap": meshhash.hash_uv,
+    }[kind]
+    elements = zip(*data) if kind == "uvmap" else data
+    for i, element in enumerate(elements):
+        total += element_hash(*element) + i
+    return total
+
+
+@pytest.mark.parametrize("kind", ["points", "normals", "uvmap"])
+def test_exact(kind):
+    pytest.importorskip("numpy")
+    meshes = [_mesh(count, seed) for seed, count in enumerate([500, 0, 31])]
+
+    total = expected = 0
+    for mesh in meshes:
+        total = meshhash.update(kind, mesh[kind], total)
+        expected = _python_hash(kind, mesh[kind], expected)
+        # Bit-exact, so digest of `str(total)` stays the same
+        assert total == expected
+        assert type(total) is type(expected)
+
+    assert meshhash.hash_many(kind, [m[kind] for m in meshes]) == [
+        _python_hash(kind, m[kind]) for m in meshes]
+
+
+@pytest.mark.parametrize("kind", ["points", "normals", "uvmap"])
+def test_fast(kind):
+    pytest.importorskip("numpy")
+    data = _mesh(1000, 7)[kind]
+
+    fast = meshhash.update(kind, data, exact=False)
+    assert fast == pytest.approx(_python_hash(kind, data), rel=1e-12)
+    assert meshhash.hash_many(kind, [data], exact=False) == [fast]
+
+
+def test_without_numpy(monkeypatch):
+    monkeypatch.setattr(meshhash, "numpy", None)
+    mesh = _mesh(50, 3)
+
+    for kind in ("points", "normals", "uvmap"):
+        for exact in (True, False):
+            assert (meshhash.update(kind, mesh[kind], exact=exact) ==
+                    _python_hash(kind, mesh[kind]))
+
+
+def test_hash_index():
+    profile = {
+        "id1": [{"uvmap": "c4uv1", "points": "c4pt1"}],
+        # Duplicated meshes with different UV
+        "id2": [{"uvmap": "c4uv2"}, {"uvmap": "c4uv3"}],
+        # Duplicated meshes with same UV
+        "id3": [{"uvmap": "c4uv1"}, {"uvmap": "c4uv1"}],
+        "id4": [{"points": "c4pt4"}],
+    }
+    assert meshhash.profile_hashes(profile) == {"id1": "c4uv1",
+                                                "id3": "c4uv1"}
+
+    fetched = list()
+
+    def fetch(representation_ids):
+        fetched.append(sorted(representation_ids))
+        return {"rep1": profile}
+
+    index = meshhash.HashIndex(fetch)
+    index.prefetch(["rep1", "rep2"])
+    assert index.published("rep1", "id1") == "c4uv1"
+    assert index.published("rep1", "id1", "points") == "c4pt1"
+    assert index.published("rep1", "id2") is None
+    assert index.published("rep2", "id1") is None
+    assert fetched == [["rep1", "rep2"]]
+
+    token = (8, 6, 24, 14, "map1")
+    assert index.cached("uuid1", token) == (False, None)
+    index.store("uuid1", token, {"uvmap": "c4uv1"})
+    index.store("uuid2", token, {"uvmap": None})
+    assert index.cached("uuid1", token) == (True, "c4uv1")
+    assert index.cached("uuid2", token) == (True, None)
+    assert index.cached("uuid1", token, "points") == (False, None)
+
+    # Topology changed
+    assert index.cached("uuid1", (8, 6, 24, 15, "map1")) == (False, None)
+
+    index.invalidate("uuid1")
+    assert index.cached("uuid1", token) == (False, None)
+    assert index.cached("uuid2", token) == (True, None)
+    index.invalidate()
+    assert index.cached("uuid2", token) == (False, None)
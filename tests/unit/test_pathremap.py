@@ -0,0 +1,89 @@
+
+import reveries.pathremap as pathremap
+
+
+def test_remap():
+    remapper = pathremap.PathRemapper(
+        pathremap.env_embedding_rules("/projects/", "Foo"))
+
+    paths = [
+        "/projects/Foo/tex/a.tif",
+        "/projects/Bar/b.tif",
+        "/projects2/Foo/c.tif",
+        "/other/Foo/d.tif",
+        "/projects/Foo",
+        "\\projects\\Foo\\e.tif",
+    ]
+    expected = [
+        "$AVALON_PROJECTS/$AVALON_PROJECT/tex/a.tif",
+        "$AVALON_PROJECTS/Bar/b.tif",
+        "/projects2/Foo/c.tif",
+        "/other/Foo/d.tif",
+        "$AVALON_PROJECTS/$AVALON_PROJECT",
+        "$AVALON_PROJECTS/$AVALON_PROJECT/e.tif",
+    ]
+    assert remapper.remap(paths) == expected
+    assert [remapper.remap_one(p) for p in paths] == expected
+
+    expanding = remapper.reversed()
+    assert expanding.remap(expected[:2]) == ["/projects/Foo/tex/a.tif",
+                                             "/projects/Bar/b.tif"]
+
+    # Rule of a file path, and replacing a rule
+    remapper.add("/projects/Foo/tex/a.tif", "/x/a.tif")
+    remapper.add("/projects/Foo/tex/a.tif", "/y/a.tif")
+    assert remapper.remap(paths[:2]) == ["/y/a.tif", expected[1]]
+    assert len(remapper.rules()) == 3
+
+
+def test_published_index():
+    existing = {
+        "/pub/v002/wall.1001.tif",
+        "/pub/v002/wall.1002.tif",
+        "/pub/v003/wall.1001.tif",
+        "/pub/v003/wall.1002.tif",
+        "/pub/v003/wall.1003.tif",
+        "/pub/v001/floor.1001.tx",
+        "/work/floor.1001.tx",
+    }
+
+    def profile(version, fnames):
+        return ({"version": version},
+                {"dir": "/pub/v%03d" % version,
+                 "pathMap": {fn: "/pub/v%03d/%s" % (version, fn)
+                             for fn in fnames}})
+
+    resolved_by_fpattern = {
+        "wall.<UDIM>.tif": [
+            profile(2, ["wall.1001.tif", "wall.1002.tif"]),
+            profile(3, ["wall.1001.tif", "wall.1002.tif", "wall.1003.tif"]),
+        ],
+        "floor.<UDIM>.tx": [profile(1, ["floor.1001.tx"])],
+    }
+    index = pathremap.PublishedIndex(resolved_by_fpattern,
+                                     existing.__contains__)
+
+    def path_map(fnames):
+        return {fn: "/work/" + fn for fn in fnames}
+
+    # Latest version that has all files
+    data, path = index.lookup("wall.<UDIM>.tif",
+                              path_map(["wall.1001.tif", "wall.1003.tif"]))
+    assert data["version"] == 3
+    assert path == "/pub/v003/wall.1001.tif"
+
+    # Missing file in all versions
+    assert index.lookup("wall.<UDIM>.tif",
+                        path_map(["wall.1004.tif"])) is None
+
+    # Different extension, only if the file with that extension exists
+    assert index.fpattern_of("floor.<UDIM>.tif") == "floor.<UDIM>.tx"
+    data, path = index.lookup("floor.<UDIM>.tif",
+                              path_map(["floor.1001.tif"]))
+    assert path == "/pub/v001/floor.1001.tx"
+
+    existing.remove("/work/floor.1001.tx")
+    assert index.lookup("floor.<UDIM>.tif",
+                        path_map(["floor.1001.tif"])) is None
+
+    assert index.fpattern_of("roof.<UDIM>.tif") is None
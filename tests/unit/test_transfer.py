@@ -0,0 +1,139 @@
+import os
+import errno
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+import reveries.transfer
+
+
+def _make_package(root, count=5):
+    package = os.path.join(root, "staging", "mayaBinary")
+    os.makedirs(os.path.join(package, "sub"))
+    for i in range(count):
+        with open(os.path.join(package, "file.%04d.bar" % i), "w") as foo:
+            foo.write("foo" * i)
+    with open(os.path.join(package, "sub", "nested.bar"), "w") as foo:
+        foo.write("nested")
+    return package
+
+
+def test_file_transfer(workdir):
+    wdir = workdir
+    package = _make_package(wdir)
+    version_dir = os.path.join(wdir, "v001")
+    dst_package = os.path.join(version_dir, "mayaBinary")
+    src_file = os.path.join(wdir, "file.bar")
+    dst_file = os.path.join(version_dir, "other", "file.bar")
+    with open(src_file, "w") as foo:
+        foo.write("foo")
+
+    engine = reveries.transfer.FileTransfer(
+        manifest_dir=version_dir,
+        workers=3,
+        strategies=(reveries.transfer.COPY,),
+    )
+    assert engine.add("packages", package, dst_package)
+    assert engine.add("files", src_file, dst_file)
+    # Deduplicated
+    assert not engine.add("files", src_file, dst_file)
+    # Same path
+    assert not engine.add("files", src_file, src_file)
+
+    stats = engine.run()
+
+    assert stats["packages"]["count"] == 6
+    assert stats["files"]["count"] == 1
+    assert os.path.isfile(os.path.join(dst_package, "sub", "nested.bar"))
+    with open(dst_file) as foo:
+        assert foo.read() == "foo"
+    # Manifest removed after success
+    manifest = os.path.join(version_dir, engine.MANIFEST)
+    assert not os.path.exists(manifest)
+    assert engine.strategy_of(dst_package) == reveries.transfer.COPY
+
+
+def test_file_transfer_resume(workdir):
+    wdir = workdir
+    package = _make_package(wdir)
+    version_dir = os.path.join(wdir, "v001")
+    dst_package = os.path.join(version_dir, "mayaBinary")
+
+    # Simulate half-finished transfer
+    done = os.path.join(dst_package, "file.0003.bar")
+    os.makedirs(dst_package)
+    with open(done, "w") as foo:
+        foo.write("foo" * 3)
+    manifest = reveries.transfer.TransferManifest(
+        os.path.join(version_dir, reveries.transfer.FileTransfer.MANIFEST))
+    manifest.record("packages", done, 9)
+    manifest.close()
+
+    engine = reveries.transfer.FileTransfer(manifest_dir=version_dir)
+    engine.add("packages", package, dst_package)
+    stats = engine.run()
+
+    assert stats["packages"]["count"] == 5
+    assert len(os.listdir(dst_package)) == 6
+    # Package dir existed, could not be renamed
+    assert engine.strategy_of(dst_package) != reveries.transfer.RENAME
+
+
+def test_file_transfer_strategy(workdir):
+    wdir = workdir
+    package = _make_package(wdir)
+    dst_package = os.path.join(wdir, "v001", "mayaBinary")
+
+    # Same device, package dir renamed into place
+    engine = reveries.transfer.FileTransfer()
+    engine.add("packages", package, dst_package)
+    stats = engine.run()
+
+    assert stats["packages"]["count"] == 0
+    assert not os.path.exists(package)
+    assert len(os.listdir(dst_package)) == 6
+    assert engine.strategy_of(dst_package) == reveries.transfer.RENAME
+
+    # Hardlink when rename is not allowed
+    package = _make_package(wdir)
+    dst_package = os.path.join(wdir, "v002", "mayaBinary")
+
+    engine = reveries.transfer.FileTransfer(
+        strategies=(reveries.transfer.HARDLINK,))
+    engine.add("packages", package, dst_package)
+    engine.run()
+
+    src_file = os.path.join(package, "file.0001.bar")
+    dst_file = os.path.join(dst_package, "file.0001.bar")
+    assert os.stat(src_file).st_ino == os.stat(dst_file).st_ino
+    assert engine.strategy_of(dst_package) == reveries.transfer.HARDLINK
+
+
+@mock.patch("reveries.transfer.hardlink_file")
+def test_hardlink_fallback(hardlink_file, workdir):
+    wdir = workdir
+    src = os.path.join(wdir, "tile.1001.tif")
+    with open(src, "w") as foo:
+        foo.write("foo")
+    dst = os.path.join(wdir, "v002", "tile.1001.tif")
+
+    hardlink_file.side_effect = OSError(errno.EXDEV, "Cross-device link")
+    engine = reveries.transfer.FileTransfer(workers=1)
+    engine.add("hardlinks", src, dst)
+    stats = engine.run()
+
+    assert stats["hardlinks"]["count"] == 1
+    with open(dst) as foo:
+        assert foo.read() == "foo"
+
+    hardlink_file.side_effect = OSError(errno.EACCES, "Permission denied")
+    engine = reveries.transfer.FileTransfer(workers=1, retries=0)
+    engine.add("hardlinks", src, dst + ".other")
+    try:
+        engine.run()
+    except OSError as e:
+        assert e.errno == errno.EACCES
+    else:
+        assert False, "Should have raised."
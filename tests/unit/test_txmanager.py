@@ -0,0 +1,51 @@
+import os
+import sys
+
+import reveries.txmanager as txmanager
+import reveries.dirscan as dirscan
+
+
+MAKETX_STUB = os.path.join(os.path.dirname(__file__),
+                           "..", "bin", "maketx_stub.py")
+
+
+def test_check_and_make_tx(workdir):
+    root = workdir
+    sources = list()
+    for name in ("a.1001.tif", "a.1002.tif", "b.tif"):
+        path = os.path.join(root, name)
+        with open(path, "w") as f:
+            f.write(name)
+        os.utime(path, (1000, 1000))
+        sources.append(path)
+
+    updated, stale, missing_tx = sources
+    with open(txmanager.tx_path(updated), "w") as f:
+        f.write("tx")
+    os.utime(txmanager.tx_path(updated), (1000, 1000.5))
+    with open(txmanager.tx_path(stale), "w") as f:
+        f.write("tx")
+    missing_source = os.path.join(root, "missing.tif")
+
+    scanner = dirscan.DirScanner()
+    status = txmanager.check(sources + [missing_source], scanner=scanner)
+    assert status == {
+        updated: txmanager.UPDATED,
+        stale: txmanager.STALE,
+        missing_tx: txmanager.MISSING_TX,
+        missing_source: txmanager.MISSING_SOURCE,
+    }
+
+    errors = txmanager.make_tx([stale, missing_tx, missing_source],
+                               executable=[sys.executable, MAKETX_STUB],
+                               workers=2,
+                               scanner=scanner)
+    assert list(errors) == [missing_source]
+
+    status = txmanager.check(sources, scanner=scanner)
+    assert set(status.values()) == {txmanager.UPDATED}
+    with open(txmanager.tx_path(missing_tx)) as f:
+        assert f.read() == "b.tif"
+    # Tx newer than source is rebuilt as well
+    with open(txmanager.tx_path(stale)) as f:
+        assert f.read() == "a.1002.tif"
@@ -1,5 +1,6 @@
 
 import os
+import shutil
 import tempfile
 
 try:
@@ -9,6 +10,7 @@ except ImportError:
 
 import reveries
 import reveries.utils
+import reveries.hashcache
 
 
 def test_temp_dir():
@@ -67,6 +69,34 @@ def test_get_timeline_data(find_one):
     assert data == ASSET_DATA
 
 
+@mock.patch('avalon.io.find_one')
+def test_get_timeline_data_cached(find_one):
+    import reveries.doccache
+
+    def side_effect(spec, **kwargs):
+        if spec == {"type": "project"}:
+            return {"_id": "project", "data": {"edit_in": 100,
+                                               "edit_out": 999,
+                                               "handles": 1,
+                                               "fps": 24}}
+        if spec == {"name": "TestShot", "type": "asset"}:
+            return {"_id": "asset", "data": {}}
+
+    find_one.side_effect = side_effect
+    cache = reveries.doccache.DocumentCache()
+
+    session = {"AVALON_PROJECT": "Foo", "AVALON_ASSET": "TestShot"}
+    with mock.patch.dict("avalon.Session", session):
+        for _ in range(3):
+            data = reveries.utils.get_timeline_data(cache=cache)
+            assert data == (100, 999, 1, 24)
+            data = reveries.utils.compose_timeline_data(cache=cache)
+            assert data == (99, 1000, 24)
+
+    # Project and asset queried once
+    assert find_one.call_count == 2
+
+
 @mock.patch('reveries.utils.get_timeline_data')
 def test_compose_timeline_data(time_data):
 
@@ -118,9 +148,8 @@ def test_publish_results_formatting(format_result):
     assert formatted == list(map(fake_format, results))
 
 
-def test_hash_file():
-    prefix = "test_hash"
-    wdir = tempfile.mkdtemp(prefix=prefix)
+def test_hash_file(workdir):
+    wdir = workdir
     file_path = os.path.join(wdir, "foo.bar")
     with open(file_path, "w") as foo:
         foo.write("")
@@ -152,12 +181,11 @@ def test_plugins_by_range(discover):
     assert [p.order for p in found] == [1, 1.2, 1.8, 2.2]
 
 
-def test_asset_hasher():
+def test_asset_hasher(workdir):
 
     # Hashing non-empty file\
     #
-    prefix = "test_hash"
-    wdir = tempfile.mkdtemp(prefix=prefix)
+    wdir = workdir
     file_path = os.path.join(wdir, "foo.bar")
 
     # This data happens to be able to cover the if-statement inside
@@ -199,6 +227,100 @@ def test_asset_hasher():
     hasher.clear()
 
 
+def test_asset_hasher_parallel(workdir):
+    wdir = workdir
+    sub_dir = os.path.join(wdir, "sub")
+    os.makedirs(sub_dir)
+
+    for dir_path, name, data in [(wdir, "b.bar", "b" * 4096),
+                                 (wdir, "a.bar", ""),
+                                 (sub_dir, "c.bar", "c" * 4096 * 50)]:
+        with open(os.path.join(dir_path, name), "w") as foo:
+            foo.write(data)
+
+    # Parallel result is deterministic
+    #
+    hasher = reveries.utils.AssetHasher(legacy=False, workers=2)
+    hasher.add_dir(wdir)
+    hash_val = hasher.digest()
+    assert hash_val.startswith("c4")
+
+    hasher.clear()
+    hasher.add_dir(wdir)
+    assert hasher.digest() == hash_val
+
+    # Each file visited exactly once, in sorted order
+    #
+    hasher.clear()
+    for name in ("a.bar", "b.bar", "sub/c.bar"):
+        hasher.add_file(os.path.join(wdir, name))
+    assert hasher.digest() == hash_val
+
+    # Non-recursive
+    #
+    hasher.clear()
+    hasher.add_dir(wdir, recursive=False)
+    assert hasher.digest() != hash_val
+
+    # Legacy digest is kept by default
+    #
+    file_path = os.path.join(sub_dir, "c.bar")
+    hasher.clear()
+    hasher.add_file(file_path)
+    assert hasher.digest() != reveries.utils.hash_file(file_path)
+
+
+def test_hash_cache(workdir):
+    wdir = workdir
+    file_path = os.path.join(wdir, "foo.bar")
+    with open(file_path, "w") as foo:
+        foo.write("foo")
+
+    cache = reveries.hashcache.HashCache(os.path.join(wdir, "cache.db"))
+    assert cache.get(file_path) is None
+
+    # Cached digest gives the same hash value
+    hash_val = reveries.utils.hash_file(file_path, cache=False)
+    assert reveries.utils.hash_file(file_path, cache=cache) == hash_val
+    assert cache.get(file_path) is not None
+    assert reveries.utils.hash_file(file_path, cache=cache) == hash_val
+
+    # Modified file invalidates the entry
+    with open(file_path, "w") as foo:
+        foo.write("foo bar")
+    assert cache.get(file_path) is None
+
+    # Eviction
+    assert cache.evict(max_entries=0) == 1
+    cache.close()
+
+
+def test_hash_cache_unwritable():
+    prefix = "test_hash"
+    wdir = tempfile.mkdtemp(prefix=prefix)
+    file_path = os.path.join(wdir, "foo.bar")
+    with open(file_path, "w") as foo:
+        foo.write("foo")
+
+    # Cache dir can not be created, e.g. read-only home dir
+    db_path = os.path.join(file_path, "cache", "cache.db")
+    cache = reveries.hashcache.HashCache(db_path)
+
+    try:
+        hash_val = reveries.utils.hash_file(file_path, cache=False)
+        assert reveries.utils.hash_file(file_path, cache=cache) == hash_val
+        assert cache.get(file_path) is None
+        assert cache.evict() == 0
+        cache.clear()
+
+        # File removed while being looked up
+        cache.put_many([(os.path.join(wdir, "gone"), "00", None)])
+        assert cache.get_many([os.path.join(wdir, "gone")]) == {}
+
+    finally:
+        shutil.rmtree(wdir, ignore_errors=True)
+
+
 @mock.patch.dict('avalon.Session', {"AVALON_APP": "Maya"})
 @mock.patch('avalon.api.registered_root')
 def test_get_representation_path_(registered_root):
@@ -224,3 +346,39 @@ def test_get_representation_path_(registered_root):
 
     assert path == ("ROOT/Blockbuster/Maya/Asset/Hero/publish/"
                     "modelDefault/v005/MayaBinary")
+
+
+def test_identical_files(workdir):
+    wdir = workdir
+    block = reveries.utils.SAMPLE_BLOCK_SIZE
+
+    def write(name, content, mtime):
+        path = os.path.join(wdir, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        os.utime(path, (mtime, mtime))
+        return path
+
+    big = b"x" * (block * 4)
+    # Differs only outside of sampled blocks
+    big_other = big[:block + 1] + b"y" + big[block + 2:]
+
+    a = write("a.tif", big, 1000)
+    a_copy = write("a_copy.tif", big, 2000)  # Copied, new mtime
+    a_other = write("a_other.tif", big_other, 1000)
+    b = write("b.tif", b"small", 1000)
+    b_copy = write("b_copy.tif", b"small", 3000)
+    b_other = write("b_other.tif", b"smalL", 1000)
+    c = write("c.tif", b"sized", 1000)
+
+    results = reveries.utils.identical_files([
+        [a, a_copy],
+        [a, a_other],
+        [b, b_copy],
+        [b, b_other],
+        [b, c, b_copy],
+        [b, os.path.join(wdir, "missing.tif")],
+        [b, b],
+    ], cache=False)
+
+    assert results == [True, False, True, False, False, False, True]
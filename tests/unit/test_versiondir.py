@@ -0,0 +1,61 @@
+import os
+import json
+
+import reveries.versiondir as versiondir
+
+
+def test_prepare_and_commit(workdir):
+    subset_dir = workdir
+    version_dir = os.path.join(subset_dir, "v001")
+
+    partial = versiondir.prepare(version_dir)
+    assert partial == os.path.join(subset_dir, ".v001.partial")
+    assert versiondir.read_journal(partial)["state"] == versiondir.OPEN
+
+    with open(os.path.join(partial, "foo.bar"), "w") as foo:
+        foo.write("foo")
+
+    # Retry, previous partial dir moved aside
+    partial = versiondir.prepare(version_dir)
+    assert os.listdir(partial) == [versiondir.JOURNAL_FILE]
+    assert len(os.listdir(subset_dir)) == 2
+
+    with open(os.path.join(partial, "foo.bar"), "w") as foo:
+        foo.write("foo")
+
+    versiondir.commit(version_dir)
+    assert not os.path.exists(partial)
+    assert os.listdir(version_dir) == ["foo.bar"]
+
+
+def test_sweep(workdir):
+    root = workdir
+    subset_dir = os.path.join(root, "Asset", "publish", "modelDefault")
+    os.makedirs(subset_dir)
+
+    # Orphaned
+    orphan = versiondir.prepare(os.path.join(subset_dir, "v001"))
+    journal_path = os.path.join(orphan, versiondir.JOURNAL_FILE)
+    with open(journal_path, "r") as fp:
+        journal = json.load(fp)
+    journal["time"] = 0
+    journal["host"] = "other"
+    with open(journal_path, "w") as fp:
+        json.dump(journal, fp)
+    # Database written but not renamed
+    committing = versiondir.prepare(os.path.join(subset_dir, "v002"))
+    versiondir.write_journal(committing, versiondir.COMMITTING)
+    # Still publishing
+    opened = versiondir.prepare(os.path.join(subset_dir, "v003"))
+    # Moved aside
+    os.makedirs(os.path.join(subset_dir, "v004"))
+    trash = versiondir.move_aside(os.path.join(subset_dir, "v004"))
+
+    report = versiondir.sweep(root, dry_run=True)
+    assert sorted(report["removed"]) == sorted([orphan, trash])
+    assert os.path.isdir(orphan)
+
+    report = versiondir.sweep(root)
+    assert report["committed"] == [os.path.join(subset_dir, "v002")]
+    assert report["kept"] == [opened]
+    assert sorted(os.listdir(subset_dir)) == [".v003.partial", "v002"]